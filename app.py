@@ -1,37 +1,84 @@
-import dash
-from dash import dcc, html, Input, Output
-import dash_bootstrap_components as dbc
-
-from dashboards import analysis_dash, comparison_dash
-
-import webbrowser
-
-app = dash.Dash(external_stylesheets=[dbc.themes.BOOTSTRAP])
-url = "http://127.0.0.1:8050/"
-
-### ----- LAYOUT ----- ###
-
-app.layout = html.Div([
-    dcc.Location(id="url", refresh=False),
-    html.Div(id="page-content")
-])
-
-### ----- CALLBACKS ----- ###
-
-#Change Page
-@app.callback(
-    Output("page-content", "children"),
-    Input("url", "pathname"))
-def display_page(pathname):
-    if pathname == "/compare":
-        return comparison_dash.layout
-    else:
-        return analysis_dash.layout
-
-### ----- Open Browser and Run server ----- ###
-
-webbrowser.open(url, new=0, autoraise=True)
-
-if __name__ == "__main__":
-    app.run_server()
-
+import dash
+from dash import dcc, html, Input, Output
+import dash_bootstrap_components as dbc
+import flask
+
+from dashboards import analysis_dash, comparison_dash
+from metrics import metrics
+from forecast_cache import forecastCache
+from jobs import trainingJobs
+from price_store import priceStore
+from data_access import dataAccess
+from fundamentals import fundamentalsCache
+from news import newsCache
+
+import webbrowser
+
+app = dash.Dash(external_stylesheets=[dbc.themes.BOOTSTRAP])
+url = "http://127.0.0.1:8050/"
+
+analysis_dash.registerClientsideCallbacks(app)
+
+### ----- LAYOUT ----- ###
+
+app.layout = html.Div([
+    dcc.Location(id="url", refresh=False),
+    html.Div(id="page-content")
+])
+
+### ----- CALLBACKS ----- ###
+
+#Change Page
+@app.callback(
+    Output("page-content", "children"),
+    Input("url", "pathname"))
+@metrics.timed("callback.display_page")
+def display_page(pathname):
+    if pathname == "/compare":
+        return comparison_dash.createLayout()
+    else:
+        return analysis_dash.createLayout()
+
+### ----- METRICS ----- ###
+
+#Forecast cache, training job, price data cache, price store, fundamentals cache and news cache figures are read from their owners on every scrape
+def collectJobMetrics():
+    cacheStats = forecastCache.stats()
+    dataStats = dataAccess.stats()
+    fundamentalsStats = fundamentalsCache.stats()
+    newsStats = newsCache.stats()
+    return [
+        ("foreco_forecast_cache_hits_total", "counter", "Forecasts served from the in-memory cache.", cacheStats["hits"]),
+        ("foreco_forecast_cache_disk_hits_total", "counter", "Forecasts served from the on-disk cache.", cacheStats["diskHits"]),
+        ("foreco_forecast_cache_misses_total", "counter", "Forecasts that had to be trained.", cacheStats["misses"]),
+        ("foreco_forecast_cache_size", "gauge", "Forecasts held in the in-memory cache.", cacheStats["size"]),
+        ("foreco_training_jobs_in_flight", "gauge", "Training jobs queued or running.", trainingJobs.inFlight()),
+        ("foreco_data_cache_hits_total", "counter", "Price data requests served from memory.", dataStats["hits"]),
+        ("foreco_data_cache_misses_total", "counter", "Price data requests that went to the price store.", dataStats["misses"]),
+        ("foreco_data_cache_coalesced_total", "counter", "Price data requests that waited on an identical or wider fetch already running.", dataStats["coalesced"]),
+        ("foreco_price_store_fetches_total", "counter", "Downloads the price store made for ranges it didn't cover.", priceStore.stats()["fetches"]),
+        ("foreco_price_store_fetched_rows_total", "counter", "Rows the price store downloaded.", priceStore.stats()["fetchedRows"]),
+        ("foreco_fundamentals_cache_hits_total", "counter", "Fundamentals tabs served from memory.", fundamentalsStats["hits"]),
+        ("foreco_fundamentals_cache_misses_total", "counter", "Fundamentals tabs that waited on a download.", fundamentalsStats["misses"]),
+        ("foreco_news_cache_hits_total", "counter", "News lists served from memory.", newsStats["hits"]),
+        ("foreco_news_cache_misses_total", "counter", "News lists that needed a request to MarketWatch.", newsStats["misses"]),
+        ("foreco_news_not_modified_total", "counter", "News requests answered with 304 Not Modified.", newsStats["notModified"]),
+        ("foreco_news_timeouts_total", "counter", "News lists that gave up waiting on MarketWatch.", newsStats["timeouts"])
+    ]
+
+metrics.addCollector(collectJobMetrics)
+
+app.server.before_request(metrics.startRequest)
+
+#Prometheus text format, the per-request trace log is turned on with FORECO_TRACE=1
+@app.server.route("/metrics")
+def metrics_endpoint():
+    return flask.Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+### ----- Open Browser and Run server ----- ###
+
+#Only in the main process, training job workers import this module again when they start
+if __name__ == "__main__":
+    webbrowser.open(url, new=0, autoraise=True)
+    app.run_server()
+
@@ -0,0 +1,91 @@
+//Clientside callbacks of the analysis page, registered in dashboards/analysis_dash.py
+//The server sends the price series and forecast numbers once, the figures and labels are drawn from them here
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    foreco: {
+        //Sparklines, candlestick and volume bars from the price-series-store, template is plotly's simple_white
+        priceFigures: function(series, template) {
+            if (!series) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+
+            var sparklineLayout = function(title) {
+                return {
+                    template: template,
+                    showlegend: false,
+                    plot_bgcolor: "white",
+                    margin: {t: 10, l: 10, b: 10, r: 10},
+                    height: 82,
+                    xaxis: {visible: false, fixedrange: true},
+                    yaxis: {visible: false, fixedrange: true},
+                    annotations: [{text: title, xref: "paper", yref: "paper", x: 0.00, y: 1.25, showarrow: false}]
+                };
+            };
+
+            var priceSparkline = {
+                data: [{type: "scatter", x: series.x, y: series.close, mode: "lines", line: {color: "#4E79A7"}}],
+                layout: sparklineLayout("Price:")
+            };
+
+            var volumeSparkline = {
+                data: [{type: "bar", x: series.x, y: series.volume, marker: {color: "#4E79A7"}}],
+                layout: sparklineLayout("Volume:")
+            };
+
+            var priceCandle = {
+                data: [{
+                    type: "candlestick",
+                    x: series.x,
+                    open: series.open,
+                    high: series.high,
+                    low: series.low,
+                    close: series.close,
+                    increasing: {fillcolor: "#6d93bb", line: {color: "#4E79A7"}},
+                    decreasing: {fillcolor: "#f5a85b", line: {color: "#F28E2B"}}
+                }],
+                layout: {
+                    title: {text: series.stockCode + " Price Movement"},
+                    yaxis: {title: {text: "Price"}},
+                    template: template,
+                    margin: {t: 60, l: 10, b: 10, r: 10},
+                    height: 500
+                }
+            };
+
+            var volumeBar = {
+                data: [{type: "bar", x: series.x, y: series.volume, marker: {color: "#4E79A7"}}],
+                layout: {
+                    title: {text: series.stockCode + " Trading Volume"},
+                    yaxis: {title: {text: "Volume"}},
+                    template: template,
+                    margin: {t: 60, l: 10, b: 10, r: 10},
+                    height: 250
+                }
+            };
+
+            return [priceSparkline, volumeSparkline, priceCandle, volumeBar];
+        },
+
+        //Suggestion, expected change and MAPE labels from the forecast-summary-store
+        forecastLabels: function(summary) {
+            if (!summary) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+
+            var blue = {color: "#4E79A7"};
+            var orange = {color: "#F28E2B"};
+
+            //With an ensemble the lower band has to end above the current price as well
+            var buy = summary.expectedChange - summary.mape > 0 && summary.worstChange > 0;
+
+            return [
+                buy ? "Yes" : "No",
+                buy ? blue : orange,
+                summary.expectedChange.toFixed(2) + "%",
+                summary.expectedChange > 0 ? blue : orange,
+                summary.mape.toFixed(2) + "%",
+                summary.mape < 5 ? blue : orange
+            ];
+        }
+    }
+});
@@ -0,0 +1,119 @@
+import os
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import forecast
+
+#origins are the dates of the last row known at each origin, actual and predicted are (origins, outputDim) close prices
+BacktestResult = namedtuple("BacktestResult", ["origins", "actual", "predicted", "originRmse", "originMape", "horizonRmse", "horizonMape", "rmse", "mape"])
+
+#Every error metric in one pass over the (origins, outputDim) arrays
+def evaluateBacktest(origins, actual, predicted):
+    errors = predicted - actual
+    squaredErrors = errors**2
+    percentageErrors = np.abs(errors / actual) * 100
+
+    return BacktestResult(
+        origins=origins,
+        actual=actual,
+        predicted=predicted,
+        originRmse=np.sqrt(squaredErrors.mean(axis=1)),
+        originMape=percentageErrors.mean(axis=1),
+        horizonRmse=np.sqrt(squaredErrors.mean(axis=0)),
+        horizonMape=percentageErrors.mean(axis=0),
+        rmse=float(np.sqrt(squaredErrors.mean())),
+        mape=float(percentageErrors.mean())
+    )
+
+#Origin row indices and the first training row of each, expanding windows always start at row 0
+def createOrigins(rows, outputDim, minTrainRows, step, mode):
+    origins = np.arange(minTrainRows-1, rows-outputDim, step)
+    if mode == "rolling":
+        starts = origins - minTrainRows + 1
+    else:
+        starts = np.zeros_like(origins)
+    return origins, starts
+
+### ----- WORKER PROCESS ----- ###
+
+workerStockData = None
+
+#The price array is sent to each worker once instead of with every origin
+def initBacktestWorker(stockDataArray):
+    global workerStockData
+    workerStockData = stockDataArray
+
+#Trains on rows start..origin and forecasts the outputDim closes after origin, the same way forecast.forecast would
+#have on that day, but without holding back a test set since the future rows are the test
+def forecastOrigin(start, origin, inputDim, outputDim, attributes, epochs, engine, fitOptions):
+    from sklearn.preprocessing import MinMaxScaler
+
+    forecast.setSeeds()
+    trainData = workerStockData[start:origin+1]
+
+    inputWindows, outputWindows, forecastInput = forecast.createWindows(trainData, inputDim, outputDim, attributes)
+    inputs_train, outputs_train = forecast.gatherWindows(inputWindows, outputWindows, np.arange(len(outputWindows)), attributes)
+
+    inputs_scaler = MinMaxScaler(feature_range=(0, 1))
+    outputs_scaler = MinMaxScaler(feature_range=(0, 1))
+    inputs_train_n = inputs_scaler.fit_transform(inputs_train)
+    outputs_train_n = outputs_scaler.fit_transform(outputs_train)
+
+    model = forecast.createEngine(engine, inputDim, outputDim, attributes)
+    model.fit(inputs_train_n, outputs_train_n, epochs, None, fitOptions)
+
+    forecastOutput_n = model.predict(inputs_scaler.transform(forecastInput.reshape(1, -1)))
+    return forecast.unnormaliseData(forecastOutput_n, outputs_scaler)[0]
+
+def forecastOrigins(origins, starts, inputDim, outputDim, attributes, epochs, engine, fitOptions):
+    return [forecastOrigin(start, origin, inputDim, outputDim, attributes, epochs, engine, fitOptions) for start, origin in zip(starts, origins)]
+
+#forecastOrigins as a task of a pool that isn't the backtest's own (the dashboard's training jobs), so the prices
+#are sent with the task
+def runBacktestTask(stockDataArray, origins, starts, inputDim, outputDim, attributes, epochs, engine, fitOptions):
+    initBacktestWorker(stockDataArray)
+    return forecastOrigins(origins, starts, inputDim, outputDim, attributes, epochs, engine, fitOptions)
+
+### ----- PARENT PROCESS ----- ###
+
+#The price array, origins and first training rows of a backtest
+def planBacktest(stockData_df, outputDim, minTrainRows=250, step=None, mode="expanding"):
+    stockDataArray = stockData_df.to_numpy()
+    origins, starts = createOrigins(len(stockDataArray), outputDim, minTrainRows, step or outputDim, mode)
+    if len(origins) == 0:
+        raise ValueError("Not enough rows for a {0} row training window and a {1} day forecast".format(minTrainRows, outputDim))
+    return stockDataArray, origins, starts
+
+#Scores the forecasts of every origin against the close prices that followed
+def collectBacktest(stockData_df, stockDataArray, origins, outputDim, predicted):
+    #Close prices of the outputDim rows after every origin, gathered in one indexing operation
+    actual = stockDataArray[origins[:, None] + np.arange(1, outputDim+1), 3] #3 is the close price column
+
+    return evaluateBacktest(stockData_df.index.values[origins], actual, np.array(predicted))
+
+#Walk-forward backtest: at every step-th row from minTrainRows on, train on the past (all of it when expanding,
+#the last minTrainRows rows when rolling) and forecast the next outputDim days
+#Origins are independent, so they're split across a process pool, maxWorkers=1 runs them in this process
+def walkForward(stockData_df, inputDim, outputDim, attributes, epochs, minTrainRows=250, step=None, mode="expanding", engine="keras",
+        maxWorkers=None, fitOptions=None):
+    stockDataArray, origins, starts = planBacktest(stockData_df, outputDim, minTrainRows, step, mode)
+
+    if maxWorkers is None:
+        #The closed-form ridge engine finishes every origin before a worker pool would have started
+        maxWorkers = 1 if engine == "ridge" else (os.cpu_count() or 1)
+    maxWorkers = max(1, min(maxWorkers, len(origins)))
+    if maxWorkers == 1:
+        initBacktestWorker(stockDataArray)
+        predicted = forecastOrigins(origins, starts, inputDim, outputDim, attributes, epochs, engine, fitOptions)
+    else:
+        #Contiguous chunks of origins per task keep the per-task overhead down
+        chunks = np.array_split(np.arange(len(origins)), maxWorkers)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=maxWorkers, mp_context=context, initializer=initBacktestWorker, initargs=(stockDataArray,)) as executor:
+            futures = [executor.submit(forecastOrigins, origins[chunk], starts[chunk], inputDim, outputDim, attributes, epochs, engine, fitOptions) for chunk in chunks]
+            predicted = [prediction for future in futures for prediction in future.result()]
+
+    return collectBacktest(stockData_df, stockDataArray, origins, outputDim, predicted)
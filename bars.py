@@ -0,0 +1,17 @@
+import datetime as dt
+
+#Bar intervals the dashboard offers, with how far back Yahoo serves each of them
+INTERVALS = {
+    "1d": None,
+    "60m": dt.timedelta(days=729),
+    "15m": dt.timedelta(days=59),
+    "5m": dt.timedelta(days=59),
+    "1m": dt.timedelta(days=6)
+}
+
+#Moves the start date forward to the oldest bar Yahoo keeps for the interval, so intraday downloads don't come back empty
+def clampStartDate(startDate, endDate, interval):
+    history = INTERVALS[interval]
+    if history is None:
+        return startDate
+    return max(startDate, endDate - history)
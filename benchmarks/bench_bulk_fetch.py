@@ -0,0 +1,43 @@
+#Run from the repository root with: python -m benchmarks.bench_bulk_fetch [tickers]
+#Downloads a basket one ticker at a time and then through downloadManyStockData, against a provider with 0.2-0.6 s per request
+#The synthetic provider has no grouped download, so the basket falls back to a download per ticker in a thread pool
+import sys
+import time
+import tempfile
+
+import data_access
+from price_store import PriceStore
+from data_access import DataAccess
+from benchmarks.synthetic import SyntheticProvider
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    stockCodes = ["T{0:02d}".format(i) for i in range(count)]
+    startDate, endDate = "2021-06-01", "2024-06-01"
+    provider = SyntheticProvider(latency=0.2, jitter=0.4)
+
+    #Fresh, empty caches for each run so both download everything
+    def resetCaches(storeDir):
+        data_access.dataAccess = DataAccess(PriceStore(storeDir, provider))
+
+    with tempfile.TemporaryDirectory() as storeDir:
+        resetCaches(storeDir + "/sequential")
+        startTime = time.perf_counter()
+        for stockCode in stockCodes:
+            data_access.downloadStockData(stockCode, startDate, endDate)
+        sequentialTime = time.perf_counter() - startTime
+
+        resetCaches(storeDir + "/bulk")
+        startTime = time.perf_counter()
+        stockData = data_access.downloadManyStockData(stockCodes, startDate, endDate)
+        closes_df = data_access.alignStockData(stockData, "Close")
+        bulkTime = time.perf_counter() - startTime
+
+    slowest = max(provider.delay(stockCode) for stockCode in stockCodes)
+    print("{0} tickers, aligned frame {1}".format(count, closes_df.shape))
+    print("Sequential:     {0:.2f} s".format(sequentialTime))
+    print("Bulk:           {0:.2f} s".format(bulkTime))
+    print("Slowest ticker: {0:.2f} s".format(slowest))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#Run from the repository root with: python -m benchmarks.bench_data_access
+#A burst of identical requests from many threads, then repeated requests for ranges inside the fetched one
+import time
+import tempfile
+import threading
+
+from price_store import PriceStore
+from data_access import DataAccess
+from benchmarks.synthetic import SyntheticProvider
+
+def burst(get, threads, startDate, endDate):
+    workers = [threading.Thread(target=get, args=("SYN", startDate, endDate)) for _ in range(threads)]
+    startTime = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - startTime
+
+def timeRepeats(get, startDate, endDate, repeats=200):
+    startTime = time.perf_counter()
+    for _ in range(repeats):
+        get("SYN", startDate, endDate)
+    return (time.perf_counter() - startTime) / repeats
+
+def main():
+    threads = 16
+    with tempfile.TemporaryDirectory() as storeDir:
+        provider = SyntheticProvider(latency=0.3)
+        dataAccess = DataAccess(PriceStore(storeDir, provider))
+
+        seconds = burst(dataAccess.get, threads, "2021-06-01", "2024-06-01")
+        print("{0} concurrent requests: {1:.3f} s, {2} download(s), stats {3}".format(threads, seconds, provider.calls, dataAccess.stats()))
+
+        memoryTime = timeRepeats(dataAccess.get, "2023-06-01", "2024-06-01")
+        diskTime = timeRepeats(dataAccess.store.get, "2023-06-01", "2024-06-01")
+        print("1 year subset: {0:.3f} ms from memory, {1:.3f} ms from the price store".format(memoryTime*1000, diskTime*1000))
+        print("Stats after the subset requests: {0}".format(dataAccess.stats()))
+
+if __name__ == "__main__":
+    main()
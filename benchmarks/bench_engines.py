@@ -0,0 +1,32 @@
+#Run from the repository root with: python -m benchmarks.bench_engines [recorded.csv ...]
+#Recorded data is any CSV saved from yf.download(...).to_csv()
+import sys
+import time
+
+import pandas as pd
+
+import forecast
+from benchmarks.synthetic import generateStockData
+
+def loadDatasets(paths):
+    datasets = [("synthetic-{0}".format(rows), generateStockData(rows, seed=rows)) for rows in [150, 750]]
+    for path in paths:
+        datasets.append((path, pd.read_csv(path, index_col="Date", parse_dates=True)))
+    return datasets
+
+def main():
+    inputDim, outputDim, attributes, epochs = 20, 10, [0, 1, 2, 3, 4, 5], 50
+
+    rows = []
+    for name, stockData_df in loadDatasets(sys.argv[1:]):
+        for engine in forecast.ENGINES:
+            startTime = time.perf_counter()
+            mape = forecast.forecast(stockData_df, inputDim, outputDim, attributes, epochs, engine)[4]
+            rows.append((name, engine, time.perf_counter() - startTime, mape))
+
+    print("{:<24} {:>8} {:>12} {:>8}".format("dataset", "engine", "latency (s)", "MAPE"))
+    for name, engine, latency, mape in rows:
+        print("{:<24} {:>8} {:>12.4f} {:>8.3f}".format(name, engine, latency, mape))
+
+if __name__ == "__main__":
+    main()
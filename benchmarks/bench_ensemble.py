@@ -0,0 +1,41 @@
+#Run from the repository root with: python -m benchmarks.bench_ensemble
+#Cost of the batched seed ensemble against replicas separate trainings, and how often the test outputs fall inside its band
+import time
+
+import numpy as np
+
+import forecast
+from benchmarks.synthetic import generateStockData
+
+def main():
+    inputDim, outputDim, attributes, epochs = 20, 10, [0, 1, 2, 3, 4, 5], 50
+    stockData_df = generateStockData(750)
+
+    #Warms up tensorflow, so neither timing includes its start up
+    forecast.forecast(stockData_df, inputDim, outputDim, attributes, 1)
+
+    startTime = time.perf_counter()
+    singleMape = forecast.forecast(stockData_df, inputDim, outputDim, attributes, epochs)[4]
+    singleTime = time.perf_counter() - startTime
+
+    #Same split and scaling as forecastWithModel, so the replica predictions of the test set can be scored against the band
+    forecast.setSeeds()
+    inputs_train, inputs_test, outputs_train, outputs_test, forecastInput = forecast.splitData(stockData_df.to_numpy(), inputDim, outputDim, attributes)
+
+    startTime = time.perf_counter()
+    results = forecast.forecastWithModel(stockData_df, inputDim, outputDim, attributes, epochs, engine="ensemble")
+    ensembleTime = time.perf_counter() - startTime
+    ensembleMape, model, inputs_scaler, outputs_scaler = results[4], results[6], results[7], results[8]
+    replicas = model.replicas
+
+    bands_n = model.predictBands(inputs_scaler.transform(inputs_test))
+    lower, upper = (outputs_scaler.inverse_transform(bands_n[column]) for column in ["Lower", "Upper"])
+    coverage = np.mean((outputs_test >= lower) & (outputs_test <= upper)) * 100
+
+    print("Single model:     {0:.2f} s, MAPE {1:.3f}".format(singleTime, singleMape))
+    print("{0} replicas:      {1:.2f} s, MAPE {2:.3f}".format(replicas, ensembleTime, ensembleMape))
+    print("Cost ratio:       {0:.2f}x a single model, {1:.0%} of {2} separate trainings".format(ensembleTime/singleTime, ensembleTime/(singleTime*replicas), replicas))
+    print("Test coverage of the {0:.0%}-{1:.0%} band: {2:.1f}%".format(*model.quantiles, coverage))
+
+if __name__ == "__main__":
+    main()
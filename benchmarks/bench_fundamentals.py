@@ -0,0 +1,54 @@
+#Run from the repository root with: python -m benchmarks.bench_fundamentals [--latency 0.3]
+#Flips through the five fundamentals tabs of a few tickers against a synthetic replay recording, each dataset
+#download waiting --latency seconds like a round trip to Yahoo. Compares fetching every tab from a new ticker object
+#(what change_tab_content did) with the fundamentals cache after update_news' prefetch.
+import time
+import argparse
+import tempfile
+
+import providers
+from providers import TICKER_DATASETS
+from fundamentals import FundamentalsCache
+from benchmarks.synthetic import SyntheticProvider
+
+STOCK_CODES = ["AAPL", "MSFT", "GOOGL"]
+
+def flipTabs(get, stockCode):
+    timings = []
+    for dataset in TICKER_DATASETS:
+        startTime = time.perf_counter()
+        get(stockCode, dataset)
+        timings.append(time.perf_counter() - startTime)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as recording:
+        providers.record(SyntheticProvider(), recording, STOCK_CODES, "2022-01-01", "2022-02-01")
+        replay = providers.ReplayProvider(recording, latency=args.latency)
+
+        uncached = []
+        for stockCode in STOCK_CODES:
+            uncached += flipTabs(lambda stockCode, dataset: getattr(replay.ticker(stockCode), dataset), stockCode)
+
+        cache = FundamentalsCache(replay)
+        prefetched = []
+        revisited = []
+        for stockCode in STOCK_CODES:
+            #Selecting the ticker starts the prefetch, the first tab is opened right after
+            cache.prefetch(stockCode)
+            prefetched += flipTabs(cache.get, stockCode)
+        for stockCode in STOCK_CODES:
+            revisited += flipTabs(cache.get, stockCode)
+
+    print("Tab switches over {0} tickers, {1} s per download:".format(len(STOCK_CODES), args.latency))
+    for name, timings in [("uncached", uncached), ("prefetched", prefetched), ("revisited", revisited)]:
+        print("    {0:<11} total {1:>7.3f} s, worst tab {2:>8.3f} ms, median tab {3:>8.3f} ms".format(name, sum(timings), max(timings)*1000,
+            sorted(timings)[len(timings)//2]*1000))
+    print("Cache stats: {0}".format(cache.stats()))
+
+if __name__ == "__main__":
+    main()
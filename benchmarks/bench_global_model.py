@@ -0,0 +1,34 @@
+#Run from the repository root with: python -m benchmarks.bench_global_model
+import time
+
+import numpy as np
+
+import forecast
+from global_model import forecastGlobal
+from benchmarks.synthetic import generateStockData
+
+def main():
+    inputDim, outputDim, attributes, epochs = 20, 10, [0, 1, 2, 3, 4, 5], 50
+
+    print("{:>8} {:>12} {:>12} {:>12} {:>12} {:>10}".format("tickers", "loop (t/s)", "global (t/s)", "embed (t/s)", "loop MAPE", "glob MAPE"))
+    for tickerCount in [5, 10, 25]:
+        stockData = {"SYN{0}".format(i): generateStockData(500, seed=i) for i in range(tickerCount)}
+
+        startTime = time.perf_counter()
+        loopMapes = [forecast.forecast(stockData_df, inputDim, outputDim, attributes, epochs)[4] for stockData_df in stockData.values()]
+        loopTime = time.perf_counter() - startTime
+
+        startTime = time.perf_counter()
+        results = forecastGlobal(stockData, inputDim, outputDim, attributes, epochs)
+        globalTime = time.perf_counter() - startTime
+
+        startTime = time.perf_counter()
+        forecastGlobal(stockData, inputDim, outputDim, attributes, epochs, embeddingDim=4)
+        embeddingTime = time.perf_counter() - startTime
+
+        globalMapes = [result[4] for result in results.values()]
+        print("{:>8} {:>12.2f} {:>12.2f} {:>12.2f} {:>12.3f} {:>10.3f}".format(tickerCount, tickerCount/loopTime, tickerCount/globalTime,
+            tickerCount/embeddingTime, np.mean(loopMapes), np.mean(globalMapes)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#Run from the repository root with: python -m benchmarks.bench_import_time [--tree PATH] [module ...]
+#--tree measures another checkout, e.g. one made with: git worktree add /tmp/before <commit>
+#Importing app also runs its import time work, so the report shows what the server waits on before it can bind
+import os
+import sys
+import argparse
+import subprocess
+
+#Parses the stderr of python -X importtime into {module: (self us, cumulative us)}
+def parseImportTime(stderr):
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        selfTime, cumulativeTime, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(selfTime), int(cumulativeTime))
+    return modules
+
+def measureImport(module, tree):
+    environment = dict(os.environ, BROWSER="true", TF_CPP_MIN_LOG_LEVEL="3") #BROWSER=true stops app.py opening a browser tab
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "import {0}".format(module)],
+        cwd=tree, env=environment, capture_output=True, text=True)
+    return parseImportTime(completed.stderr)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modules", nargs="*", default=["forecast", "app"])
+    parser.add_argument("--tree", default=os.getcwd())
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        modules = measureImport(module, args.tree)
+        if module not in modules:
+            print("{0}: import failed".format(module))
+            continue
+
+        print("{0}: {1:.3f} s".format(module, modules[module][1] / 1e6))
+        #Only top level packages, so nested imports aren't counted twice
+        packages = sorted(((cumulativeTime, name) for name, (selfTime, cumulativeTime) in modules.items() if "." not in name and name != module), reverse=True)
+        for cumulativeTime, name in packages[:args.top]:
+            print("    {0:<28} {1:>8.3f} s".format(name, cumulativeTime / 1e6))
+
+if __name__ == "__main__":
+    main()
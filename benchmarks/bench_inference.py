@@ -0,0 +1,35 @@
+#Run from the repository root with: python -m benchmarks.bench_inference
+import timeit
+
+import numpy as np
+
+import forecast
+from benchmarks.synthetic import generateStockData
+
+def main():
+    inputDim, outputDim, attributes, epochs = 20, 10, [0, 1, 2, 3, 4, 5], 10
+    forecastResults, outputs_test, outputs_pred, rmse, mape, history, model, inputs_scaler, outputs_scaler = forecast.forecastWithModel(
+        generateStockData(750), inputDim, outputDim, attributes, epochs)
+
+    rng = np.random.default_rng(3)
+    print("{:>6} {:>16} {:>16} {:>9} {:>12}".format("batch", "predict (ms)", "numpy (ms)", "speedup", "max diff"))
+    for batch in [1, 32, 256]:
+        inputs_n = rng.random((batch, inputDim*len(attributes)))
+
+        kerasOutputs = model.model.predict(inputs_n, verbose=0)
+        numpyOutputs = model.inference.predict(inputs_n)
+
+        repeats = 50
+        kerasTime = min(timeit.repeat(lambda: model.model.predict(inputs_n, verbose=0), number=1, repeat=repeats))
+        numpyTime = min(timeit.repeat(lambda: model.inference.predict(inputs_n), number=1, repeat=repeats))
+
+        print("{:>6} {:>16.3f} {:>16.4f} {:>8.0f}x {:>12.2e}".format(batch, kerasTime*1000, numpyTime*1000, kerasTime/numpyTime, np.abs(kerasOutputs-numpyOutputs).max()))
+
+    #Serving a forecast from a trained model and its scalers, as after a registry load
+    inputWindows, outputWindows, forecastInput = forecast.createWindows(generateStockData(750).to_numpy(), inputDim, outputDim, attributes)
+    forecastInput = forecastInput.reshape(1, -1)
+    serveTime = min(timeit.repeat(lambda: outputs_scaler.inverse_transform(model.predict(inputs_scaler.transform(forecastInput))), number=1, repeat=200))
+    print("Scale, predict and unscale one window: {:.3f} ms".format(serveTime*1000))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#Run from the repository root with: python -m benchmarks.bench_interactions [--tree PATH ...]
+#--tree measures other checkouts (several for a side by side table), e.g. one made with: git worktree add /tmp/before <commit>
+#Plays the Dash renderer against the analysis page over Flask's test client: loads the page, then changes each input
+#in turn and fires every callback the change reaches, the way the browser would, in dependency order, including the
+#training job polling. Data comes from a synthetic replay recording, so every tree sees the same prices.
+#Reported per input: server callbacks fired, bytes of responses, server CPU time, time until the callbacks settled
+#(not counting training) and until the forecast was back on screen. Clientside callbacks are the browser's work and
+#aren't run, training runs in the job workers and isn't in the CPU time.
+import os
+import sys
+import json
+import time
+import argparse
+import datetime as dt
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+#(component id, property, new value), applied in this order to the page as the previous ones left it
+def createInteractions():
+    today = dt.date.today()
+    return [
+        ("epochs-slider", "value", 20),
+        ("input-days-input", "value", 30),
+        ("output-days-input", "value", 5),
+        ("attributes-select-dropdown", "value", [3]),
+        ("engine-select-dropdown", "value", "ridge"),
+        ("early-stopping-checklist", "value", ["early-stopping"]),
+        ("time-budget-input", "value", 30),
+        ("start-date-picker", "date", (today - dt.timedelta(days=200)).isoformat()),
+        ("end-date-picker", "date", (today - dt.timedelta(days=7)).isoformat()),
+        ("stock-select-dropdown", "value", "MSFT"),
+        ("interval-select-dropdown", "value", "60m")
+    ]
+
+#"id.property" or "..id.property...id.property.." for several outputs
+def parseOutputs(output):
+    if output.startswith(".."):
+        output = output[2:-2]
+    return [tuple(part.rsplit(".", 1)) for part in output.split("...")]
+
+#Every component with an id in a layout, as {(id, property): value}
+def collectProps(component, props):
+    if isinstance(component, list):
+        for child in component:
+            collectProps(child, props)
+    elif isinstance(component, dict) and "props" in component and "type" in component:
+        componentId = component["props"].get("id")
+        for name, value in component["props"].items():
+            if isinstance(componentId, str):
+                props[componentId, name] = value
+            collectProps(value, props)
+    return props
+
+class Renderer:
+    def __init__(self, client):
+        self.client = client
+        self.callbacks = []
+        for dependency in client.get("/_dash-dependencies").get_json():
+            if dependency.get("clientside_function"):
+                continue
+            self.callbacks.append({
+                "output": dependency["output"],
+                "outputs": parseOutputs(dependency["output"]),
+                "inputs": [(item["id"], item["property"]) for item in dependency["inputs"]],
+                "state": [(item["id"], item["property"]) for item in dependency["state"]],
+                "preventInitialCall": dependency.get("prevent_initial_call", False)
+            })
+        self.props = collectProps(client.get("/_dash-layout").get_json(), {})
+        self.ids = {componentId for componentId, name in self.props}
+        self.calls = 0
+        self.bytes = 0
+
+    def call(self, callback, changed):
+        outputs = [{"id": componentId, "property": name} for componentId, name in callback["outputs"]]
+        body = {
+            "output": callback["output"],
+            "outputs": outputs if callback["output"].startswith("..") else outputs[0],
+            "inputs": [{"id": componentId, "property": name, "value": self.props.get((componentId, name))} for componentId, name in callback["inputs"]],
+            "state": [{"id": componentId, "property": name, "value": self.props.get((componentId, name))} for componentId, name in callback["state"]],
+            "changedPropIds": ["{0}.{1}".format(*prop) for prop in changed if prop in callback["inputs"]]
+        }
+        response = self.client.post("/_dash-update-component", data=json.dumps(body), content_type="application/json")
+        self.calls += 1
+        self.bytes += len(response.data)
+        if response.status_code == 204: #PreventUpdate
+            return {}
+        if response.status_code != 200:
+            raise RuntimeError("{0} failed with status {1}".format(callback["output"], response.status_code))
+
+        data = response.get_json()
+        if data.get("multi"):
+            return {(componentId, name): value for componentId, values in data["response"].items() for name, value in values.items()}
+        componentId, name = callback["outputs"][0]
+        return {(componentId, name): data["response"]["props"][name]}
+
+    #Callbacks with an input in changed, and (initial) those whose inputs just appeared in the layout
+    def triggered(self, changed, newIds):
+        triggered = set()
+        for i, callback in enumerate(self.callbacks):
+            if not all(componentId in self.ids for componentId, name in callback["inputs"]):
+                continue
+            if any(prop in changed for prop in callback["inputs"]):
+                triggered.add(i)
+            elif not callback["preventInitialCall"] and any(componentId in newIds for componentId, name in callback["inputs"]):
+                triggered.add(i)
+        return triggered
+
+    #Runs callbacks until nothing else is triggered, a callback only runs once none of its inputs are still to be
+    #updated by another pending one. Callbacks that are ready together run concurrently like the browser's requests.
+    def settle(self, changed, newIds=()):
+        pending = self.triggered(changed, set(newIds))
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            while pending:
+                pendingOutputs = {i: set(self.callbacks[i]["outputs"]) for i in pending}
+                ready = [i for i in pending if not any(prop in pendingOutputs[j] for j in pending if j != i for prop in self.callbacks[i]["inputs"])]
+                ready = ready or list(pending)
+                pending -= set(ready)
+
+                responses = list(executor.map(lambda i: self.call(self.callbacks[i], changed), ready))
+                changed = {}
+                for response in responses:
+                    changed.update(response)
+
+                newIds = set()
+                for (componentId, name), value in changed.items():
+                    self.props[componentId, name] = value
+                    newProps = collectProps(value, {})
+                    self.props.update(newProps)
+                    newIds |= {newId for newId, newName in newProps} - self.ids
+                self.ids |= newIds
+                pending |= self.triggered(changed, newIds)
+
+    #The training job interval ticks until update_forecast_figures disables it
+    def pollTraining(self, timeout):
+        deadline = time.perf_counter() + timeout
+        while self.props.get(("forecast-job-interval", "disabled")) is False and time.perf_counter() < deadline:
+            time.sleep(self.props.get(("forecast-job-interval", "interval"), 500) / 1000)
+            prop = ("forecast-job-interval", "n_intervals")
+            self.props[prop] = (self.props.get(prop) or 0) + 1
+            self.settle({prop: self.props[prop]})
+
+    def interact(self, componentId, name, value, timeout):
+        self.calls = 0
+        self.bytes = 0
+        self.props[componentId, name] = value
+
+        startTime = time.perf_counter()
+        startCpu = time.process_time()
+        self.settle({(componentId, name): value})
+        responseTime = time.perf_counter() - startTime
+        cpuTime = time.process_time() - startCpu
+        calls = self.calls
+        self.pollTraining(timeout)
+        return {"calls": calls, "bytes": self.bytes, "cpu": cpuTime, "response": responseTime, "settled": time.perf_counter() - startTime}
+
+def measure(timeout):
+    import app
+
+    renderer = Renderer(app.app.server.test_client())
+    renderer.interact("url", "pathname", "/", timeout)
+
+    results = {}
+    for componentId, name, value in createInteractions():
+        results[componentId] = renderer.interact(componentId, name, value, timeout)
+        print("{0}: {1}".format(componentId, results[componentId]), file=sys.stderr)
+    return results
+
+def runTree(tree, recording, timeout):
+    with tempfile.TemporaryDirectory() as stateDir:
+        environment = dict(os.environ, BROWSER="true", TF_CPP_MIN_LOG_LEVEL="3", FORECO_PROVIDER="replay:" + recording,
+            FORECO_PRICE_STORE_DIR=os.path.join(stateDir, "prices"),
+            FORECO_MODEL_REGISTRY_DIR=os.path.join(stateDir, "models"))
+        environment.pop("FORECO_FORECAST_CACHE_DIR", None)
+
+        completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--measure", "--timeout", str(timeout)],
+            cwd=tree, env=dict(environment, PYTHONPATH=tree), stdout=subprocess.PIPE, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError("Measuring {0} failed".format(tree))
+        return json.loads(completed.stdout.splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tree", action="append")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        sys.path.insert(0, os.getcwd())
+        print(json.dumps(measure(args.timeout)))
+        return
+
+    import providers
+    from benchmarks.synthetic import SyntheticProvider
+
+    trees = args.tree or [os.getcwd()]
+    with tempfile.TemporaryDirectory() as recording:
+        today = dt.date.today()
+        providers.record(SyntheticProvider(), recording, ["AAPL", "MSFT"], (today - dt.timedelta(days=3*365)).isoformat(),
+            (today + dt.timedelta(days=1)).isoformat(), ["1d", "60m"])
+        results = [runTree(os.path.abspath(tree), recording, args.timeout) for tree in trees]
+
+    print("{:<28}".format("input") + "".join("{:>45}".format(tree[-43:]) for tree in trees))
+    print("{:<28}".format("") + "".join("{:>7} {:>10} {:>8} {:>8} {:>8}".format("calls", "bytes", "cpu s", "resp s", "total s") for tree in trees))
+    for componentId, name, value in createInteractions():
+        print("{:<28}".format(componentId) + "".join("{calls:>7} {bytes:>10} {cpu:>8.3f} {response:>8.3f} {settled:>8.3f}".format(**result[componentId])
+            for result in results))
+
+if __name__ == "__main__":
+    main()
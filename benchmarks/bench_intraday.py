@@ -0,0 +1,57 @@
+#Run from the repository root with: python -m benchmarks.bench_intraday [rows]
+#Windowing and training throughput on a memory-mapped history of 1 minute bars, far longer than the few thousand
+#intraday bars Yahoo serves the dashboard, to show the streaming pipeline working straight off a file
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import forecast
+import streaming
+from benchmarks.synthetic import generateIntradayData
+
+def isMapped(array):
+    while array is not None and not isinstance(array, np.memmap):
+        array = array.base
+    return array is not None
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1200000
+    inputDim, outputDim, attributes, batchSize = 60, 15, [0, 1, 2, 3, 4, 5], 1024
+
+    with tempfile.TemporaryDirectory() as storeDir:
+        stockData_df = generateIntradayData(rows, "1m")
+        valuesPath = os.path.join(storeDir, "values.npy")
+        np.save(valuesPath, stockData_df.to_numpy(dtype=np.float32))
+
+        #A single block frame keeps the mapped array, to_numpy() hands it back without copying
+        startTime = time.perf_counter()
+        stockData_df = pd.DataFrame(np.load(valuesPath, mmap_mode="r"), index=stockData_df.index, columns=stockData_df.columns, copy=False)
+        print("Loaded {0} bars in {1:.3f} s".format(len(stockData_df), time.perf_counter() - startTime))
+
+        #The windows are views straight onto the mapped file
+        stockDataArray = stockData_df.to_numpy(dtype=np.float32)
+        startTime = time.perf_counter()
+        inputWindows, outputWindows, forecastInput = forecast.createWindows(stockDataArray, inputDim, outputDim, attributes)
+        print("Windowed {0} samples in {1:.4f} s, views onto the mapped file: {2}".format(len(outputWindows), time.perf_counter() - startTime,
+            isMapped(inputWindows) and isMapped(outputWindows)))
+
+        indices = np.random.default_rng(3).permutation(len(outputWindows))
+        startTime = time.perf_counter()
+        for inputs, outputs in streaming.windowBatches(inputWindows, outputWindows, indices, attributes, batchSize):
+            pass
+        gatherTime = time.perf_counter() - startTime
+        print("Gathered shuffled batches at {0:,.0f} windows/s".format(len(indices) / gatherTime))
+
+        startTime = time.perf_counter()
+        forecastResults, outputs_test, outputs_pred, rmse, mape, history = streaming.forecastStreaming(stockData_df, inputDim, outputDim, attributes, 1, batchSize)
+        trainTime = time.perf_counter() - startTime
+        print("Trained one streaming epoch at {0:,.0f} windows/s ({1:.1f} s, MAPE {2:.3f})".format(len(outputWindows) / trainTime, trainTime, mape))
+
+        print("Last bar {0}, forecast bars {1} to {2}".format(stockData_df.index[-1], forecastResults.index[0], forecastResults.index[-1]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+#Run from the repository root with: python -m benchmarks.bench_metrics
+#Cost of a timing span, against the callbacks it wraps, which take milliseconds at the very least
+import timeit
+
+from metrics import Metrics
+
+def main():
+    metrics = Metrics()
+
+    def bare():
+        pass
+
+    timedFunction = metrics.timed("bench")(bare)
+
+    def spanned():
+        with metrics.span("bench"):
+            pass
+
+    number = 200000
+    bareTime = min(timeit.repeat(bare, number=number, repeat=5)) / number
+    timedTime = min(timeit.repeat(timedFunction, number=number, repeat=5)) / number
+    spanTime = min(timeit.repeat(spanned, number=number, repeat=5)) / number
+
+    print("Bare call:        {0:.3f} us".format(bareTime * 1e6))
+    print("Timed decorator:  {0:.3f} us (+{1:.3f} us)".format(timedTime * 1e6, (timedTime - bareTime) * 1e6))
+    print("Span:             {0:.3f} us (+{1:.3f} us)".format(spanTime * 1e6, (spanTime - bareTime) * 1e6))
+    print("Render of {0} spans: {1:.3f} ms".format(len(metrics.spans), min(timeit.repeat(metrics.render, number=100, repeat=5)) / 100 * 1e3))
+
+if __name__ == "__main__":
+    main()
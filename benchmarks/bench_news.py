@@ -0,0 +1,70 @@
+#Run from the repository root with: python -m benchmarks.bench_news [--filler 4000] [--latency 0.5]
+#Parses a synthetic MarketWatch page padded with --filler blocks of other markup (about the size of the real page)
+#the way createNewsList used to (html.parser, four searches for the news module) and with news.parseNews, then
+#times the news cache against a replay recording answering after --latency seconds: a first view, a repeated view
+#and a stale view revalidated with a conditional request
+import re
+import time
+import argparse
+import tempfile
+
+import providers
+from news import NewsCache, parseNews
+from benchmarks.synthetic import SyntheticProvider
+
+def padPage(newsHtml, filler):
+    block = '<div class="element"><p class="summary">Markets moved on the day as investors weighed the outlook.</p><a href="/story/{0}">More</a><span class="tag">Markets</span></div>'
+    padding = "".join(block.format(i) for i in range(filler // 2))
+    return newsHtml.replace("<body>", "<body>" + padding).replace("</body>", padding + "</body>")
+
+#createNewsList's parsing before the news cache
+def parseWithSoup(newsHtml):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(newsHtml, 'html.parser')
+    headlines = soup.find('mw-scrollable-news-v2').find_all("h3")
+    links = soup.find('mw-scrollable-news-v2').find_all("a", attrs={'href': re.compile("^https://")})
+    providers = soup.find('mw-scrollable-news-v2').find_all("span", {"class": "article__author"})
+    timestamps = soup.find('mw-scrollable-news-v2').find_all("span", {"class": "article__timestamp"})
+    return [{"headline": headlines[i].text.strip(), "link": links[i*2].get("href"), "timestamp": timestamps[i].text.strip(),
+        "provider": providers[i].text.strip()} for i in range(10)]
+
+def timeCall(function, *args, repeats=1):
+    startTime = time.perf_counter()
+    for _ in range(repeats):
+        result = function(*args)
+    return (time.perf_counter() - startTime) / repeats, result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filler", type=int, default=4000)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    newsHtml = padPage(SyntheticProvider().news("AAPL")[0], args.filler)
+    soupTime, soupNews = timeCall(parseWithSoup, newsHtml, repeats=args.repeats)
+    lxmlTime, lxmlNews = timeCall(parseNews, newsHtml, repeats=args.repeats)
+    assert soupNews == lxmlNews
+    print("Parsing a {0:.0f} KB page: html.parser {1:.2f} ms, parseNews {2:.2f} ms ({3:.0f}x)".format(len(newsHtml)/1024, soupTime*1000, lxmlTime*1000,
+        soupTime/lxmlTime))
+
+    with tempfile.TemporaryDirectory() as recording:
+        providers.record(SyntheticProvider(), recording, ["AAPL"], "2022-01-01", "2022-02-01")
+        with open(providers.ReplayProvider(recording).tickerPath("AAPL", "news.html"), "w", encoding="utf-8") as f:
+            f.write(newsHtml)
+
+        newsCache = NewsCache(providers.ReplayProvider(recording, latency=args.latency), ttl=60, timeout=args.latency*4)
+        firstTime, _ = timeCall(newsCache.get, "AAPL")
+        repeatTime, _ = timeCall(newsCache.get, "AAPL", repeats=args.repeats)
+        newsCache.ttl = 0
+        staleTime, _ = timeCall(newsCache.get, "AAPL")
+
+    print("News cache with {0} s per request:".format(args.latency))
+    print("    first view     {0:>9.3f} ms".format(firstTime*1000))
+    print("    repeated view  {0:>9.3f} ms".format(repeatTime*1000))
+    print("    stale view     {0:>9.3f} ms (conditional request, not parsed again)".format(staleTime*1000))
+    print("Stats: {0}".format(newsCache.stats()))
+
+if __name__ == "__main__":
+    main()
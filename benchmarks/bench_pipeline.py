@@ -0,0 +1,155 @@
+#Run from the repository root with: python -m benchmarks.bench_pipeline [--output results.json] [--baseline baseline.json]
+#Times every stage of forecast.forecast on synthetic data across history lengths, window sizes and attribute counts
+#Comparing against a baseline exits with status 1 when any stage got slower than the threshold allows, e.g.
+#    python -m benchmarks.bench_pipeline --output baseline.json
+#    (make changes)
+#    python -m benchmarks.bench_pipeline --output results.json --baseline baseline.json --threshold 0.2
+import io
+import sys
+import json
+import time
+import platform
+import argparse
+import itertools
+import contextlib
+import subprocess
+
+import numpy as np
+
+import forecast
+from benchmarks.synthetic import generateStockData
+
+STAGES = ["splitData", "normaliseData", "compileModel", "fitModel", "testModel", "forecast"]
+
+#One pass through the pipeline stage by stage, the same calls forecast.forecastWithModel makes
+def timeStages(stockData_df, inputDim, outputDim, attributes, epochs):
+    from sklearn.preprocessing import MinMaxScaler
+
+    timings = {}
+    stockDataArray = stockData_df.to_numpy()
+
+    startTime = time.perf_counter()
+    inputs_train, inputs_test, outputs_train, outputs_test, forecastInput = forecast.splitData(stockDataArray, inputDim, outputDim, attributes)
+    timings["splitData"] = time.perf_counter() - startTime
+
+    inputs_scaler = MinMaxScaler(feature_range=(0, 1))
+    outputs_scaler = MinMaxScaler(feature_range=(0, 1))
+    startTime = time.perf_counter()
+    inputs_train_n, inputs_test_n, outputs_train_n, outputs_test_n, forecastInput_n = forecast.normaliseData(inputs_train, inputs_test, outputs_train,
+        outputs_test, forecastInput, inputs_scaler, outputs_scaler, outputDim)
+    timings["normaliseData"] = time.perf_counter() - startTime
+
+    #The keras engine is compileModel, its fit is fitModel and its predictions are what testModel times
+    startTime = time.perf_counter()
+    model = forecast.createEngine("keras", inputDim, outputDim, attributes)
+    timings["compileModel"] = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    model.fit(inputs_train_n, outputs_train_n, epochs)
+    timings["fitModel"] = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    forecast.testModel(model, inputs_test_n, outputs_test_n, outputs_scaler)
+    timings["testModel"] = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    forecast.forecast(stockData_df, inputDim, outputDim, attributes, epochs)
+    timings["forecast"] = time.perf_counter() - startTime
+
+    return timings
+
+def resultKey(result):
+    return "{stage}|{rows}|{inputDim}|{outputDim}|{attributeCount}".format(**result)
+
+def describeEnvironment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+
+    import tensorflow as tf
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "tensorflow": tf.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor()
+    }
+
+def runSuite(rowsList, windows, attributeSets, epochs, repeats):
+    results = []
+    configs = list(itertools.product(rowsList, windows, attributeSets))
+
+    for i, (rows, (inputDim, outputDim), attributes) in enumerate(configs):
+        stockData_df = generateStockData(rows, seed=rows)
+
+        #Keras' model summaries and progress bars would drown the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            runs = [timeStages(stockData_df, inputDim, outputDim, attributes, epochs) for _ in range(repeats)]
+
+        for stage in STAGES:
+            #The fastest run is the least disturbed by everything else on the machine
+            seconds = min(run[stage] for run in runs)
+            results.append({"stage": stage, "rows": rows, "inputDim": inputDim, "outputDim": outputDim, "attributeCount": len(attributes), "seconds": seconds})
+
+        print("[{0}/{1}] rows={2} window={3}/{4} attributes={5}: forecast {6:.3f} s".format(i+1, len(configs), rows, inputDim, outputDim, len(attributes),
+            results[-1]["seconds"]), file=sys.stderr)
+
+    return results
+
+#Stages slower than the baseline by more than threshold (a fraction), ignoring ones too quick to time reliably
+def compareResults(results, baseline, threshold, minSeconds):
+    baselineSeconds = {resultKey(result): result["seconds"] for result in baseline["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baselineSeconds.get(resultKey(result))
+        if previous is None or max(result["seconds"], previous) < minSeconds:
+            continue
+        change = result["seconds"] / previous - 1
+        if change > threshold:
+            regressions.append((resultKey(result), previous, result["seconds"], change))
+
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", default="bench_pipeline.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--min-seconds", type=float, default=0.005)
+    parser.add_argument("--rows", type=int, nargs="+", default=[250, 750, 2500])
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    windows = [(10, 5), (20, 10), (60, 20)]
+    attributeSets = [[3], [0, 1, 2, 3], [0, 1, 2, 3, 4, 5]]
+
+    forecast.setSeeds() #Imports tensorflow up front, so its start up isn't timed as part of the first stage
+    results = runSuite(args.rows, windows, attributeSets, args.epochs, args.repeats)
+
+    with open(args.output, "w") as f:
+        json.dump({"environment": describeEnvironment(), "epochs": args.epochs, "repeats": args.repeats, "results": results}, f, indent=2)
+
+    print("{:<14} {:>6} {:>9} {:>11} {:>12}".format("stage", "rows", "window", "attributes", "seconds"))
+    for result in results:
+        print("{stage:<14} {rows:>6} {window:>9} {attributeCount:>11} {seconds:>12.5f}".format(window="{0}/{1}".format(result["inputDim"], result["outputDim"]), **result))
+    print("Saved to {0}".format(args.output))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        regressions = compareResults(results, baseline, args.threshold, args.min_seconds)
+        for key, previous, seconds, change in regressions:
+            print("REGRESSION {0}: {1:.5f} s -> {2:.5f} s (+{3:.0%})".format(key, previous, seconds, change))
+        print("{0} regressions over {1:.0%} against {2}".format(len(regressions), args.threshold, args.baseline))
+
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
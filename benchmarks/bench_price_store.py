@@ -0,0 +1,38 @@
+#Run from the repository root with: python -m benchmarks.bench_price_store
+#A synthetic provider with network-like latency stands in for Yahoo
+import time
+import tempfile
+import datetime as dt
+
+from price_store import PriceStore
+from benchmarks.synthetic import SyntheticProvider
+
+def timeGet(priceStore, stockCode, startDate, endDate):
+    startTime = time.perf_counter()
+    stockData_df = priceStore.get(stockCode, startDate, endDate)
+    return time.perf_counter() - startTime, len(stockData_df)
+
+def main():
+    provider = SyntheticProvider(latency=0.3)
+    end = dt.date(2024, 6, 3)
+    start = end - dt.timedelta(days=365*3)
+
+    with tempfile.TemporaryDirectory() as storeDir:
+        priceStore = PriceStore(storeDir, provider)
+
+        cases = [
+            ("cold 3 years", start, end),
+            ("same range again", start, end),
+            ("end date moved 1 day", start, end + dt.timedelta(days=1)),
+            ("1 year slice", end - dt.timedelta(days=365), end),
+            ("start moved back 30 days", start - dt.timedelta(days=30), end)
+        ]
+
+        print("{:<26} {:>10} {:>6} {:>10} {:>14}".format("request", "time (ms)", "rows", "downloads", "rows fetched"))
+        for name, startDate, endDate in cases:
+            fetches, fetchedRows = priceStore.fetches, priceStore.fetchedRows
+            seconds, rows = timeGet(priceStore, "SYN", startDate.strftime("%Y-%m-%d"), endDate.strftime("%Y-%m-%d"))
+            print("{:<26} {:>10.2f} {:>6} {:>10} {:>14}".format(name, seconds*1000, rows, priceStore.fetches - fetches, priceStore.fetchedRows - fetchedRows))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#Run from the repository root with: python -m benchmarks.bench_startup [--tree PATH] [--latency 0.3] [--repeats 3]
+#--tree measures another checkout, e.g. one made with: git worktree add /tmp/before <commit>
+#Starts the server cold (empty price store, model registry and forecast cache) against a synthetic recording served
+#by the replay provider, and times how long it takes to answer its first request, to send the page skeleton and
+#to build the analysis page. --latency is added to every replayed download, like a round trip to Yahoo.
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import subprocess
+import urllib.request
+
+import providers
+from benchmarks.synthetic import SyntheticProvider
+
+#Every ticker the dashboards show by default
+DEFAULT_TICKERS = ["AAPL", "^FTSE", "^GSPC"]
+
+def freePort():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def waitForResponse(url, process, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Server exited with status {0}".format(process.returncode))
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                return response.read()
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("Server didn't answer {0} within {1} s".format(url, timeout))
+
+#The request the browser makes for display_page once the skeleton has loaded
+def requestPage(baseUrl, pathname):
+    body = {
+        "output": "page-content.children",
+        "outputs": {"id": "page-content", "property": "children"},
+        "inputs": [{"id": "url", "property": "pathname", "value": pathname}],
+        "changedPropIds": ["url.pathname"],
+        "state": []
+    }
+    request = urllib.request.Request(baseUrl + "_dash-update-component", data=json.dumps(body).encode(), headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return response.read()
+
+def measureStartup(tree, recording, latency, timeout):
+    port = freePort()
+    baseUrl = "http://127.0.0.1:{0}/".format(port)
+
+    with tempfile.TemporaryDirectory() as stateDir:
+        environment = dict(os.environ, BROWSER="true", TF_CPP_MIN_LOG_LEVEL="3",
+            FORECO_PROVIDER="replay:{0}?latency={1}".format(recording, latency),
+            FORECO_PRICE_STORE_DIR=os.path.join(stateDir, "prices"),
+            FORECO_MODEL_REGISTRY_DIR=os.path.join(stateDir, "models"))
+        environment.pop("FORECO_FORECAST_CACHE_DIR", None)
+
+        startTime = time.perf_counter()
+        process = subprocess.Popen([sys.executable, "-c", "import app; app.app.server.run(port={0})".format(port)],
+            cwd=tree, env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            waitForResponse(baseUrl, process, timeout)
+            timings = {"firstByte": time.perf_counter() - startTime}
+
+            waitForResponse(baseUrl + "_dash-layout", process, timeout)
+            waitForResponse(baseUrl + "_dash-dependencies", process, timeout)
+            timings["skeleton"] = time.perf_counter() - startTime
+
+            requestPage(baseUrl, "/")
+            timings["analysisPage"] = time.perf_counter() - startTime
+        finally:
+            process.terminate()
+            process.wait()
+
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tree", default=os.getcwd())
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=600)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as recording:
+        providers.record(SyntheticProvider(), recording, DEFAULT_TICKERS, "2015-01-01", "2030-01-01")
+
+        runs = [measureStartup(args.tree, recording, args.latency, args.timeout) for _ in range(args.repeats)]
+
+    print("Cold start of {0} ({1} s replay latency), best of {2}:".format(args.tree, args.latency, args.repeats))
+    for stage in ["firstByte", "skeleton", "analysisPage"]:
+        print("    {0:<14} {1:>8.3f} s".format(stage, min(run[stage] for run in runs)))
+
+if __name__ == "__main__":
+    main()
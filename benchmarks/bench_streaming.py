@@ -0,0 +1,41 @@
+#Run from the repository root with: python -m benchmarks.bench_streaming
+#Every run is a fresh process, so its peak RSS is that of one forecast on one history size
+import sys
+import time
+import resource
+import subprocess
+
+import forecast
+import streaming
+from benchmarks.synthetic import generateStockData
+
+ROWS = [5000, 20000, 70000]
+
+def runOnce(mode, rows):
+    #Starting in 1800 leaves room for 70k business days before the last timestamp pandas can hold
+    stockData_df = generateStockData(rows, seed=rows, startDate="1800-01-01")
+    inputDim, outputDim, attributes, epochs = 20, 10, [0, 1, 2, 3, 4, 5], 1
+
+    startTime = time.perf_counter()
+    if mode == "streaming":
+        mape = streaming.forecastStreaming(stockData_df, inputDim, outputDim, attributes, epochs)[4]
+    else:
+        mape = forecast.forecast(stockData_df, inputDim, outputDim, attributes, epochs)[4]
+    latency = time.perf_counter() - startTime
+
+    #ru_maxrss is in kilobytes on Linux
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, latency, mape)
+
+def main():
+    print("{:>8} {:>10} {:>14} {:>12} {:>8}".format("rows", "mode", "peak RSS (MB)", "latency (s)", "MAPE"))
+    for rows in ROWS:
+        for mode in ["in-memory", "streaming"]:
+            output = subprocess.run([sys.executable, "-m", "benchmarks.bench_streaming", mode, str(rows)], capture_output=True, text=True, check=True).stdout
+            peakRss, latency, mape = map(float, output.strip().splitlines()[-1].split())
+            print("{:>8} {:>10} {:>14.0f} {:>12.2f} {:>8.3f}".format(rows, mode, peakRss, latency, mape))
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        runOnce(sys.argv[1], int(sys.argv[2]))
+    else:
+        main()
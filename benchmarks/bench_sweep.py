@@ -0,0 +1,26 @@
+#Run from the repository root with: python -m benchmarks.bench_sweep
+import os
+import time
+
+import sweep
+from benchmarks.synthetic import generateStockData
+
+def main():
+    stockData_df = generateStockData(750)
+    configs = sweep.createGrid([10, 20], [10], [[0, 1, 2, 3, 4, 5], [3]], [20, 40])
+
+    cpuCount = os.cpu_count() or 1
+    workerCounts = sorted({1, 2, 4, 8, cpuCount} & set(range(1, cpuCount+1)))
+
+    print("{:>8} {:>10} {:>14} {:>9} {:>11}".format("workers", "wall (s)", "configs/s", "speedup", "efficiency"))
+    baseline = None
+    for workers in workerCounts:
+        startTime = time.perf_counter()
+        sweep.runSweep(stockData_df, configs, maxWorkers=workers)
+        wallTime = time.perf_counter() - startTime
+
+        baseline = baseline or wallTime
+        print("{:>8} {:>10.2f} {:>14.3f} {:>8.2f}x {:>10.0%}".format(workers, wallTime, len(configs)/wallTime, baseline/wallTime, baseline/wallTime/workers))
+
+if __name__ == "__main__":
+    main()
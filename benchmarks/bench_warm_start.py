@@ -0,0 +1,41 @@
+#Run from the repository root with: python -m benchmarks.bench_warm_start
+import time
+import tempfile
+
+import numpy as np
+
+import forecast
+from model_registry import ModelRegistry
+from benchmarks.synthetic import generateStockData
+
+def main():
+    inputDim, outputDim, attributes, epochs = 20, 10, [0, 1, 2, 3, 4, 5], 50
+    baseRows = 500
+    stockData_df = generateStockData(baseRows+60)
+
+    rows = []
+    for slide in [1, 2, 5, 10, 20, 40, 60]:
+        #Every slide starts from the same cold trained entry, with no limit on how far it may slide
+        registry = ModelRegistry(tempfile.mkdtemp(), maxNewRows=slide, minOverlap=0.0)
+        registry.forecast("SYNTH", stockData_df.iloc[:baseRows], inputDim, outputDim, attributes, epochs)
+
+        slidData_df = stockData_df.iloc[slide:baseRows+slide]
+        registry.forecast("SYNTH", slidData_df, inputDim, outputDim, attributes, epochs)
+        warmRun = registry.lastRun
+
+        #Scored on the same windows as the fine-tune, the test windows of the first cold run still in the data
+        testStarts = stockData_df.index.asi8[:baseRows-inputDim-outputDim][forecast.splitIndices(baseRows-inputDim-outputDim)[1]]
+        testIndices = np.flatnonzero(np.isin(slidData_df.index.asi8[:baseRows-inputDim-outputDim], testStarts))
+
+        startTime = time.perf_counter()
+        coldMape = forecast.forecastWithModel(slidData_df, inputDim, outputDim, attributes, epochs, testIndices=testIndices)[4]
+        coldTime = time.perf_counter() - startTime
+
+        rows.append((slide, warmRun["mode"], warmRun["trainingTime"], coldTime, warmRun["mape"], coldMape))
+
+    print("{:>6} {:>5} {:>10} {:>10} {:>10} {:>10} {:>11}".format("slide", "mode", "warm (s)", "cold (s)", "saved (s)", "warm MAPE", "MAPE delta"))
+    for slide, mode, warmTime, coldTime, warmMape, coldMape in rows:
+        print("{:>6} {:>5} {:>10.2f} {:>10.2f} {:>10.2f} {:>10.3f} {:>+11.3f}".format(slide, mode, warmTime, coldTime, coldTime-warmTime, warmMape, warmMape-coldMape))
+
+if __name__ == "__main__":
+    main()
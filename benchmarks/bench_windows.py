@@ -0,0 +1,69 @@
+#Run from the repository root with: python -m benchmarks.bench_windows
+import timeit
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+import forecast
+from benchmarks.synthetic import generateStockData
+
+#The original nested loop version of forecast.splitData, kept as the parity reference
+def splitDataLoops(stockData, inputDim, outputDim, attributes):
+    inputs = []
+    outputs = []
+    forecastInput = []
+
+    for attribute in attributes:
+        for i in range(inputDim):
+            forecastInput.append(stockData[-(inputDim+i), attribute])
+
+    inputsTemp = []
+    outputsTemp = []
+
+    for i in range(len(stockData)-inputDim-outputDim):
+        for attribute in attributes:
+            for j in range(inputDim):
+                inputsTemp.append(stockData[i+j, attribute])
+        inputs.append(inputsTemp)
+        inputsTemp = []
+        for j in range(outputDim):
+            outputsTemp.append(stockData[i+inputDim+j, 3])
+        outputs.append(outputsTemp)
+        outputsTemp = []
+
+    inputsArray = np.array(inputs)
+    outputsArray = np.array(outputs)
+    forecastInputArray = np.array(forecastInput)
+
+    inputsArray_train, inputsArray_test, outputsArray_train, outputsArray_test = train_test_split(inputsArray, outputsArray, test_size=0.2, random_state=12)
+
+    return inputsArray_train, inputsArray_test, outputsArray_train, outputsArray_test, forecastInputArray
+
+def checkParity():
+    stockDataArray = generateStockData(300).to_numpy()
+
+    for inputDim, outputDim, attributes in [(20, 10, [0, 1, 2, 3, 4, 5]), (5, 1, [3]), (30, 5, [5, 0, 3])]:
+        expected = splitDataLoops(stockDataArray, inputDim, outputDim, attributes)
+        actual = forecast.splitData(stockDataArray, inputDim, outputDim, attributes)
+        for e, a in zip(expected, actual):
+            assert e.shape == a.shape and np.array_equal(e, a), "splitData output differs from the loop reference"
+
+    print("Parity with the loop reference: OK")
+
+def main():
+    checkParity()
+
+    inputDim, outputDim, attributes = 20, 10, [0, 1, 2, 3, 4, 5]
+
+    print("{:>8} {:>12} {:>12} {:>9}".format("rows", "loops (ms)", "views (ms)", "speedup"))
+    for rows in [250, 1000, 5000, 20000]:
+        stockDataArray = generateStockData(rows).to_numpy()
+        repeats = 3
+
+        loopsTime = min(timeit.repeat(lambda: splitDataLoops(stockDataArray, inputDim, outputDim, attributes), number=1, repeat=repeats))
+        viewsTime = min(timeit.repeat(lambda: forecast.splitData(stockDataArray, inputDim, outputDim, attributes), number=1, repeat=repeats))
+
+        print("{:>8} {:>12.2f} {:>12.2f} {:>8.1f}x".format(rows, loopsTime*1000, viewsTime*1000, loopsTime/viewsTime))
+
+if __name__ == "__main__":
+    main()
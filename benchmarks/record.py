@@ -0,0 +1,32 @@
+#Run from the repository root with: python -m benchmarks.record <directory> AAPL MSFT ... [--synthetic]
+#Records prices, fundamentals and news for the tickers into a directory the replay provider serves, e.g.
+#    python -m benchmarks.record recordings AAPL MSFT --start 2020-01-01 --intervals 1d 60m
+#    FORECO_PROVIDER="replay:recordings?latency=0.2&jitter=0.1&failureRate=0.05" python app.py
+#--synthetic records generated data instead of Yahoo and MarketWatch, for machines with no network at all
+import argparse
+import datetime as dt
+
+import providers
+from benchmarks.synthetic import SyntheticProvider
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory")
+    parser.add_argument("stockCodes", nargs="+")
+    parser.add_argument("--start", default=(dt.date.today()-dt.timedelta(days=3*365)).strftime("%Y-%m-%d"))
+    parser.add_argument("--end", default=(dt.date.today()+dt.timedelta(days=1)).strftime("%Y-%m-%d"))
+    parser.add_argument("--intervals", nargs="+", default=["1d"])
+    parser.add_argument("--synthetic", action="store_true")
+    args = parser.parse_args()
+
+    source = SyntheticProvider() if args.synthetic else providers.YahooProvider()
+    providers.record(source, args.directory, args.stockCodes, args.start, args.end, args.intervals)
+
+    replay = providers.ReplayProvider(args.directory)
+    for stockCode in args.stockCodes:
+        rows = {interval: len(replay.download(stockCode, args.start, args.end, interval)) for interval in args.intervals}
+        print("{0}: {1}".format(stockCode, ", ".join("{0} {1} rows".format(interval, count) for interval, count in rows.items())))
+    print("Saved to {0}".format(args.directory))
+
+if __name__ == "__main__":
+    main()
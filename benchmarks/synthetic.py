@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+#Deterministic random walk columns, drift and volatility are the mean and standard deviation of the log return of one bar
+def generatePrices(rows, seed, startPrice, drift, volatility):
+    rng = np.random.default_rng(seed)
+
+    close = startPrice * np.exp(np.cumsum(rng.normal(drift, volatility, rows)))
+    open_ = close * (1 + rng.normal(0, volatility/3, rows))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, volatility/3, rows)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, volatility/3, rows)))
+    volume = rng.integers(1000000, 50000000, rows)
+
+    return {
+        "Open": open_,
+        "High": high,
+        "Low": low,
+        "Close": close,
+        "Adj Close": close,
+        "Volume": volume
+    }
+
+#Generates a deterministic random walk with the same columns and index as yf.download
+def generateStockData(rows, seed=3, startDate="2000-01-03", startPrice=100.0):
+    return pd.DataFrame(generatePrices(rows, seed, startPrice, 0.0002, 0.015), index=pd.bdate_range(startDate, periods=rows, name="Date"))
+
+#The same at an intraday interval ("1m", "5m", "15m" or "60m"), the bars only fall inside the 09:30-16:00
+#New York session of business days like Yahoo's intraday downloads
+def generateIntradayData(rows, interval="1m", seed=3, startDate="2000-01-03", startPrice=100.0):
+    barLength = pd.Timedelta(interval.replace("m", "min"))
+    barsPerSession = int(pd.Timedelta("6h30min") // barLength)
+    sessions = pd.bdate_range(startDate, periods=-(-rows // barsPerSession)) + pd.Timedelta("9h30min")
+
+    #Every bar time is its session open plus its offset into the session
+    bars = np.arange(rows)
+    index = sessions[bars // barsPerSession] + barLength * (bars % barsPerSession)
+
+    #Scaled so a session moves about as much as a daily bar does
+    prices = generatePrices(rows, seed, startPrice, 0.0002 / barsPerSession, 0.015 / np.sqrt(barsPerSession))
+    return pd.DataFrame(prices, index=index.tz_localize("America/New_York").rename("Datetime"))
+
+#Data provider serving generateStockData from 2000 on by date (generateIntradayData over the last 90 days for intraday intervals), optionally after a delay like a network round trip
+#Every ticker gets its own fixed delay between latency and latency+jitter seconds
+class SyntheticProvider:
+    def __init__(self, latency=0.0, jitter=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.history = {}
+        self.calls = 0
+
+    def delay(self, stockCode):
+        return self.latency + self.jitter * np.random.default_rng(sum(map(ord, stockCode))).random()
+
+    def download(self, stockCode, startDate, endDate, interval="1d"):
+        import time
+        from providers import sliceDates
+
+        self.calls += 1
+        time.sleep(self.delay(stockCode))
+        if (stockCode, interval) not in self.history:
+            seed = sum(map(ord, stockCode))
+            if interval == "1d":
+                self.history[stockCode, interval] = generateStockData(8000, seed=seed)
+            else:
+                #Intraday bars only go back a few weeks, like Yahoo's
+                recentStart = (pd.Timestamp.today() - pd.Timedelta(days=90)).strftime("%Y-%m-%d")
+                self.history[stockCode, interval] = generateIntradayData(20000, interval, seed=seed, startDate=recentStart)
+        return sliceDates(self.history[stockCode, interval], startDate, endDate)
+
+    #Fixed fundamentals in the shapes yfinance returns them, for recordings made without a network
+    def ticker(self, stockCode):
+        self.calls += 1
+        return SyntheticTicker(stockCode)
+
+    #A MarketWatch page with just the news module createNewsList reads
+    def news(self, stockCode, validators=None, timeout=None):
+        self.calls += 1
+        articles = "".join(
+            '<div class="article__content"><h3 class="article__headline">{0} headline {1}</h3>'
+            '<a href="https://www.example.com/{0}/{1}">{0}</a><a href="https://www.example.com/{0}/{1}#comments">Comments</a>'
+            '<span class="article__timestamp">Jun. {2}, 2022 at 9:30 a.m. ET</span><span class="article__author">by Synthetic</span></div>'.format(stockCode, i, i + 1)
+            for i in range(12))
+        return "<html><body><mw-scrollable-news-v2>{0}</mw-scrollable-news-v2></body></html>".format(articles), {}
+
+class SyntheticTicker:
+    def __init__(self, stockCode):
+        self.stockCode = stockCode
+
+    @property
+    def info(self):
+        return {"symbol": self.stockCode, "shortName": self.stockCode + " Inc.", "sector": "Technology", "longBusinessSummary": "Synthetic company.",
+            "industry": "Software", "country": "United States", "fullTimeEmployees": 1000, "marketCap": 1000000000}
+
+    @property
+    def recommendations(self):
+        return pd.DataFrame({"Firm": ["Firm A", "Firm B", "Firm C"], "To Grade": ["Buy", "Hold", "Buy"], "From Grade": ["", "Buy", "Hold"],
+            "Action": ["init", "down", "up"]}, index=pd.DatetimeIndex(["2022-01-10", "2022-03-15", "2022-05-20"], name="Date"))
+
+    @property
+    def actions(self):
+        return pd.DataFrame({"Dividends": [0.22, 0.22, 0.23], "Stock Splits": [0.0, 0.0, 0.0]},
+            index=pd.DatetimeIndex(["2021-11-05", "2022-02-04", "2022-05-06"], name="Date"))
+
+    @property
+    def institutional_holders(self):
+        return pd.DataFrame({"Holder": ["Fund A", "Fund B"], "Shares": [1000000, 500000], "Date Reported": ["2022-03-30", "2022-03-30"],
+            "% Out": [0.06, 0.03], "Value": [170000000, 85000000]})
+
+    @property
+    def sustainability(self):
+        return pd.DataFrame({"Value": [17.0, 9.0, 5.0]}, index=pd.Index(["totalEsg", "environmentScore", "socialScore"], name="2022-5"))
@@ -1,849 +1,1275 @@
-from dash import dcc, html, Input, Output, callback, dash_table
-import dash
-
-import dash_bootstrap_components as dbc
-
-import requests, lxml
-import re
-from bs4 import BeautifulSoup
-
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
-import numpy as np
-
-import datetime as dt
-
-import yfinance as yf
-from yahoofinancials import YahooFinancials
-
-import forecast
-
-def downloadStockData(stockName, startDate, endDate):
-    #aapl_df = yf.download('^NDX', start='2020-01-01', end='2021-01-01', progress=False)
-    df = yf.download(stockName, start=startDate, end=endDate)
-    return df
-
-stockCode = "AAPL"
-
-stockData_df = downloadStockData(stockCode, (dt.date.today()-dt.timedelta(days=150)).strftime("%Y-%m-%d"), dt.date.today().strftime("%Y-%m-%d"))
-forecastResults, outputs_test, outputs_pred, rmse, mape, history = forecast.forecast(stockData_df, 20, 10, [0,1,2,3,4,5], 50)
-stockData_ticker = yf.Ticker(stockCode)
-
-### ----- FIGURES ----- ###
-
-#Summary Price Sparkline
-def createPriceSparklineFigure(stockData_df):
-    priceSparkline = go.Figure(
-        data=go.Scatter(
-            x=stockData_df.index,
-            y=stockData_df["Close"],
-            mode="lines",
-            line_color="#4E79A7"
-    ))
-
-    priceSparkline.update_layout(
-        template="simple_white",
-        annotations=[], 
-        overwrite=True,
-        showlegend=False,
-        plot_bgcolor="white",
-        margin=dict(t=10,l=10,b=10,r=10),
-        height=82
-    )
-
-    priceSparkline.update_xaxes(visible=False, fixedrange=True)
-    priceSparkline.update_yaxes(visible=False, fixedrange=True)
-
-    priceSparkline.add_annotation(text="Price:",
-                  xref="paper", yref="paper",
-                  x=0.00, y=1.25, showarrow=False)
-
-    return priceSparkline
-
-#Summary Volume Bar Sparkline
-def createVolumeSparklineFigure(stockData_df):
-    volumeSparkline = go.Figure(
-        data = go.Bar(
-            x=stockData_df.index,
-            y=stockData_df["Volume"],
-            marker_color="#4E79A7" #F28E2B
-    ))
-
-    volumeSparkline.update_layout(
-        template="simple_white",
-        annotations=[], 
-        overwrite=True,
-        showlegend=False,
-        plot_bgcolor="white",
-        margin=dict(t=10,l=10,b=10,r=10),
-        height=82,
-    )
-
-    volumeSparkline.update_xaxes(visible=False, fixedrange=True)
-    volumeSparkline.update_yaxes(visible=False, fixedrange=True)
-
-    volumeSparkline.add_annotation(text="Volume:",
-                xref="paper", yref="paper",
-                x=0.00, y=1.25, showarrow=False)
-
-    return volumeSparkline
-
-#Forecast Results Line Chart
-def createForecastResultsLineFigure(stockData_df, forecastResults, stockCode):
-    forecastResultsLine = go.Figure()
-
-    forecastPlot = pd.concat([stockData_df.iloc[[-1], [3]], forecastResults])
-
-    forecastResultsLine.add_trace(go.Scatter(
-            x=stockData_df.index,
-            y=stockData_df["Close"],
-            mode="lines",
-            line_color="#4E79A7",
-            name="Actual"
-    ))
-    forecastResultsLine.add_trace(go.Scatter(
-            x=forecastPlot.index,
-            y=forecastPlot["Close"],
-            mode="lines",
-            line_color="#F28E2B",
-            name="Forecast"
-    ))
-
-    forecastResultsLine.add_vline(x=stockData_df.iloc[[-1], [3]].index[0], line_width=2, line_dash="dash", line_color="#7a7a7a")
-
-    forecastResultsLine.update_layout(
-        title="{0} Close Price Forecast".format(stockCode) ,
-        xaxis_title="Date",
-        yaxis_title="Price",
-        template="simple_white",
-        margin=dict(t=10,l=10,b=10,r=10),
-        height=340,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.1, #-0.265
-            xanchor="right",
-            x=1
-        )
-    )
-
-    return forecastResultsLine
-
-#Forecast Test Line Chart
-def createForecastTestLineFigure(outputs_test, outputs_pred, stockCode):
-    forecastTestLine = go.Figure()
-
-    for i in range(len(outputs_test[1, :])):
-        forecastTestLine.add_trace(go.Scatter(
-            y=outputs_test[:, i],
-            mode="lines",
-            line_color="#4E79A7",
-            showlegend=False
-        ))
-    for i in range(len(outputs_pred[1, :])): 
-        forecastTestLine.add_trace(go.Scatter(
-            y=outputs_pred[:, i],
-            mode="lines",
-            line_color="#F28E2B",
-            showlegend=False
-        ))
-
-    forecastTestLine.update_layout(
-        title="{0} Forecast Model Testing".format(stockCode),
-        xaxis_title="No. of Tests",
-        yaxis_title="Price",
-        template="simple_white",
-        margin=dict(t=10,l=10,b=10,r=10),
-        height=340,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.1,
-            xanchor="right",
-            x=1
-        )
-    )
-
-    forecastTestLine['data'][0]['showlegend']=True
-    forecastTestLine['data'][0]['name']='Actual'
-    forecastTestLine['data'][(0+len(outputs_test[1, :]))]['showlegend']=True
-    forecastTestLine['data'][(0+len(outputs_test[1, :]))]['name']='Predicted'
-
-    return forecastTestLine
-
-#Forecast Training Line Chart
-def createForecastTrainingLineFigure(history, stockCode):
-    forecastTrainingLine = go.Figure()
-
-    forecastTrainingLine.add_trace(go.Scatter(
-        y=history.history['mse'],
-        mode="lines",
-        line_color="#4E79A7",
-        name="MSE"
-    ))
-    forecastTrainingLine.add_trace(go.Scatter(
-        y=history.history['mae'],
-        mode="lines",
-        line_color="#F28E2B",
-        name="MAE"
-    ))
-
-    forecastTrainingLine.update_layout(
-        title="{0} Forecast Model Training".format(stockCode),
-        xaxis_title="No. of Epochs",
-        yaxis_title="Error Proportion",
-        template="simple_white",
-        margin=dict(t=10,l=10,b=10,r=10),
-        height=340,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.1,
-            xanchor="right",
-            x=1
-        )
-    )
-
-    return forecastTrainingLine
-
-#Create candlestick chart figure
-def createPriceCandleFigure(stockData_df, stockCode):
-    priceCandle = go.Figure(data=[
-        go.Candlestick(
-            x=stockData_df.index,
-            open=stockData_df['Open'],
-            high=stockData_df['High'],
-            low=stockData_df['Low'],
-            close=stockData_df['Close'],
-        )
-    ])
-
-    priceCandle.update_layout(
-        title="{0} Price Movement".format(stockCode),
-        yaxis_title="Price",
-        template="simple_white",
-        margin=dict(t=60,l=10,b=10,r=10),
-        height=500 #Maybe remove this?
-    )
-
-    priceCandle.data[0].increasing.fillcolor = "#6d93bb"
-    priceCandle.data[0].increasing.line.color = "#4E79A7"
-    priceCandle.data[0].decreasing.fillcolor = "#f5a85b"
-    priceCandle.data[0].decreasing.line.color = "#F28E2B"
-
-    return priceCandle
-
-#Create volume bar chart figure
-def createVolumeBarFigure(stockData_df, stockCode):
-    volumeBar = go.Figure(
-        data = go.Bar(
-            x=stockData_df.index,
-            y=stockData_df["Volume"],
-            marker_color="#4E79A7" #F28E2B
-    ))
-
-    volumeBar.update_layout(
-        title="{0} Trading Volume".format(stockCode),
-        yaxis_title="Volume",
-        template="simple_white",
-        margin=dict(t=60,l=10,b=10,r=10),
-        height=250,
-    )
-
-    return volumeBar
-
-### ----- TABLES ----- ###
-
-def createInfoTable(stockData_ticker):
-
-    info_df = pd.DataFrame(list(stockData_ticker.info.items()))
-    info_df.rename(columns={0:"Information", 1: "Data"}, inplace=True)
-
-    #drops long business summary
-    info_df = info_df.drop(info_df.index[3])
-
-    infoTable = dash_table.DataTable(
-        data=info_df.to_dict("records"), 
-        columns=[{"name": i, "id": i} for i in info_df.columns],
-        style_data={
-            'whiteSpace': 'normal',
-            'height': 'auto',
-            'lineHeight': '40px',
-        },
-        page_action='none',
-        style_table={
-            'height': '335px', 
-        },
-        style_cell={
-            'textAlign': 'left',
-        },
-        tooltip_duration=None
-    )
-    return infoTable
-
-def createRecommendationsTable(stockData_ticker):
-    recommendations_df = pd.DataFrame(stockData_ticker.recommendations)
-
-    try:
-        recommendations_df["Date"]
-    except:
-        recommendations_df.reset_index(inplace=True)
-
-    recommendations_df = recommendations_df[::-1]
-
-    recommendationsTable = dash_table.DataTable(
-        data=recommendations_df.to_dict("records"), 
-        columns=[{"name": i, "id": i} for i in recommendations_df.columns],
-        style_data={
-            'whiteSpace': 'normal',
-            'height': 'auto',
-        },
-        page_action='none',
-        style_cell={
-            'textAlign': 'left',
-        },
-        style_table={'height': '335px'}
-    )
-    return recommendationsTable
-
-def createActionsTable(stockData_ticker):
-    actions_df = pd.DataFrame(stockData_ticker.actions)   
-    actions_df.reset_index(inplace=True)
-    actions_df = actions_df[::-1]
-
-    actionsTable = dash_table.DataTable(
-        data=actions_df.to_dict("records"), 
-        columns=[{"name": i, "id": i} for i in actions_df.columns],
-        style_data={
-            'whiteSpace': 'normal',
-            'height': 'auto',
-            'lineHeight': '40px',
-        },
-        page_action='none',
-        style_cell={
-            'textAlign': 'left',
-        },
-        style_table={'height': '335px'}
-    )
-    return actionsTable
-
-def createHoldersTable(stockData_ticker):
-    holders_df = pd.DataFrame(stockData_ticker.institutional_holders)
-    #actions_df.reset_index(inplace=True)
-    #actions_df = actions_df[::-1]
-
-    holdersTable = dash_table.DataTable(
-        data=holders_df.to_dict("records"), 
-        columns=[{"name": i, "id": i} for i in holders_df.columns],
-        style_data={
-            'whiteSpace': 'normal',
-            'height': 'auto',
-        },
-        page_action='none',
-        style_cell={
-            'textAlign': 'left',
-        },
-        style_table={'height': '335px'} 
-    )
-    return holdersTable
-
-def createSustainabilityTable(stockData_ticker):
-    sustainability_df = pd.DataFrame(stockData_ticker.sustainability)
-
-    if len(sustainability_df.columns) == 1:
-        sustainability_df.reset_index(inplace=True)
-
-    #sustainability_df.rename(columns={0:"Information", 1: "Data"}, inplace=True)
-
-    sustainabilityTable = dash_table.DataTable(
-        data=sustainability_df.to_dict("records"), 
-        columns=[{"name": i, "id": i} for i in sustainability_df.columns],
-        style_data={
-            'whiteSpace': 'normal',
-            'height': 'auto',
-            'lineHeight': '40px',
-        },
-        page_action='none',
-        style_cell={
-            'textAlign': 'left',
-        },
-        style_table={'height': '335px'} 
-    )
-    return sustainabilityTable
-
-### ----- NEWS ----- ###
-def createNewsList(stockCode):
-    url = "https://www.marketwatch.com/investing/stock/" + stockCode + "?mod=quote_search"
-    response = requests.get(url)
-
-    soup = BeautifulSoup(response.text, 'html.parser')
-    headlines = soup.find('mw-scrollable-news-v2').find_all("h3")
-    links = soup.find('mw-scrollable-news-v2').find_all("a", attrs={'href': re.compile("^https://")})
-    providers = soup.find('mw-scrollable-news-v2').find_all("span", {"class": "article__author"})
-    timestamps = soup.find('mw-scrollable-news-v2').find_all("span", {"class": "article__timestamp"})
-
-    news = []
-
-    for i in range(10):
-        news.append(
-            dbc.ListGroupItem(
-                [
-                    html.H5(html.A(headlines[i].text.strip(), href=links[i*2].get("href"), target="_blank")),
-                    html.Small(timestamps[i].text.strip() + " " + providers[i].text.strip()),
-                ]
-            )
-        )
-
-    newsList = dbc.ListGroup(
-        children = news,
-    )
-
-    return newsList
-
-### ----- LAYOUT ----- ###
-
-layout = html.Div([
-    dbc.Card(
-        dbc.CardBody([
-
-            #Error alert
-            dbc.Modal(
-                [
-                    dbc.ModalHeader(dbc.ModalTitle("An error has occured!")),
-                    dbc.ModalBody(["Please re-select valid data parameters and try again."]),
-                ],
-                id="error-modal",
-                centered=True,
-                is_open=False,
-            ),
-
-            #Row 1 - Title
-            dbc.Row([
-                dbc.Col([
-                    html.Div([
-                        html.H1([
-                            html.Span("Fore", style={"color": "#F28E2B"}),
-                            html.Span("Co ", style={"color": "#4E79A7"}),
-                            html.Span("Invest | "),
-                            html.Span("Analyse", style={"color": "#F28E2B"})
-                        ])
-                    ], style={"textAlign": "center"})
-                ], width={"size": 6, "offset": 3}),
-
-                dbc.Col([
-                    dcc.Loading(
-                        id="loading",
-                        type="circle", #default
-                        color="#4E79A7",
-                        children=[
-                            html.Div([], style={"display": "none"}, id="loading-div"),
-                            html.Div([], style={"display": "none"}, id="loading-div-2")
-                        ]    
-                    )
-                ], width={"size": 1, "offset": 2}, className="pt-4 mt-2")
-
-            ], className="mb-4"),
-
-            #Row 2 - Data select
-            dbc.Row([
-                dbc.Col([
-                    dbc.Card(
-                        dbc.CardBody([
-                            dbc.Row([
-                                dbc.Col([
-                                    dcc.Dropdown(
-                                        options = [
-                                            {"label": "Apple Inc. (AAPL)", "value": "AAPL"},
-                                            {"label": "Alphabet Inc. (GOOGL)", "value": "GOOGL"},
-                                            {"label": "Microsoft Corporation (MSFT)", "value": "MSFT"},
-                                            {"label": "Tesla, Inc. (TSLA)", "value": "TSLA"},
-                                            {"label": "Advanced Micro Devices, Inc. (AMD)", "value": "AMD"},
-                                            {"label": "NVIDIA Corporation (NVDA)", "value": "NVDA"},
-                                            {"label": "Intel Corporation (INTC)", "value": "INTC"},
-                                            {"label": "The Coca-Cola Company (KO)", "value": "KO"},
-                                            {"label": "McDonald's Corporation (MCD)", "value": "MCD"},
-                                            {"label": "Starbucks Corporation (SBUX)", "value": "SBUX"},
-                                        ], 
-                                        value="AAPL", 
-                                        id="stock-select-dropdown"
-                                    )
-                                ], width=8),
-                                dbc.Col([
-                                    html.Div([
-                                        html.P("Start Date:", style={'textAlign': 'right', "margin": "0px 0px 0px 0px"})
-                                    ])
-                                ], width=1),
-                                dbc.Col([
-                                    dcc.DatePickerSingle(
-                                        date=(dt.date.today() - dt.timedelta(days=150)),
-                                        max_date_allowed=dt.date.today(),
-                                        min_date_allowed=(dt.date.today() - dt.timedelta(days=365*3)),
-                                        display_format="DD/MM/YYYY",
-                                        id="start-date-picker"
-                                    )
-                                ], width=1),
-                                dbc.Col([
-                                    html.Div([
-                                        html.P("End Date:", style={'textAlign': 'right', "margin": "0px 0px 0px 0px"})
-                                    ])   
-                                ], width=1),
-                                dbc.Col([
-                                    dcc.DatePickerSingle(
-                                        date=dt.date.today(),
-                                        max_date_allowed=dt.date.today(),
-                                        min_date_allowed=(dt.date.today() - dt.timedelta(days=365*3)),
-                                        display_format="DD/MM/YYYY",
-                                        id="end-date-picker"
-                                    )
-                                ], width=1),
-                            ], align="center")
-                        ])
-                    )
-                ])
-            ], className="mb-3"),
-
-            #Row 3 - Summary
-            dbc.Row([
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardBody([
-                            html.Div([
-                                html.P("Is it worth a buy?"),
-                                html.H3("No", 
-                                    id="suggestion-label", 
-                                    style={"color": "#F28E2B"}
-                                )
-                            ], style={'textAlign': 'center'})
-                        ])
-                    ])
-                ], width = 2),
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardBody([
-                            html.Div([
-                                html.P("Expected chage:"),
-                                html.H3("{:.2f}%".format(((forecastResults.iloc[0, 0] - stockData_df.iloc[-1, 3])/stockData_df.iloc[-1, 3])*100), 
-                                    id="change-label",
-                                    style={"color": "#F28E2B"}
-                                )
-                            ], style={'textAlign': 'center'})
-                        ])
-                    ])
-                ], width = 2),
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardBody([
-                            html.Div([
-                                html.P("Forecast model test MAPE:"),
-                                html.H3("{:.2f}%".format(mape), 
-                                    id="mape-label", 
-                                    style={"color": "#4E79A7"}
-                                )
-                            ], style={'textAlign': 'center'})
-                        ])
-                    ])
-                ], width = 2),
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardBody([
-                            dbc.Row([
-                                dbc.Col([
-                                    dcc.Graph(
-                                        figure=createPriceSparklineFigure(stockData_df),
-                                        config={"displayModeBar" : False},
-                                        id="price-sparkline"
-                                    )
-                                ], width=6),
-                                dbc.Col([
-                                    dcc.Graph(
-                                        figure=createVolumeSparklineFigure(stockData_df),
-                                        config={"displayModeBar" : False},
-                                        id="volume-sparkline"
-                                    )
-                                ], width=6)
-                            ])
-                        ], className="pb-2 pt-4")
-                    ])
-                ], width=5),
-                dbc.Col([
-                    html.Div([
-                        dcc.Link(dbc.Button("Compare", color="compare", className="me-1", size="lg"), href="/compare")
-                    ])
-                ], width=1, align="center")
-            ], className="mb-3"),
-
-            #Row4 - Forecast
-            dbc.Row([
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardBody([
-                            #Row1 - Charts
-                            dbc.Row([
-                                dbc.Col([
-                                    #html.H5("(^FTSE) Price Forecast"),
-                                    dcc.Graph(
-                                        figure=createForecastResultsLineFigure(stockData_df, forecastResults, "AAPL"),
-                                        config={"displayModeBar" : False},
-                                        id="forecast-results-line"
-                                    )
-                                ], width=4, style={"text-align": "center"}),
-                                dbc.Col([
-                                    #html.H5("(^FTSE) Model Test Results"),
-                                    dcc.Graph(
-                                        figure=createForecastTestLineFigure(outputs_test, outputs_pred, "AAPL"),
-                                        config={"displayModeBar" : False},
-                                        id="forecast-test-line"
-                                    )
-                                ], width=4, style={"text-align": "center"}),
-                                dbc.Col([
-                                    #html.H5("(^FTSE) Model Training Progress"),
-                                    dcc.Graph(
-                                        figure=createForecastTrainingLineFigure(history, "AAPL"),
-                                        config={"displayModeBar" : False},
-                                        id="forecast-training-line"
-                                    )   
-                                ], width=4, style={"text-align": "center"})
-                            ], className="mb-2"),
-                            #Row2 - Filters
-                            dbc.Row([
-                                dbc.Col([
-                                    dbc.Row([
-                                        dbc.Col([
-                                            html.P("Input: ", style={'textAlign': 'right', "margin": "0px 0px 0px 0px"})
-                                        ], width=7),
-                                        dbc.Col([
-                                            dcc.Input(
-                                                type="number",
-                                                value=20,
-                                                style={'width': 80, "text-align": "center"},
-                                                id="input-days-input"
-                                            )
-                                        ], width=5)
-                                    ], align="center")
-                                ], width=1),
-                                dbc.Col([
-                                    dbc.Row([
-                                        dbc.Col([
-                                            html.P("Output: ", style={'textAlign': 'right', "margin": "0px 0px 0px 0px"})
-                                        ], width=7),
-                                        dbc.Col([
-                                            dcc.Input(
-                                                type="number",
-                                                value=10,
-                                                style={'width': 80, "text-align": "center"},
-                                                id="output-days-input"
-                                            )
-                                        ], width=5)
-                                    ], align="center")
-                                ], width=2),
-                                dbc.Col([
-                                    dcc.Dropdown(
-                                        options = [
-                                            {"label": "Open", "value": 0},
-                                            {"label": "High", "value": 1},
-                                            {"label": "Low", "value": 2},
-                                            {"label": "Close", "value": 3},
-                                            {"label": "Adj Close", "value": 4},
-                                            {"label": "Volume", "value": 5}
-                                        ],
-                                        multi=True,
-                                        value=[0,1,2,3,4,5],
-                                        id="attributes-select-dropdown"
-                                    )
-                                ], width=5, className="attributes-dropdown"),
-                                dbc.Col([
-                                    dcc.Slider(10, 100, 10, value=50, id="epochs-slider")
-                                ], width=4)                             
-                            ], align="center")
-                        ])
-                    ])
-                ], align="center")
-            ], className="mb-3"),
-
-            #Row 5 - Company statistics
-            dbc.Row([
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardBody([
-                            dbc.Row([
-                                dcc.Graph(
-                                    figure=createPriceCandleFigure(stockData_df, "AAPL"),
-                                    config={"displayModeBar" : False},
-                                    id="price-candle"
-                                )
-                            ]),
-                            dbc.Row([
-                                dcc.Graph(
-                                    figure=createVolumeBarFigure(stockData_df, "AAPL"),
-                                    config={"displayModeBar" : False},
-                                    id="volume-bar"                                   
-                                )
-                            ])
-                        ])
-                    ])
-                ], width=7, style={"text-align": "center"}),
-                dbc.Col([
-                    dbc.Card([  
-                        dbc.CardHeader(
-                            dbc.Tabs(
-                                [
-                                    dbc.Tab(label="Stock Info", tab_id="stock-info-tab"),
-                                    dbc.Tab(label="Recommendations", tab_id="recommendations-tab"),
-                                    dbc.Tab(label="Actions", tab_id="actions-tab"),
-                                    dbc.Tab(label="Holders", tab_id="holders-tab"),
-                                    dbc.Tab(label="Sustainability", tab_id="sustainability-tab"),
-                                ],
-                                id="stock-stats-tabs",
-                                active_tab="stock-info-tab",
-                            )
-                        ),  
-
-                        dbc.CardBody([
-                            #createInfoTable(stockData_ticker)
-                        ], id="stock-stats-content", style={"overflow-y": "auto"}), 
-
-                    ], className="pb-3 mb-3"),
-                    dbc.Card([
-                        dbc.CardBody([
-                            html.Div(
-                                createNewsList(stockCode),
-                                style={"maxHeight": "284px"},
-                                id="news-list"
-                            ),
-                        ], style={"overflow-x": "auto"})
-                    ], className="pb-3")
-                ], width=5)
-            ]),
-
-        ]),
-        color="light",
-        className="px-3"
-    )
-])
-
-### ----- CALLBACKS ----- ###
-
-#Change on stock select!
-@callback(
-    Output("suggestion-label", "children"),
-    Output("suggestion-label", "style"),
-
-    Output("change-label", "children"),
-    Output("change-label", "style"),
-
-    Output("mape-label", "children"),
-    Output("mape-label", "style"),
-
-    Output("price-sparkline", "figure"),
-    Output("volume-sparkline", "figure"),
-
-    Output("forecast-results-line", "figure"),
-    Output("forecast-test-line", "figure"),
-    Output("forecast-training-line", "figure"),
-
-    Output("price-candle", "figure"),
-    Output("volume-bar", "figure"),
-
-    Output("stock-stats-tabs", "active_tab"),  
-    Output("news-list", "children"),
-
-    Output("loading-div", "children"),
-    Output("error-modal", "is_open"),
-
-    Input("stock-select-dropdown", "value"),
-    Input("start-date-picker", "date"),
-    Input("end-date-picker", "date"),
-
-    Input("input-days-input", "value"),
-    Input("output-days-input", "value"),
-    Input("attributes-select-dropdown", "value"),
-    Input("epochs-slider", "value")
-)
-
-def update_figures(selected_stock, selected_startDate, selected_endDate, inputDim, outputDim, attributes, epochs):
-
-    try:
-        startDate = dt.date.fromisoformat(selected_startDate).strftime("%Y-%m-%d")
-        endDate = dt.date.fromisoformat(selected_endDate).strftime("%Y-%m-%d")
-
-        stockData_df = downloadStockData(selected_stock, startDate, endDate)
-        forecastResults, outputs_test, outputs_pred, rmse, mape, history = forecast.forecast(stockData_df, inputDim, outputDim, attributes, epochs)
-
-        global stockCode
-        if selected_stock != stockCode:
-            global stockData_ticker
-            stockData_ticker = yf.Ticker(selected_stock)
-            stockCode = selected_stock
-
-        activeTab = "stock-info-tab"
-        newsList = createNewsList(selected_stock)
-
-        expectedChange = ((forecastResults.iloc[-1, 0] - stockData_df.iloc[-1, 3])/stockData_df.iloc[-1, 3])*100
-        if expectedChange - mape > 0:
-            suggestionLabelChildren = "Yes"
-            suggestionLabelStyle = {"color": "#4E79A7"}
-        else:
-            suggestionLabelChildren = "No"
-            suggestionLabelStyle = {"color": "#F28E2B"}
-
-        changeLabelChildren = "{:.2f}%".format(expectedChange)
-        if expectedChange > 0:
-            changeLabelStyle = {"color": "#4E79A7"}
-        else:
-            changeLabelStyle = {"color": "#F28E2B"}
-
-        mapeLabelChildren = "{:.2f}%".format(mape)
-        if mape < 5:
-            mapeLabelStyle = {"color": "#4E79A7"}
-        else:
-            mapeLabelStyle = {"color": "#F28E2B"}
-
-        priceSparkline = createPriceSparklineFigure(stockData_df)
-        volumeSparkline = createVolumeSparklineFigure(stockData_df)
-
-        forecastResultsLine = createForecastResultsLineFigure(stockData_df, forecastResults, selected_stock)
-        forecastTestLine = createForecastTestLineFigure(outputs_test, outputs_pred, selected_stock)
-        forecastTrainingLine = createForecastTrainingLineFigure(history, selected_stock)
-
-        priceCandle = createPriceCandleFigure(stockData_df, selected_stock)
-        volumeBar = createVolumeBarFigure(stockData_df, selected_stock)
-
-        #For loading element
-        loaded = "loaded"
-        modalShow = False
-
-        return suggestionLabelChildren, suggestionLabelStyle, changeLabelChildren, changeLabelStyle, mapeLabelChildren, \
-            mapeLabelStyle, priceSparkline, volumeSparkline, forecastResultsLine, forecastTestLine, forecastTrainingLine, \
-            priceCandle, volumeBar, activeTab, newsList, loaded, modalShow
-    except Exception as e:
-        modalShow = True
-
-        return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, \
-            dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, \
-            dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, modalShow
-
-@callback(
-    Output("stock-stats-content", "children"),
-    Output("loading-div-2", "children"),
-
-    Input("stock-stats-tabs", "active_tab"),
-    Input("stock-select-dropdown", "value"),
-)
-def change_tab_content(activeTab, stockCode):
-
-    if activeTab == "stock-info-tab":
-        tabContents = createInfoTable(stockData_ticker)
-    elif activeTab == "recommendations-tab":
-        tabContents = createRecommendationsTable(stockData_ticker)
-    elif activeTab == "actions-tab":
-        tabContents = createActionsTable(stockData_ticker)
-    elif activeTab == "holders-tab":
-        tabContents = createHoldersTable(stockData_ticker)
-    elif activeTab == "sustainability-tab":
-        tabContents = createSustainabilityTable(stockData_ticker)
-
-    loaded = "loaded"
-
-    return tabContents, loaded
-    
\ No newline at end of file
+from dash import dcc, html, Input, Output, State, callback, dash_table
+from dash.dependencies import ClientsideFunction
+from dash.dash_table.Format import Format, Scheme
+import dash
+
+import dash_bootstrap_components as dbc
+
+import plotly.graph_objects as go
+import plotly.io as pio
+import pandas as pd
+import numpy as np
+
+import datetime as dt
+
+import sweep
+from jobs import trainingJobs
+from metrics import metrics
+from data_access import downloadStockData
+from fundamentals import fundamentalsCache
+from news import newsCache
+
+### ----- FIGURES ----- ###
+
+#Price data for the charts drawn in the browser by assets/clientside.js, sent as plain lists once per selection
+#Intraday bars are sent in exchange time, plotly.js doesn't read timezone offsets
+def createPriceSeries(stockData_df, stockCode):
+    index = stockData_df.index.tz_localize(None) if stockData_df.index.tz is not None else stockData_df.index
+    return {
+        "stockCode": stockCode,
+        "x": index.strftime("%Y-%m-%d %H:%M:%S").tolist(),
+        "open": stockData_df["Open"].tolist(),
+        "high": stockData_df["High"].tolist(),
+        "low": stockData_df["Low"].tolist(),
+        "close": stockData_df["Close"].tolist(),
+        "volume": stockData_df["Volume"].tolist()
+    }
+
+#Forecast Results Line Chart
+def createForecastResultsLineFigure(stockData_df, forecastResults, stockCode):
+    forecastResultsLine = go.Figure()
+
+    forecastPlot = pd.concat([stockData_df.iloc[[-1], [3]], forecastResults])
+
+    forecastResultsLine.add_trace(go.Scatter(
+            x=stockData_df.index,
+            y=stockData_df["Close"],
+            mode="lines",
+            line_color="#4E79A7",
+            name="Actual"
+    ))
+
+    #Ensemble forecasts come with quantile bands, drawn as a shaded area starting from the last actual price
+    if "Lower" in forecastResults:
+        forecastPlot[["Lower", "Upper"]] = forecastPlot[["Lower", "Upper"]].fillna(stockData_df.iloc[-1, 3])
+
+        forecastResultsLine.add_trace(go.Scatter(
+                x=forecastPlot.index,
+                y=forecastPlot["Upper"],
+                mode="lines",
+                line_width=0,
+                showlegend=False,
+                hoverinfo="skip"
+        ))
+        forecastResultsLine.add_trace(go.Scatter(
+                x=forecastPlot.index,
+                y=forecastPlot["Lower"],
+                mode="lines",
+                line_width=0,
+                fill="tonexty",
+                fillcolor="rgba(242, 142, 43, 0.2)",
+                name="80% Band"
+        ))
+
+    forecastResultsLine.add_trace(go.Scatter(
+            x=forecastPlot.index,
+            y=forecastPlot["Close"],
+            mode="lines",
+            line_color="#F28E2B",
+            name="Forecast"
+    ))
+
+    forecastResultsLine.add_vline(x=stockData_df.iloc[[-1], [3]].index[0], line_width=2, line_dash="dash", line_color="#7a7a7a")
+
+    forecastResultsLine.update_layout(
+        title="{0} Close Price Forecast".format(stockCode) ,
+        xaxis_title="Date",
+        yaxis_title="Price",
+        template="simple_white",
+        margin=dict(t=10,l=10,b=10,r=10),
+        height=340,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.1, #-0.265
+            xanchor="right",
+            x=1
+        )
+    )
+
+    return forecastResultsLine
+
+#Forecast Test Line Chart
+def createForecastTestLineFigure(outputs_test, outputs_pred, stockCode):
+    forecastTestLine = go.Figure()
+
+    for i in range(len(outputs_test[1, :])):
+        forecastTestLine.add_trace(go.Scatter(
+            y=outputs_test[:, i],
+            mode="lines",
+            line_color="#4E79A7",
+            showlegend=False
+        ))
+    for i in range(len(outputs_pred[1, :])): 
+        forecastTestLine.add_trace(go.Scatter(
+            y=outputs_pred[:, i],
+            mode="lines",
+            line_color="#F28E2B",
+            showlegend=False
+        ))
+
+    forecastTestLine.update_layout(
+        title="{0} Forecast Model Testing".format(stockCode),
+        xaxis_title="No. of Tests",
+        yaxis_title="Price",
+        template="simple_white",
+        margin=dict(t=10,l=10,b=10,r=10),
+        height=340,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.1,
+            xanchor="right",
+            x=1
+        )
+    )
+
+    forecastTestLine['data'][0]['showlegend']=True
+    forecastTestLine['data'][0]['name']='Actual'
+    forecastTestLine['data'][(0+len(outputs_test[1, :]))]['showlegend']=True
+    forecastTestLine['data'][(0+len(outputs_test[1, :]))]['name']='Predicted'
+
+    return forecastTestLine
+
+#Forecast Training Line Chart
+def createForecastTrainingLineFigure(history, stockCode):
+    forecastTrainingLine = go.Figure()
+
+    #Closed-form engines only have a single history entry, which wouldn't show up as a line
+    mode = "lines" if len(history.history['mse']) > 1 else "markers"
+
+    forecastTrainingLine.add_trace(go.Scatter(
+        y=history.history['mse'],
+        mode=mode,
+        line_color="#4E79A7",
+        name="MSE"
+    ))
+    forecastTrainingLine.add_trace(go.Scatter(
+        y=history.history['mae'],
+        mode=mode,
+        line_color="#F28E2B",
+        name="MAE"
+    ))
+
+    #Marks where early stopping or the time budget ended training
+    epochsRun = history.params.get("epochsRun")
+    if epochsRun is not None and epochsRun < history.params.get("epochs", epochsRun):
+        forecastTrainingLine.add_vline(x=epochsRun-1, line_width=2, line_dash="dash", line_color="#7a7a7a", 
+            annotation_text="Stopped", annotation_position="top left")
+
+    forecastTrainingLine.update_layout(
+        title="{0} Forecast Model Training".format(stockCode),
+        xaxis_title="No. of Epochs",
+        yaxis_title="Error Proportion",
+        template="simple_white",
+        margin=dict(t=10,l=10,b=10,r=10),
+        height=340,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.1,
+            xanchor="right",
+            x=1
+        )
+    )
+
+    return forecastTrainingLine
+
+#Epochs used out of the slider budget and the training time that saved
+def createTrainingSummary(history):
+    epochs = history.params.get("epochs")
+    epochsRun = history.params.get("epochsRun")
+    trainingTime = history.params.get("trainingTime")
+    if epochs is None or epochsRun is None or trainingTime is None:
+        return ""
+
+    timeSaved = (epochs - epochsRun) * trainingTime / max(epochsRun, 1)
+    return "Epochs used: {0}/{1} | Training time: {2:.1f}s | Time saved: ~{3:.1f}s".format(epochsRun, epochs, trainingTime, timeSaved)
+
+#Backtest MAPE at every walk-forward origin
+def createBacktestOriginLineFigure(backtestResult, stockCode):
+    backtestOriginLine = go.Figure()
+
+    backtestOriginLine.add_trace(go.Scatter(
+        x=backtestResult.origins,
+        y=backtestResult.originMape,
+        mode="lines+markers",
+        line_color="#4E79A7",
+        name="MAPE"
+    ))
+
+    backtestOriginLine.add_hline(y=backtestResult.mape, line_width=2, line_dash="dash", line_color="#F28E2B")
+
+    backtestOriginLine.update_layout(
+        title="{0} Backtest MAPE per Origin (overall {1:.2f}%)".format(stockCode, backtestResult.mape),
+        xaxis_title="Forecast Origin",
+        yaxis_title="MAPE (%)",
+        template="simple_white",
+        margin=dict(t=40,l=10,b=10,r=10),
+        height=300
+    )
+
+    return backtestOriginLine
+
+#Backtest MAPE for each day ahead
+def createBacktestHorizonBarFigure(backtestResult, stockCode):
+    backtestHorizonBar = go.Figure(
+        data = go.Bar(
+            x=np.arange(1, len(backtestResult.horizonMape)+1),
+            y=backtestResult.horizonMape,
+            marker_color="#F28E2B"
+    ))
+
+    backtestHorizonBar.update_layout(
+        title="{0} Backtest MAPE per Day Ahead".format(stockCode),
+        xaxis_title="Days Ahead",
+        yaxis_title="MAPE (%)",
+        template="simple_white",
+        margin=dict(t=40,l=10,b=10,r=10),
+        height=300
+    )
+
+    return backtestHorizonBar
+
+### ----- TABLES ----- ###
+
+def createInfoTable(info):
+
+    info_df = pd.DataFrame(list(info.items()))
+    info_df.rename(columns={0:"Information", 1: "Data"}, inplace=True)
+
+    #drops long business summary
+    info_df = info_df.drop(info_df.index[3])
+
+    infoTable = dash_table.DataTable(
+        data=info_df.to_dict("records"), 
+        columns=[{"name": i, "id": i} for i in info_df.columns],
+        style_data={
+            'whiteSpace': 'normal',
+            'height': 'auto',
+            'lineHeight': '40px',
+        },
+        page_action='none',
+        style_table={
+            'height': '335px', 
+        },
+        style_cell={
+            'textAlign': 'left',
+        },
+        tooltip_duration=None
+    )
+    return infoTable
+
+def createRecommendationsTable(recommendations):
+    recommendations_df = pd.DataFrame(recommendations)
+
+    try:
+        recommendations_df["Date"]
+    except:
+        recommendations_df.reset_index(inplace=True)
+
+    recommendations_df = recommendations_df[::-1]
+
+    recommendationsTable = dash_table.DataTable(
+        data=recommendations_df.to_dict("records"), 
+        columns=[{"name": i, "id": i} for i in recommendations_df.columns],
+        style_data={
+            'whiteSpace': 'normal',
+            'height': 'auto',
+        },
+        page_action='none',
+        style_cell={
+            'textAlign': 'left',
+        },
+        style_table={'height': '335px'}
+    )
+    return recommendationsTable
+
+def createActionsTable(actions):
+    actions_df = pd.DataFrame(actions)   
+    actions_df.reset_index(inplace=True)
+    actions_df = actions_df[::-1]
+
+    actionsTable = dash_table.DataTable(
+        data=actions_df.to_dict("records"), 
+        columns=[{"name": i, "id": i} for i in actions_df.columns],
+        style_data={
+            'whiteSpace': 'normal',
+            'height': 'auto',
+            'lineHeight': '40px',
+        },
+        page_action='none',
+        style_cell={
+            'textAlign': 'left',
+        },
+        style_table={'height': '335px'}
+    )
+    return actionsTable
+
+def createHoldersTable(institutional_holders):
+    holders_df = pd.DataFrame(institutional_holders)
+    #actions_df.reset_index(inplace=True)
+    #actions_df = actions_df[::-1]
+
+    holdersTable = dash_table.DataTable(
+        data=holders_df.to_dict("records"), 
+        columns=[{"name": i, "id": i} for i in holders_df.columns],
+        style_data={
+            'whiteSpace': 'normal',
+            'height': 'auto',
+        },
+        page_action='none',
+        style_cell={
+            'textAlign': 'left',
+        },
+        style_table={'height': '335px'} 
+    )
+    return holdersTable
+
+def createSustainabilityTable(sustainability):
+    sustainability_df = pd.DataFrame(sustainability)
+
+    if len(sustainability_df.columns) == 1:
+        sustainability_df.reset_index(inplace=True)
+
+    #sustainability_df.rename(columns={0:"Information", 1: "Data"}, inplace=True)
+
+    sustainabilityTable = dash_table.DataTable(
+        data=sustainability_df.to_dict("records"), 
+        columns=[{"name": i, "id": i} for i in sustainability_df.columns],
+        style_data={
+            'whiteSpace': 'normal',
+            'height': 'auto',
+            'lineHeight': '40px',
+        },
+        page_action='none',
+        style_cell={
+            'textAlign': 'left',
+        },
+        style_table={'height': '335px'} 
+    )
+    return sustainabilityTable
+
+def createSweepTable(sweepResults):
+    sweepTable = dash_table.DataTable(
+        data=sweepResults,
+        columns=[
+            {"name": "Input", "id": "inputDim"},
+            {"name": "Output", "id": "outputDim"},
+            {"name": "Attributes", "id": "attributeNames"},
+            {"name": "Epochs", "id": "epochs"},
+            {"name": "RMSE", "id": "rmse", "type": "numeric", "format": Format(precision=3, scheme=Scheme.fixed)},
+            {"name": "MAPE (%)", "id": "mape", "type": "numeric", "format": Format(precision=3, scheme=Scheme.fixed)},
+            {"name": "Train time (s)", "id": "trainTime", "type": "numeric", "format": Format(precision=2, scheme=Scheme.fixed)}
+        ],
+        page_action='none',
+        style_cell={
+            'textAlign': 'left',
+        },
+        style_table={'maxHeight': '240px', 'overflowY': 'auto'},
+        id="sweep-results-table"
+    )
+    return sweepTable
+
+### ----- NEWS ----- ###
+#Headlines come from the news cache, parsed once per page download
+@metrics.timed("createNewsList")
+def createNewsList(stockCode):
+    news = []
+
+    for article in newsCache.get(stockCode):
+        news.append(
+            dbc.ListGroupItem(
+                [
+                    html.H5(html.A(article["headline"], href=article["link"], target="_blank")),
+                    html.Small(article["timestamp"] + " " + article["provider"]),
+                ]
+            )
+        )
+
+    newsList = dbc.ListGroup(
+        children = news,
+    )
+
+    return newsList
+
+### ----- LAYOUT ----- ###
+
+#Built by display_page on every visit, so the date pickers default to the current day
+#Everything that depends on the selected stock starts as a placeholder and is filled in by the callbacks that fire on load
+def createLayout():
+    return html.Div([
+        dbc.Card(
+            dbc.CardBody([
+
+                #Error alert
+                dbc.Modal(
+                    [
+                        dbc.ModalHeader(dbc.ModalTitle("An error has occured!")),
+                        dbc.ModalBody(["Please re-select valid data parameters and try again."]),
+                    ],
+                    id="error-modal",
+                    centered=True,
+                    is_open=False,
+                ),
+                dbc.Modal(
+                    [
+                        dbc.ModalHeader(dbc.ModalTitle("An error has occured!")),
+                        dbc.ModalBody(["The forecast model could not be trained, please re-select valid model parameters and try again."]),
+                    ],
+                    id="forecast-error-modal",
+                    centered=True,
+                    is_open=False,
+                ),
+
+                #Selected price data and the background training job, see the callbacks
+                dcc.Store(id="price-data-store"),
+                dcc.Store(id="forecast-job-store"),
+
+                #Price series and forecast numbers the browser draws the charts and labels from
+                dcc.Store(id="price-series-store"),
+                dcc.Store(id="forecast-summary-store"),
+                dcc.Store(id="figure-template-store", data=pio.templates["simple_white"].to_plotly_json()),
+                dcc.Interval(id="forecast-job-interval", interval=500, disabled=True),
+
+                #Row 1 - Title
+                dbc.Row([
+                    dbc.Col([
+                        html.Div([
+                            html.H1([
+                                html.Span("Fore", style={"color": "#F28E2B"}),
+                                html.Span("Co ", style={"color": "#4E79A7"}),
+                                html.Span("Invest | "),
+                                html.Span("Analyse", style={"color": "#F28E2B"})
+                            ])
+                        ], style={"textAlign": "center"})
+                    ], width={"size": 6, "offset": 3}),
+
+                    dbc.Col([
+                        dcc.Loading(
+                            id="loading",
+                            type="circle", #default
+                            color="#4E79A7",
+                            children=[
+                                html.Div([], style={"display": "none"}, id="loading-div"),
+                                html.Div([], style={"display": "none"}, id="loading-div-2")
+                            ]    
+                        )
+                    ], width={"size": 1, "offset": 2}, className="pt-4 mt-2")
+
+                ], className="mb-4"),
+
+                #Row 2 - Data select
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card(
+                            dbc.CardBody([
+                                dbc.Row([
+                                    dbc.Col([
+                                        dcc.Dropdown(
+                                            options = [
+                                                {"label": "Apple Inc. (AAPL)", "value": "AAPL"},
+                                                {"label": "Alphabet Inc. (GOOGL)", "value": "GOOGL"},
+                                                {"label": "Microsoft Corporation (MSFT)", "value": "MSFT"},
+                                                {"label": "Tesla, Inc. (TSLA)", "value": "TSLA"},
+                                                {"label": "Advanced Micro Devices, Inc. (AMD)", "value": "AMD"},
+                                                {"label": "NVIDIA Corporation (NVDA)", "value": "NVDA"},
+                                                {"label": "Intel Corporation (INTC)", "value": "INTC"},
+                                                {"label": "The Coca-Cola Company (KO)", "value": "KO"},
+                                                {"label": "McDonald's Corporation (MCD)", "value": "MCD"},
+                                                {"label": "Starbucks Corporation (SBUX)", "value": "SBUX"},
+                                            ], 
+                                            value="AAPL", 
+                                            id="stock-select-dropdown"
+                                        )
+                                    ], width=6),
+                                    dbc.Col([
+                                        dcc.Dropdown(
+                                            options = [
+                                                {"label": "Daily bars", "value": "1d"},
+                                                {"label": "Hourly bars", "value": "60m"},
+                                                {"label": "15 minute bars", "value": "15m"},
+                                                {"label": "5 minute bars", "value": "5m"},
+                                                {"label": "1 minute bars", "value": "1m"},
+                                            ], 
+                                            value="1d", 
+                                            clearable=False,
+                                            id="interval-select-dropdown"
+                                        )
+                                    ], width=2),
+                                    dbc.Col([
+                                        html.Div([
+                                            html.P("Start Date:", style={'textAlign': 'right', "margin": "0px 0px 0px 0px"})
+                                        ])
+                                    ], width=1),
+                                    dbc.Col([
+                                        dcc.DatePickerSingle(
+                                            date=(dt.date.today() - dt.timedelta(days=150)),
+                                            max_date_allowed=dt.date.today(),
+                                            min_date_allowed=(dt.date.today() - dt.timedelta(days=365*3)),
+                                            display_format="DD/MM/YYYY",
+                                            id="start-date-picker"
+                                        )
+                                    ], width=1),
+                                    dbc.Col([
+                                        html.Div([
+                                            html.P("End Date:", style={'textAlign': 'right', "margin": "0px 0px 0px 0px"})
+                                        ])   
+                                    ], width=1),
+                                    dbc.Col([
+                                        dcc.DatePickerSingle(
+                                            date=dt.date.today(),
+                                            max_date_allowed=dt.date.today(),
+                                            min_date_allowed=(dt.date.today() - dt.timedelta(days=365*3)),
+                                            display_format="DD/MM/YYYY",
+                                            id="end-date-picker"
+                                        )
+                                    ], width=1),
+                                ], align="center")
+                            ])
+                        )
+                    ])
+                ], className="mb-3"),
+
+                #Row 3 - Summary
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardBody([
+                                html.Div([
+                                    html.P("Is it worth a buy?"),
+                                    html.H3("-", 
+                                        id="suggestion-label", 
+                                        style={"color": "#F28E2B"}
+                                    )
+                                ], style={'textAlign': 'center'})
+                            ])
+                        ])
+                    ], width = 2),
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardBody([
+                                html.Div([
+                                    html.P("Expected chage:"),
+                                    html.H3("-", 
+                                        id="change-label",
+                                        style={"color": "#F28E2B"}
+                                    )
+                                ], style={'textAlign': 'center'})
+                            ])
+                        ])
+                    ], width = 2),
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardBody([
+                                html.Div([
+                                    html.P("Forecast model test MAPE:"),
+                                    html.H3("-", 
+                                        id="mape-label", 
+                                        style={"color": "#4E79A7"}
+                                    )
+                                ], style={'textAlign': 'center'})
+                            ])
+                        ])
+                    ], width = 2),
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardBody([
+                                dbc.Row([
+                                    dbc.Col([
+                                        dcc.Graph(
+                                            figure=go.Figure(layout=dict(template="simple_white", height=82, margin=dict(t=10,l=10,b=10,r=10), xaxis_visible=False, yaxis_visible=False)),
+                                            config={"displayModeBar" : False},
+                                            id="price-sparkline"
+                                        )
+                                    ], width=6),
+                                    dbc.Col([
+                                        dcc.Graph(
+                                            figure=go.Figure(layout=dict(template="simple_white", height=82, margin=dict(t=10,l=10,b=10,r=10), xaxis_visible=False, yaxis_visible=False)),
+                                            config={"displayModeBar" : False},
+                                            id="volume-sparkline"
+                                        )
+                                    ], width=6)
+                                ])
+                            ], className="pb-2 pt-4")
+                        ])
+                    ], width=5),
+                    dbc.Col([
+                        html.Div([
+                            dcc.Link(dbc.Button("Compare", color="compare", className="me-1", size="lg"), href="/compare")
+                        ])
+                    ], width=1, align="center")
+                ], className="mb-3"),
+
+                #Row4 - Forecast
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardBody([
+                                #Row1 - Charts
+                                dbc.Row([
+                                    dbc.Col([
+                                        #html.H5("(^FTSE) Price Forecast"),
+                                        dcc.Graph(
+                                            figure=go.Figure(layout=dict(template="simple_white", height=340)),
+                                            config={"displayModeBar" : False},
+                                            id="forecast-results-line"
+                                        )
+                                    ], width=4, style={"text-align": "center"}),
+                                    dbc.Col([
+                                        #html.H5("(^FTSE) Model Test Results"),
+                                        dcc.Graph(
+                                            figure=go.Figure(layout=dict(template="simple_white", height=340)),
+                                            config={"displayModeBar" : False},
+                                            id="forecast-test-line"
+                                        )
+                                    ], width=4, style={"text-align": "center"}),
+                                    dbc.Col([
+                                        #html.H5("(^FTSE) Model Training Progress"),
+                                        dcc.Graph(
+                                            figure=go.Figure(layout=dict(template="simple_white", height=340)),
+                                            config={"displayModeBar" : False},
+                                            id="forecast-training-line"
+                                        )   
+                                    ], width=4, style={"text-align": "center"})
+                                ], className="mb-2"),
+                                #Row2 - Filters
+                                dbc.Row([
+                                    dbc.Col([
+                                        dbc.Row([
+                                            dbc.Col([
+                                                html.P("Input: ", style={'textAlign': 'right', "margin": "0px 0px 0px 0px"})
+                                            ], width=7),
+                                            dbc.Col([
+                                                dcc.Input(
+                                                    type="number",
+                                                    value=20,
+                                                    style={'width': 80, "text-align": "center"},
+                                                    id="input-days-input"
+                                                )
+                                            ], width=5)
+                                        ], align="center")
+                                    ], width=1),
+                                    dbc.Col([
+                                        dbc.Row([
+                                            dbc.Col([
+                                                html.P("Output: ", style={'textAlign': 'right', "margin": "0px 0px 0px 0px"})
+                                            ], width=7),
+                                            dbc.Col([
+                                                dcc.Input(
+                                                    type="number",
+                                                    value=10,
+                                                    style={'width': 80, "text-align": "center"},
+                                                    id="output-days-input"
+                                                )
+                                            ], width=5)
+                                        ], align="center")
+                                    ], width=2),
+                                    dbc.Col([
+                                        dcc.Dropdown(
+                                            options = [
+                                                {"label": "Open", "value": 0},
+                                                {"label": "High", "value": 1},
+                                                {"label": "Low", "value": 2},
+                                                {"label": "Close", "value": 3},
+                                                {"label": "Adj Close", "value": 4},
+                                                {"label": "Volume", "value": 5}
+                                            ],
+                                            multi=True,
+                                            value=[0,1,2,3,4,5],
+                                            id="attributes-select-dropdown"
+                                        )
+                                    ], width=4, className="attributes-dropdown"),
+                                    dbc.Col([
+                                        dcc.Dropdown(
+                                            options = [
+                                                {"label": "Neural network", "value": "keras"},
+                                                {"label": "Ridge regression", "value": "ridge"},
+                                                {"label": "Ensemble", "value": "ensemble"}
+                                            ],
+                                            value="keras",
+                                            clearable=False,
+                                            id="engine-select-dropdown"
+                                        )
+                                    ], width=1),
+                                    dbc.Col([
+                                        dcc.Slider(10, 100, 10, value=50, id="epochs-slider")
+                                    ], width=4)                             
+                                ], align="center", className="mb-2"),
+                                #Row3 - Training options
+                                dbc.Row([
+                                    dbc.Col([
+                                        dcc.Checklist(
+                                            options=[{"label": " Early stopping", "value": "early-stopping"}],
+                                            value=[],
+                                            id="early-stopping-checklist"
+                                        )
+                                    ], width=2),
+                                    dbc.Col([
+                                        dbc.Row([
+                                            dbc.Col([
+                                                html.P("Time budget (s): ", style={'textAlign': 'right', "margin": "0px 0px 0px 0px"})
+                                            ], width=7),
+                                            dbc.Col([
+                                                dcc.Input(
+                                                    type="number",
+                                                    min=1,
+                                                    placeholder="None",
+                                                    style={'width': 80, "text-align": "center"},
+                                                    id="time-budget-input"
+                                                )
+                                            ], width=5)
+                                        ], align="center")
+                                    ], width=3),
+                                    dbc.Col([
+                                        html.Small("", id="training-summary-label")
+                                    ], width=7, style={'textAlign': 'right'})
+                                ], align="center")
+                            ])
+                        ])
+                    ], align="center")
+                ], className="mb-3"),
+
+                #Row 5 - Hyperparameter sweep
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardBody([
+                                dbc.Row([
+                                    dbc.Col([
+                                        html.H5("Model parameter sweep", style={"margin": "0px 0px 0px 0px"})
+                                    ], width=4),
+                                    dbc.Col([
+                                        html.P(style={"margin": "0px 0px 0px 0px"}, id="sweep-status-label")
+                                    ], width=4),
+                                    dbc.Col([
+                                        dbc.Button("Run sweep", color="compare", className="me-1", id="sweep-button"),
+                                        dbc.Button("Apply best", color="analyse", className="me-1", id="apply-best-button", disabled=True)
+                                    ], width=4, style={'textAlign': 'right'})
+                                ], align="center", className="mb-2"),
+                                dcc.Loading(
+                                    type="circle",
+                                    color="#4E79A7",
+                                    children=[
+                                        createSweepTable([]),
+                                        dcc.Store(id="sweep-results-store")
+                                    ]
+                                ),
+
+                                #The sweep runs as a background job, polled like the forecast's
+                                dcc.Store(id="sweep-job-store"),
+                                dcc.Interval(id="sweep-job-interval", interval=1000, disabled=True)
+                            ])
+                        ])
+                    ])
+                ], className="mb-3"),
+
+                #Row 6 - Walk-forward backtest
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardBody([
+                                dbc.Row([
+                                    dbc.Col([
+                                        html.H5("Walk-forward backtest", style={"margin": "0px 0px 0px 0px"})
+                                    ], width=4),
+                                    dbc.Col([
+                                        html.P(style={"margin": "0px 0px 0px 0px"}, id="backtest-status-label")
+                                    ], width=3),
+                                    dbc.Col([
+                                        dcc.Dropdown(
+                                            options = [
+                                                {"label": "Expanding window", "value": "expanding"},
+                                                {"label": "Rolling window", "value": "rolling"}
+                                            ],
+                                            value="expanding",
+                                            clearable=False,
+                                            id="backtest-mode-dropdown"
+                                        )
+                                    ], width=3),
+                                    dbc.Col([
+                                        dbc.Button("Run backtest", color="compare", className="me-1", id="backtest-button")
+                                    ], width=2, style={'textAlign': 'right'})
+                                ], align="center", className="mb-2"),
+                                dcc.Loading(
+                                    type="circle",
+                                    color="#4E79A7",
+                                    children=[
+                                        dbc.Row([
+                                            dbc.Col([
+                                                dcc.Graph(
+                                                    figure=go.Figure(layout=dict(template="simple_white", height=300)),
+                                                    config={"displayModeBar" : False},
+                                                    id="backtest-origin-line"
+                                                )
+                                            ], width=8),
+                                            dbc.Col([
+                                                dcc.Graph(
+                                                    figure=go.Figure(layout=dict(template="simple_white", height=300)),
+                                                    config={"displayModeBar" : False},
+                                                    id="backtest-horizon-bar"
+                                                )
+                                            ], width=4)
+                                        ])
+                                    ]
+                                ),
+
+                                #The backtest runs as a background job, polled like the sweep's
+                                dcc.Store(id="backtest-job-store"),
+                                dcc.Interval(id="backtest-job-interval", interval=1000, disabled=True)
+                            ])
+                        ])
+                    ])
+                ], className="mb-3"),
+
+                #Row 7 - Company statistics
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardBody([
+                                dbc.Row([
+                                    dcc.Graph(
+                                        figure=go.Figure(layout=dict(template="simple_white", height=500)),
+                                        config={"displayModeBar" : False},
+                                        id="price-candle"
+                                    )
+                                ]),
+                                dbc.Row([
+                                    dcc.Graph(
+                                        figure=go.Figure(layout=dict(template="simple_white", height=250)),
+                                        config={"displayModeBar" : False},
+                                        id="volume-bar"                                   
+                                    )
+                                ])
+                            ])
+                        ])
+                    ], width=7, style={"text-align": "center"}),
+                    dbc.Col([
+                        dbc.Card([  
+                            dbc.CardHeader(
+                                dbc.Tabs(
+                                    [
+                                        dbc.Tab(label="Stock Info", tab_id="stock-info-tab"),
+                                        dbc.Tab(label="Recommendations", tab_id="recommendations-tab"),
+                                        dbc.Tab(label="Actions", tab_id="actions-tab"),
+                                        dbc.Tab(label="Holders", tab_id="holders-tab"),
+                                        dbc.Tab(label="Sustainability", tab_id="sustainability-tab"),
+                                    ],
+                                    id="stock-stats-tabs",
+                                    active_tab="stock-info-tab",
+                                )
+                            ),  
+
+                            dbc.CardBody([
+                                #createInfoTable(info)
+                            ], id="stock-stats-content", style={"overflow-y": "auto"}), 
+
+                        ], className="pb-3 mb-3"),
+                        dbc.Card([
+                            dbc.CardBody([
+                                html.Div(
+                                    [],
+                                    style={"maxHeight": "284px"},
+                                    id="news-list"
+                                ),
+                            ], style={"overflow-x": "auto"})
+                        ], className="pb-3")
+                    ], width=5)
+                ]),
+
+            ]),
+            color="light",
+            className="px-3"
+        )
+    ])
+
+### ----- CALLBACKS ----- ###
+
+#The page is a graph of small callbacks, so a change only recomputes what depends on it:
+#    stock, dates and interval -> price-data-store -> price charts
+#    price-data-store and model settings -> forecast-job-store -> forecast charts and labels (update_forecast_figures)
+#    stock -> news and fundamentals tabs
+#The price data itself stays in data_access' cache, the store only says which data is selected.
+
+#Change on stock select!
+@callback(
+    Output("price-data-store", "data"),
+    Output("error-modal", "is_open"),
+
+    Input("stock-select-dropdown", "value"),
+    Input("start-date-picker", "date"),
+    Input("end-date-picker", "date"),
+    Input("interval-select-dropdown", "value"),
+
+    State("price-data-store", "data")
+)
+@metrics.timed("callback.update_price_data")
+def update_price_data(selected_stock, selected_startDate, selected_endDate, interval, priceData):
+    try:
+        startDate = dt.date.fromisoformat(selected_startDate).strftime("%Y-%m-%d")
+        endDate = dt.date.fromisoformat(selected_endDate).strftime("%Y-%m-%d")
+
+        stockData_df = downloadStockData(selected_stock, startDate, endDate, interval)
+        if stockData_df.empty:
+            raise ValueError("No price data for {0}".format(selected_stock))
+
+        #The rows and last bar tell the charts and forecast whether the data changed, not just the selection
+        newPriceData = {"stockCode": selected_stock, "startDate": startDate, "endDate": endDate, "interval": interval,
+            "rows": len(stockData_df), "lastBar": str(stockData_df.index[-1])}
+        if newPriceData == priceData:
+            return dash.no_update, False
+        return newPriceData, False
+    except Exception:
+        return dash.no_update, True
+
+def loadPriceData(priceData):
+    return downloadStockData(priceData["stockCode"], priceData["startDate"], priceData["endDate"], priceData["interval"])
+
+#The fitOptions of the early stopping and time budget controls, shared by the forecast and the backtest
+def createFitOptions(earlyStopping, timeBudget):
+    fitOptions = {}
+    if earlyStopping:
+        fitOptions.update(validationSplit=0.2, patience=5, minDelta=0.0005)
+    if timeBudget:
+        fitOptions.update(timeBudget=timeBudget)
+    return fitOptions
+
+#The price charts are drawn by the priceFigures clientside callback from what this sends
+@callback(
+    Output("price-series-store", "data"),
+
+    Output("loading-div", "children"),
+
+    Input("price-data-store", "data")
+)
+@metrics.timed("callback.update_price_series")
+def update_price_series(priceData):
+    if priceData is None:
+        raise dash.exceptions.PreventUpdate
+
+    with metrics.span("figures"):
+        priceSeries = createPriceSeries(loadPriceData(priceData), priceData["stockCode"])
+
+    #For loading element
+    loaded = "loaded"
+
+    return priceSeries, loaded
+
+#The forecast is submitted as a background training job, its charts are filled in by update_forecast_figures
+@callback(
+    Output("forecast-job-store", "data"),
+
+    Input("price-data-store", "data"),
+
+    Input("input-days-input", "value"),
+    Input("output-days-input", "value"),
+    Input("attributes-select-dropdown", "value"),
+    Input("epochs-slider", "value"),
+    Input("engine-select-dropdown", "value"),
+    Input("early-stopping-checklist", "value"),
+    Input("time-budget-input", "value")
+)
+@metrics.timed("callback.submit_forecast")
+def submit_forecast(priceData, inputDim, outputDim, attributes, epochs, engine, earlyStopping, timeBudget):
+    #Half typed settings wait until they are complete, the last forecast stays up meanwhile
+    if priceData is None or not inputDim or not outputDim or not attributes or not epochs:
+        raise dash.exceptions.PreventUpdate
+
+    try:
+        return {"jobId": trainingJobs.submit(loadPriceData(priceData), inputDim, outputDim, attributes, epochs, priceData["stockCode"], engine, 
+            createFitOptions(earlyStopping, timeBudget))}
+    except Exception as e:
+        #Opens the forecast error modal through update_forecast_figures
+        return {"error": str(e)}
+
+#News has its own callback so a slow news site never holds up the charts
+@callback(
+    Output("news-list", "children"),
+
+    Input("stock-select-dropdown", "value")
+)
+@metrics.timed("callback.update_news")
+def update_news(selected_stock):
+    #The fundamentals tabs download in the background while the news loads
+    fundamentalsCache.prefetch(selected_stock)
+
+    try:
+        return createNewsList(selected_stock)
+    except Exception:
+        return dbc.ListGroup(children=[dbc.ListGroupItem("News is unavailable right now, please try again later.")])
+
+#Polls the training job, the training chart fills in epoch by epoch and the rest updates once it completes
+#The labels are drawn by the forecastLabels clientside callback from the forecast summary
+@callback(
+    Output("forecast-summary-store", "data"),
+
+    Output("forecast-results-line", "figure"),
+    Output("forecast-test-line", "figure"),
+    Output("forecast-training-line", "figure"),
+    Output("training-summary-label", "children"),
+
+    Output("forecast-job-interval", "disabled"),
+    Output("forecast-error-modal", "is_open"),
+
+    Input("forecast-job-store", "data"),
+    Input("forecast-job-interval", "n_intervals")
+)
+
+@metrics.timed("callback.update_forecast_figures")
+def update_forecast_figures(forecastJob, n_intervals):
+    if forecastJob is not None and "error" in forecastJob:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, True, True
+
+    jobId = forecastJob["jobId"] if forecastJob else None
+    job = trainingJobs.getJob(jobId) if jobId else None
+    if job is None:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, True, dash.no_update
+
+    try:
+        results = trainingJobs.result(jobId)
+    except Exception:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, True, True
+
+    selected_stock = job["stockCode"]
+
+    if results is None:
+        forecastTrainingLine = createForecastTrainingLineFigure(trainingJobs.progress(jobId), selected_stock)
+
+        return dash.no_update, dash.no_update, dash.no_update, forecastTrainingLine, "Training...", False, False
+
+    stockData_df = job["stockData"]
+    forecastResults, outputs_test, outputs_pred, rmse, mape, history = results
+
+    expectedChange = ((forecastResults.iloc[-1, 0] - stockData_df.iloc[-1, 3])/stockData_df.iloc[-1, 3])*100
+    #With an ensemble the lower band has to end above the current price as well
+    if "Lower" in forecastResults:
+        worstChange = ((forecastResults["Lower"].iloc[-1] - stockData_df.iloc[-1, 3])/stockData_df.iloc[-1, 3])*100
+    else:
+        worstChange = expectedChange
+    forecastSummary = {"expectedChange": float(expectedChange), "worstChange": float(worstChange), "mape": float(mape)}
+
+    with metrics.span("forecastFigures"):
+        forecastResultsLine = createForecastResultsLineFigure(stockData_df, forecastResults, selected_stock)
+        forecastTestLine = createForecastTestLineFigure(outputs_test, outputs_pred, selected_stock)
+        forecastTrainingLine = createForecastTrainingLineFigure(history, selected_stock)
+        trainingSummary = createTrainingSummary(history)
+
+    return forecastSummary, forecastResultsLine, forecastTestLine, forecastTrainingLine, trainingSummary, True, False
+
+#Sweeps input days, attributes and epochs around the current settings, keeping the output days the user chose
+#The configurations are trained as background jobs, their results are filled in by update_sweep_results
+@callback(
+    Output("sweep-job-store", "data"),
+
+    Input("sweep-button", "n_clicks"),
+
+    State("stock-select-dropdown", "value"),
+    State("start-date-picker", "date"),
+    State("end-date-picker", "date"),
+    State("interval-select-dropdown", "value"),
+    State("output-days-input", "value"),
+    State("epochs-slider", "value"),
+    State("engine-select-dropdown", "value"),
+    prevent_initial_call=True
+)
+@metrics.timed("callback.submit_sweep")
+def submit_sweep(n_clicks, selected_stock, selected_startDate, selected_endDate, interval, outputDim, epochs, engine):
+    try:
+        startDate = dt.date.fromisoformat(selected_startDate).strftime("%Y-%m-%d")
+        endDate = dt.date.fromisoformat(selected_endDate).strftime("%Y-%m-%d")
+        stockData_df = downloadStockData(selected_stock, startDate, endDate, interval)
+        if stockData_df.empty:
+            raise ValueError("No price data for {0}".format(selected_stock))
+
+        configs = sweep.createGrid([10, 20, 30], [outputDim], [[0,1,2,3,4,5], [0,1,2,3], [3]], sorted({epochs, min(epochs*2, 100)}))
+        return {"jobId": trainingJobs.submitSweep(stockData_df, configs, engine=engine)}
+    except Exception as e:
+        #Shown by update_sweep_results, the only callback writing to the sweep card
+        return {"error": str(e)}
+
+#Polls the sweep job, the table fills in once every configuration has finished
+@callback(
+    Output("sweep-results-table", "data"),
+    Output("sweep-results-store", "data"),
+    Output("apply-best-button", "disabled"),
+    Output("sweep-status-label", "children"),
+    Output("sweep-job-interval", "disabled"),
+
+    Input("sweep-job-store", "data"),
+    Input("sweep-job-interval", "n_intervals"),
+    prevent_initial_call=True
+)
+@metrics.timed("callback.update_sweep_results")
+def update_sweep_results(sweepJob, n_intervals):
+    if sweepJob is None:
+        raise dash.exceptions.PreventUpdate
+
+    try:
+        if "error" in sweepJob:
+            raise RuntimeError(sweepJob["error"])
+        finished, total, sweepResults = trainingJobs.batchResult(sweepJob["jobId"])
+    except Exception as e:
+        return [], [], True, "Sweep failed: {0}".format(e), True
+
+    if sweepResults is None:
+        return dash.no_update, dash.no_update, True, "Sweeping... {0} of {1} configurations done".format(finished, total), False
+
+    sweepResults = sweepResults[sweepResults["error"] == ""]
+
+    attributeNames = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+    sweepResults = sweepResults.assign(attributeNames=[", ".join(attributeNames[a] for a in attributes) for attributes in sweepResults["attributes"]])
+
+    records = sweepResults.drop(columns=["error"]).to_dict("records")
+    return records, records, len(records) == 0, "{0} of {1} configurations trained".format(len(records), total), True
+
+#Applying the best configuration changes the model inputs, which retrains through submit_forecast
+@callback(
+    Output("input-days-input", "value"),
+    Output("output-days-input", "value"),
+    Output("attributes-select-dropdown", "value"),
+    Output("epochs-slider", "value"),
+
+    Input("apply-best-button", "n_clicks"),
+
+    State("sweep-results-store", "data"),
+    prevent_initial_call=True
+)
+@metrics.timed("callback.apply_best_sweep")
+def apply_best_sweep(n_clicks, sweepResults):
+    best = sweepResults[0]
+    return best["inputDim"], best["outputDim"], best["attributes"], best["epochs"]
+
+#Backtests the current model settings, the origins are trained as background jobs and scored by update_backtest_figures
+@callback(
+    Output("backtest-job-store", "data"),
+
+    Input("backtest-button", "n_clicks"),
+
+    State("stock-select-dropdown", "value"),
+    State("start-date-picker", "date"),
+    State("end-date-picker", "date"),
+    State("interval-select-dropdown", "value"),
+    State("input-days-input", "value"),
+    State("output-days-input", "value"),
+    State("attributes-select-dropdown", "value"),
+    State("epochs-slider", "value"),
+    State("engine-select-dropdown", "value"),
+    State("early-stopping-checklist", "value"),
+    State("time-budget-input", "value"),
+    State("backtest-mode-dropdown", "value"),
+    prevent_initial_call=True
+)
+@metrics.timed("callback.submit_backtest")
+def submit_backtest(n_clicks, selected_stock, selected_startDate, selected_endDate, interval, inputDim, outputDim, attributes, epochs, engine, 
+        earlyStopping, timeBudget, mode):
+    try:
+        startDate = dt.date.fromisoformat(selected_startDate).strftime("%Y-%m-%d")
+        endDate = dt.date.fromisoformat(selected_endDate).strftime("%Y-%m-%d")
+        stockData_df = downloadStockData(selected_stock, startDate, endDate, interval)
+
+        #Half the history trains the first origin, the rest is walked forward through
+        minTrainRows = max(len(stockData_df)//2, 2*(inputDim+outputDim))
+        jobId = trainingJobs.submitBacktest(stockData_df, inputDim, outputDim, attributes, epochs, minTrainRows, mode, engine, 
+            createFitOptions(earlyStopping, timeBudget))
+        return {"jobId": jobId, "stockCode": selected_stock}
+    except Exception as e:
+        #Shown by update_backtest_figures, the only callback writing to the backtest card
+        return {"error": str(e)}
+
+#Polls the backtest job, the charts are drawn once every origin has been forecast
+@callback(
+    Output("backtest-origin-line", "figure"),
+    Output("backtest-horizon-bar", "figure"),
+    Output("backtest-status-label", "children"),
+    Output("backtest-job-interval", "disabled"),
+
+    Input("backtest-job-store", "data"),
+    Input("backtest-job-interval", "n_intervals"),
+    prevent_initial_call=True
+)
+@metrics.timed("callback.update_backtest_figures")
+def update_backtest_figures(backtestJob, n_intervals):
+    if backtestJob is None:
+        raise dash.exceptions.PreventUpdate
+
+    try:
+        if "error" in backtestJob:
+            raise RuntimeError(backtestJob["error"])
+        finished, total, backtestResult = trainingJobs.batchResult(backtestJob["jobId"])
+    except Exception as e:
+        return dash.no_update, dash.no_update, "Backtest failed: {0}".format(e), True
+
+    if backtestResult is None:
+        return dash.no_update, dash.no_update, "Backtesting... {0} of {1} origins done".format(finished, total), False
+
+    selected_stock = backtestJob["stockCode"]
+    backtestOriginLine = createBacktestOriginLineFigure(backtestResult, selected_stock)
+    backtestHorizonBar = createBacktestHorizonBarFigure(backtestResult, selected_stock)
+
+    return backtestOriginLine, backtestHorizonBar, "{0} origins forecast".format(total), True
+
+@callback(
+    Output("stock-stats-content", "children"),
+    Output("loading-div-2", "children"),
+
+    Input("stock-stats-tabs", "active_tab"),
+    Input("stock-select-dropdown", "value"),
+)
+@metrics.timed("callback.change_tab_content")
+def change_tab_content(activeTab, stockCode):
+    if activeTab == "stock-info-tab":
+        tabContents = createInfoTable(fundamentalsCache.get(stockCode, "info"))
+    elif activeTab == "recommendations-tab":
+        tabContents = createRecommendationsTable(fundamentalsCache.get(stockCode, "recommendations"))
+    elif activeTab == "actions-tab":
+        tabContents = createActionsTable(fundamentalsCache.get(stockCode, "actions"))
+    elif activeTab == "holders-tab":
+        tabContents = createHoldersTable(fundamentalsCache.get(stockCode, "institutional_holders"))
+    elif activeTab == "sustainability-tab":
+        tabContents = createSustainabilityTable(fundamentalsCache.get(stockCode, "sustainability"))
+
+    loaded = "loaded"
+
+    return tabContents, loaded
+    
+
+#Presentation only callbacks run in the browser (assets/clientside.js), registered on the app by app.py
+def registerClientsideCallbacks(app):
+    app.clientside_callback(
+        ClientsideFunction(namespace="foreco", function_name="priceFigures"),
+
+        Output("price-sparkline", "figure"),
+        Output("volume-sparkline", "figure"),
+
+        Output("price-candle", "figure"),
+        Output("volume-bar", "figure"),
+
+        Input("price-series-store", "data"),
+
+        State("figure-template-store", "data")
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="foreco", function_name="forecastLabels"),
+
+        Output("suggestion-label", "children"),
+        Output("suggestion-label", "style"),
+
+        Output("change-label", "children"),
+        Output("change-label", "style"),
+
+        Output("mape-label", "children"),
+        Output("mape-label", "style"),
+
+        Input("forecast-summary-store", "data")
+    )
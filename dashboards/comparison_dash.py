@@ -1,292 +1,333 @@
-from dash import dcc, html, Input, Output, callback
-
-import dash_bootstrap_components as dbc
-
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
-
-import datetime as dt
-
-import yfinance as yf
-from yahoofinancials import YahooFinancials
-
-import forecast
-
-def downloadStockData(stockName, startDate, endDate):
-    #aapl_df = yf.download('^NDX', start='2020-01-01', end='2021-01-01', progress=False)
-    df = yf.download(stockName, start=startDate, end=endDate)
-    return df
-
-stockData_df_1 = downloadStockData("^FTSE", (dt.date.today()-dt.timedelta(days=150)).strftime("%Y-%m-%d"), dt.date.today().strftime("%Y-%m-%d"))
-stockData_df_2 = downloadStockData("^GSPC", (dt.date.today()-dt.timedelta(days=150)).strftime("%Y-%m-%d"), dt.date.today().strftime("%Y-%m-%d"))
-
-#forecastResults_1, outputs_test_1, outputs_pred_1, rmse_1, mape_1, history_1 = forecast.forecast(stockData_df_1, 20, 10, [0,1,2,3,4,5], 50)
-#forecastResults_2, outputs_test_2, outputs_pred_2, rmse_2, mape_2, history_2 = forecast.forecast(stockData_df_2, 20, 10, [0,1,2,3,4,5], 50)
-
-### ----- FIGURES ----- ###
-
-#Summary Price Sparkline
-def createPriceSparklineFigure(stockData_df_1, stockData_df_2):
-    priceSparkline = go.Figure(
-        data=go.Scatter(
-            x=stockData_df_1.index,
-            y=stockData_df_1["Close"],
-            mode="lines",
-            line_color="#4E79A7"
-    ))
-
-    priceSparkline.add_trace(go.Scatter(
-        x=stockData_df_2.index,
-        y=stockData_df_2["Close"],
-        mode="lines",
-        line_color="#F28E2B"
-    ))
-
-    priceSparkline.update_layout(
-        template="simple_white",
-        annotations=[], 
-        overwrite=True,
-        showlegend=False,
-        plot_bgcolor="white",
-        margin=dict(t=10,l=10,b=10,r=10),
-        height=82
-    )
-
-    priceSparkline.update_xaxes(visible=False, fixedrange=True)
-    priceSparkline.update_yaxes(visible=False, fixedrange=True)
-
-    priceSparkline.add_annotation(text="Price:",
-                  xref="paper", yref="paper",
-                  x=0.00, y=1.25, showarrow=False)
-
-    return priceSparkline
-
-#Summary Volume Bar Sparkline
-def createVolumeSparklineFigure(stockData_df_1, stockData_df_2):
-    volumeSparkline = go.Figure(
-        data = go.Bar(
-            x=stockData_df_1.index,
-            y=stockData_df_1["Volume"],
-            marker_color="#4E79A7" 
-    ))
-
-    volumeSparkline.add_trace(go.Bar(
-        x=stockData_df_2.index,
-        y=stockData_df_2["Volume"],
-        marker_color="#F28E2B" 
-    ))
-
-    volumeSparkline.update_layout(
-        template="simple_white",
-        annotations=[], 
-        overwrite=True,
-        showlegend=False,
-        plot_bgcolor="white",
-        margin=dict(t=10,l=10,b=10,r=10),
-        height=82,
-    )
-
-    volumeSparkline.update_xaxes(visible=False, fixedrange=True)
-    volumeSparkline.update_yaxes(visible=False, fixedrange=True)
-
-    volumeSparkline.add_annotation(text="Volume:",
-                xref="paper", yref="paper",
-                x=0.00, y=1.25, showarrow=False)
-
-    return volumeSparkline
-
-### ----- LAYOUT ----- ###
-
-layout = html.Div([
-    dbc.Card(
-        dbc.CardBody([
-
-            #Error alert
-            dbc.Modal(
-                [
-                    dbc.ModalHeader(dbc.ModalTitle("An error has occured!")),
-                    dbc.ModalBody(["Please re-select valid data parameters and try again."]),
-                ],
-                id="error-modal",
-                centered=True,
-                is_open=False,
-            ),
-
-            #Row 1 - Title
-            dbc.Row([
-                dbc.Col([
-                    html.Div([
-                        html.H1([
-                            html.Span("Fore", style={"color": "#F28E2B"}),
-                            html.Span("Co ", style={"color": "#4E79A7"}),
-                            html.Span("Invest | "),
-                            html.Span("Compare", style={"color": "#4E79A7"})
-                        ])
-                    ], style={"textAlign": "center"})
-                ], width={"size": 6, "offset": 3}),
-
-                dbc.Col([
-                    dcc.Loading(
-                        id="loading",
-                        type="circle", #default
-                        color="#4E79A7",
-                        children=[
-                            html.Div([], style={"display": "none"}, id="loading-div")
-                        ]    
-                    )
-                ], width={"size": 1, "offset": 2}, className="pt-4 mt-2")
-
-            ], className="mb-4"),
-
-            #Row 2 - Data select
-            dbc.Row([
-                dbc.Col([
-                    dbc.Card(
-                        dbc.CardBody([
-                            dbc.Row([
-                                dbc.Col([
-                                    dcc.Dropdown(
-                                        options = [
-                                            {"label": "FTSE 100 (^FTSE)", "value": "^FTSE"},
-                                            {"label": "S&P 500 (^GSPC)", "value": "^GSPC"},
-                                            {"label": "Dow Jones Industrial Average (^DJI)", "value": "^DJI"},
-                                            {"label": "NASDAQ Composite (^IXIC)", "value": "^IXIC"},
-                                            {"label": "Russel 2000 (^RUT)", "value": "^RUT"},
-                                            {"label": "NIFTY 50 (^NSEI)", "value": "^NSEI"},
-                                            {"label": "Apple Inc. (AAPL)", "value": "AAPL"},
-                                            {"label": "Alphabet Inc. (GOOGL)", "value": "GOOGL"},
-                                            {"label": "Microsoft Corporation (MSFT)", "value": "MSFT"},
-                                            {"label": "Tesla, Inc. (TSLA)", "value": "TSLA"}
-                                        ], 
-                                        value="^FTSE", 
-                                        id="stock-select-dropdown-1"
-                                    )
-                                ], width=4),
-                                dbc.Col([
-                                    dcc.Dropdown(
-                                        options = [
-                                            {"label": "FTSE 100 (^FTSE)", "value": "^FTSE"},
-                                            {"label": "S&P 500 (^GSPC)", "value": "^GSPC"},
-                                            {"label": "Dow Jones Industrial Average (^DJI)", "value": "^DJI"},
-                                            {"label": "NASDAQ Composite (^IXIC)", "value": "^IXIC"},
-                                            {"label": "Russel 2000 (^RUT)", "value": "^RUT"},
-                                            {"label": "NIFTY 50 (^NSEI)", "value": "^NSEI"},
-                                            {"label": "Apple Inc. (AAPL)", "value": "AAPL"},
-                                            {"label": "Alphabet Inc. (GOOGL)", "value": "GOOGL"},
-                                            {"label": "Microsoft Corporation (MSFT)", "value": "MSFT"},
-                                            {"label": "Tesla, Inc. (TSLA)", "value": "TSLA"}
-                                        ], 
-                                        value="^FTSE", 
-                                        id="stock-select-dropdown-2"
-                                    )
-                                ], width=4),
-                                dbc.Col([
-                                    html.Div([
-                                        html.P("Start Date:", style={'textAlign': 'right', "margin": "0px 0px 0px 0px"})
-                                    ])
-                                ], width=1),
-                                dbc.Col([
-                                    dcc.DatePickerSingle(
-                                        date=(dt.date.today() - dt.timedelta(days=150)),
-                                        max_date_allowed=dt.date.today(),
-                                        min_date_allowed=(dt.date.today() - dt.timedelta(days=365*3)),
-                                        display_format="DD/MM/YYYY",
-                                        id="start-date-picker"
-                                    )
-                                ], width=1),
-                                dbc.Col([
-                                    html.Div([
-                                        html.P("End Date:", style={'textAlign': 'right', "margin": "0px 0px 0px 0px"})
-                                    ])   
-                                ], width=1),
-                                dbc.Col([
-                                    dcc.DatePickerSingle(
-                                        date=dt.date.today(),
-                                        max_date_allowed=dt.date.today(),
-                                        min_date_allowed=(dt.date.today() - dt.timedelta(days=365*3)),
-                                        display_format="DD/MM/YYYY",
-                                        id="end-date-picker"
-                                    )
-                                ], width=1),
-                            ], align="center")
-                        ])
-                    )
-                ])
-            ], className="mb-3"),
-
-            #Row 3 - Summary
-            dbc.Row([
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardBody([
-                            html.Div([
-                                html.P("Which one is better?"),
-                                html.H3("^FTSE", 
-                                    id="suggestion-label", 
-                                    style={"color": "#F28E2B"}
-                                )
-                            ], style={'textAlign': 'center'})
-                        ])
-                    ])
-                ], width = 2),
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardBody([
-                            html.Div([
-                                html.P("Difference in ROI:"),
-                                html.H3("{:.2f}%".format(2.56), 
-                                    id="change-label",
-                                    style={"color": "#F28E2B"}
-                                )
-                            ], style={'textAlign': 'center'})
-                        ])
-                    ])
-                ], width = 2),
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardBody([
-                            html.Div([
-                                html.P("Difference in Forecast MAPE"),
-                                html.H3("{:.2f}%".format(3.33), 
-                                    id="mape-label", 
-                                    style={"color": "#4E79A7"}
-                                )
-                            ], style={'textAlign': 'center'})
-                        ])
-                    ])
-                ], width = 2),
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardBody([
-                            dbc.Row([
-                                dbc.Col([
-                                    dcc.Graph(
-                                        figure=createPriceSparklineFigure(stockData_df_1, stockData_df_2),
-                                        config={"displayModeBar" : False},
-                                        id="price-sparkline"
-                                    )
-                                ], width=6),
-                                dbc.Col([
-                                    dcc.Graph(
-                                        figure=createVolumeSparklineFigure(stockData_df_1, stockData_df_2),
-                                        config={"displayModeBar" : False},
-                                        id="volume-sparkline"
-                                    )
-                                ], width=6)
-                            ])
-                        ], className="pb-2 pt-4")
-                    ])
-                ], width=5),
-                dbc.Col([
-                    html.Div([
-                        dcc.Link(dbc.Button("Analyse", color="analyse", className="me-1", size="lg", style={"width": 120}), href="/")
-                    ])
-                ], width=1, align="center")
-            ], className="mb-3"),
-
-        ]),
-        color="light",
-        className="px-3"
-    )
-])
\ No newline at end of file
+from dash import dcc, html, Input, Output, callback
+import dash
+
+import dash_bootstrap_components as dbc
+
+import plotly.graph_objects as go
+
+import datetime as dt
+
+from metrics import metrics
+from data_access import downloadManyStockData, alignStockData
+
+#Most a basket can hold, every ticker is a line and a set of bars on the sparklines
+maxTickers = 50
+
+#Tableau 10, repeated for baskets of more than 10
+colours = ["#4E79A7", "#F28E2B", "#E15759", "#76B7B2", "#59A14F", "#EDC948", "#B07AA1", "#FF9DA7", "#9C755F", "#BAB0AC"]
+
+#forecastResults_1, outputs_test_1, outputs_pred_1, rmse_1, mape_1, history_1 = forecast.forecast(stockData_df_1, 20, 10, [0,1,2,3,4,5], 50)
+#forecastResults_2, outputs_test_2, outputs_pred_2, rmse_2, mape_2, history_2 = forecast.forecast(stockData_df_2, 20, 10, [0,1,2,3,4,5], 50)
+
+### ----- FIGURES ----- ###
+
+#Summary Price Sparkline, closes_df has a column of close prices per ticker
+#Every ticker is rebased to 100 on the first day so baskets of very differently priced tickers share one scale
+def createPriceSparklineFigure(closes_df):
+    priceSparkline = go.Figure()
+
+    rebased_df = closes_df / closes_df.bfill().iloc[0] * 100
+    for i, stockCode in enumerate(rebased_df.columns):
+        priceSparkline.add_trace(go.Scatter(
+            x=rebased_df.index,
+            y=rebased_df[stockCode],
+            mode="lines",
+            connectgaps=True,
+            line_color=colours[i % len(colours)],
+            name=stockCode
+        ))
+
+    priceSparkline.update_layout(
+        template="simple_white",
+        annotations=[], 
+        overwrite=True,
+        showlegend=False,
+        plot_bgcolor="white",
+        margin=dict(t=10,l=10,b=10,r=10),
+        height=82
+    )
+
+    priceSparkline.update_xaxes(visible=False, fixedrange=True)
+    priceSparkline.update_yaxes(visible=False, fixedrange=True)
+
+    priceSparkline.add_annotation(text="Price:",
+                  xref="paper", yref="paper",
+                  x=0.00, y=1.25, showarrow=False)
+
+    return priceSparkline
+
+#Summary Volume Bar Sparkline, volumes_df has a column of volumes per ticker
+def createVolumeSparklineFigure(volumes_df):
+    volumeSparkline = go.Figure()
+
+    for i, stockCode in enumerate(volumes_df.columns):
+        volumeSparkline.add_trace(go.Bar(
+            x=volumes_df.index,
+            y=volumes_df[stockCode],
+            marker_color=colours[i % len(colours)],
+            name=stockCode
+        ))
+
+    volumeSparkline.update_layout(
+        template="simple_white",
+        annotations=[], 
+        overwrite=True,
+        showlegend=False,
+        plot_bgcolor="white",
+        margin=dict(t=10,l=10,b=10,r=10),
+        height=82,
+    )
+
+    volumeSparkline.update_xaxes(visible=False, fixedrange=True)
+    volumeSparkline.update_yaxes(visible=False, fixedrange=True)
+
+    volumeSparkline.add_annotation(text="Volume:",
+                xref="paper", yref="paper",
+                x=0.00, y=1.25, showarrow=False)
+
+    return volumeSparkline
+
+#Return over the range of every ticker in percent, best first
+def calculateReturns(closes_df):
+    returns = (closes_df.ffill().iloc[-1] / closes_df.bfill().iloc[0] - 1) * 100
+    return returns.sort_values(ascending=False)
+
+#How far the best ticker's return is ahead of the runner up's
+def createReturnDifference(closes_df):
+    returns = calculateReturns(closes_df)
+    if len(returns) < 2:
+        return "-"
+    return "{:.2f}%".format(returns.iloc[0] - returns.iloc[1])
+
+### ----- LAYOUT ----- ###
+
+#Built by display_page on every visit, so the date pickers default to the current day
+#The labels and sparklines start as placeholders and are filled in by update_comparison, which fires on load
+def createLayout():
+    return html.Div([
+        dbc.Card(
+            dbc.CardBody([
+
+                #Error alert
+                dbc.Modal(
+                    [
+                        dbc.ModalHeader(dbc.ModalTitle("An error has occured!")),
+                        dbc.ModalBody(["Please re-select valid data parameters and try again."]),
+                    ],
+                    id="compare-error-modal",
+                    centered=True,
+                    is_open=False,
+                ),
+
+                #Row 1 - Title
+                dbc.Row([
+                    dbc.Col([
+                        html.Div([
+                            html.H1([
+                                html.Span("Fore", style={"color": "#F28E2B"}),
+                                html.Span("Co ", style={"color": "#4E79A7"}),
+                                html.Span("Invest | "),
+                                html.Span("Compare", style={"color": "#4E79A7"})
+                            ])
+                        ], style={"textAlign": "center"})
+                    ], width={"size": 6, "offset": 3}),
+
+                    dbc.Col([
+                        dcc.Loading(
+                            id="loading",
+                            type="circle", #default
+                            color="#4E79A7",
+                            children=[
+                                html.Div([], style={"display": "none"}, id="compare-loading-div")
+                            ]    
+                        )
+                    ], width={"size": 1, "offset": 2}, className="pt-4 mt-2")
+
+                ], className="mb-4"),
+
+                #Row 2 - Data select
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card(
+                            dbc.CardBody([
+                                dbc.Row([
+                                    dbc.Col([
+                                        dcc.Dropdown(
+                                            options = [
+                                                {"label": "FTSE 100 (^FTSE)", "value": "^FTSE"},
+                                                {"label": "S&P 500 (^GSPC)", "value": "^GSPC"},
+                                                {"label": "Dow Jones Industrial Average (^DJI)", "value": "^DJI"},
+                                                {"label": "NASDAQ Composite (^IXIC)", "value": "^IXIC"},
+                                                {"label": "Russel 2000 (^RUT)", "value": "^RUT"},
+                                                {"label": "NIFTY 50 (^NSEI)", "value": "^NSEI"},
+                                                {"label": "Apple Inc. (AAPL)", "value": "AAPL"},
+                                                {"label": "Alphabet Inc. (GOOGL)", "value": "GOOGL"},
+                                                {"label": "Microsoft Corporation (MSFT)", "value": "MSFT"},
+                                                {"label": "Tesla, Inc. (TSLA)", "value": "TSLA"}
+                                            ], 
+                                            value=["^FTSE", "^GSPC"], 
+                                            multi=True,
+                                            id="compare-stocks-dropdown"
+                                        )
+                                    ], width=5),
+                                    dbc.Col([
+                                        dcc.Input(
+                                            type="text",
+                                            placeholder="More tickers, e.g. KO, MCD, SBUX",
+                                            debounce=True,
+                                            style={"width": "100%"},
+                                            id="compare-tickers-input"
+                                        )
+                                    ], width=3),
+                                    dbc.Col([
+                                        html.Div([
+                                            html.P("Start Date:", style={'textAlign': 'right', "margin": "0px 0px 0px 0px"})
+                                        ])
+                                    ], width=1),
+                                    dbc.Col([
+                                        dcc.DatePickerSingle(
+                                            date=(dt.date.today() - dt.timedelta(days=150)),
+                                            max_date_allowed=dt.date.today(),
+                                            min_date_allowed=(dt.date.today() - dt.timedelta(days=365*3)),
+                                            display_format="DD/MM/YYYY",
+                                            id="compare-start-date-picker"
+                                        )
+                                    ], width=1),
+                                    dbc.Col([
+                                        html.Div([
+                                            html.P("End Date:", style={'textAlign': 'right', "margin": "0px 0px 0px 0px"})
+                                        ])   
+                                    ], width=1),
+                                    dbc.Col([
+                                        dcc.DatePickerSingle(
+                                            date=dt.date.today(),
+                                            max_date_allowed=dt.date.today(),
+                                            min_date_allowed=(dt.date.today() - dt.timedelta(days=365*3)),
+                                            display_format="DD/MM/YYYY",
+                                            id="compare-end-date-picker"
+                                        )
+                                    ], width=1),
+                                ], align="center")
+                            ])
+                        )
+                    ])
+                ], className="mb-3"),
+
+                #Row 3 - Summary
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardBody([
+                                html.Div([
+                                    html.P("Which one is better?"),
+                                    html.H3("-", 
+                                        id="compare-suggestion-label", 
+                                        style={"color": "#F28E2B"}
+                                    )
+                                ], style={'textAlign': 'center'})
+                            ])
+                        ])
+                    ], width = 2),
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardBody([
+                                html.Div([
+                                    html.P("Difference in ROI:"),
+                                    html.H3("-", 
+                                        id="compare-change-label",
+                                        style={"color": "#F28E2B"}
+                                    )
+                                ], style={'textAlign': 'center'})
+                            ])
+                        ])
+                    ], width = 2),
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardBody([
+                                html.Div([
+                                    html.P("Difference in Forecast MAPE"),
+                                    html.H3("{:.2f}%".format(3.33), 
+                                        id="compare-mape-label", 
+                                        style={"color": "#4E79A7"}
+                                    )
+                                ], style={'textAlign': 'center'})
+                            ])
+                        ])
+                    ], width = 2),
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardBody([
+                                dbc.Row([
+                                    dbc.Col([
+                                        dcc.Graph(
+                                            figure=go.Figure(layout=dict(template="simple_white", height=82, margin=dict(t=10,l=10,b=10,r=10), xaxis_visible=False, yaxis_visible=False)),
+                                            config={"displayModeBar" : False},
+                                            id="compare-price-sparkline"
+                                        )
+                                    ], width=6),
+                                    dbc.Col([
+                                        dcc.Graph(
+                                            figure=go.Figure(layout=dict(template="simple_white", height=82, margin=dict(t=10,l=10,b=10,r=10), xaxis_visible=False, yaxis_visible=False)),
+                                            config={"displayModeBar" : False},
+                                            id="compare-volume-sparkline"
+                                        )
+                                    ], width=6)
+                                ])
+                            ], className="pb-2 pt-4")
+                        ])
+                    ], width=5),
+                    dbc.Col([
+                        html.Div([
+                            dcc.Link(dbc.Button("Analyse", color="analyse", className="me-1", size="lg", style={"width": 120}), href="/")
+                        ])
+                    ], width=1, align="center")
+                ], className="mb-3"),
+
+            ]),
+            color="light",
+            className="px-3"
+        )
+    ])
+
+### ----- CALLBACKS ----- ###
+
+#The basket is the dropdown selection plus any typed in tickers, all downloaded together
+@callback(
+    Output("compare-price-sparkline", "figure"),
+    Output("compare-volume-sparkline", "figure"),
+    Output("compare-suggestion-label", "children"),
+    Output("compare-change-label", "children"),
+    Output("compare-loading-div", "children"),
+    Output("compare-error-modal", "is_open"),
+
+    Input("compare-stocks-dropdown", "value"),
+    Input("compare-tickers-input", "value"),
+    Input("compare-start-date-picker", "date"),
+    Input("compare-end-date-picker", "date")
+)
+@metrics.timed("callback.update_comparison")
+def update_comparison(selected_stocks, typed_stocks, selected_startDate, selected_endDate):
+    stockCodes = list(selected_stocks or []) + [stockCode.strip().upper() for stockCode in (typed_stocks or "").split(",") if stockCode.strip()]
+    stockCodes = list(dict.fromkeys(stockCodes))[:maxTickers]
+    if not stockCodes:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, False
+
+    try:
+        startDate = dt.date.fromisoformat(selected_startDate).strftime("%Y-%m-%d")
+        endDate = dt.date.fromisoformat(selected_endDate).strftime("%Y-%m-%d")
+
+        stockData = downloadManyStockData(stockCodes, startDate, endDate)
+        closes_df = alignStockData(stockData, "Close")
+        if closes_df.empty:
+            return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, True
+
+        with metrics.span("comparisonFigures"):
+            priceSparkline = createPriceSparklineFigure(closes_df)
+            volumeSparkline = createVolumeSparklineFigure(alignStockData(stockData, "Volume"))
+
+        #For loading element
+        loaded = "loaded"
+
+        return priceSparkline, volumeSparkline, calculateReturns(closes_df).index[0], createReturnDifference(closes_df), loaded, False
+    except Exception:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, True
@@ -0,0 +1,196 @@
+import os
+import time
+import logging
+import datetime as dt
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pandas as pd
+
+import bars
+from metrics import metrics
+from price_store import priceStore
+from providers import sliceDates
+
+logger = logging.getLogger("foreco.data")
+
+#Price data for both dashboards, in front of the price store
+#Recent ranges stay in memory for ttl seconds, and a range inside one already held (or being fetched) is sliced from it.
+#Identical requests arriving together share one fetch instead of each downloading the same thing (single flight).
+class DataAccess:
+    def __init__(self, store, maxSize=64, ttl=300):
+        self.store = store
+        self.maxSize = maxSize
+        self.ttl = ttl #Today's bar keeps changing, so nothing is served from memory forever
+        self.entries = OrderedDict() #(stockCode, interval, startDate, endDate): (fetchTime, stockData_df)
+        self.inFlight = {} #Same keys: Future of the fetch
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def covers(self, key, stockCode, startDate, endDate, interval):
+        return key[0] == stockCode and key[1] == interval and key[2] <= startDate and endDate <= key[3]
+
+    #Most recently used entry covering the range, dropping expired ones on the way
+    def findEntry(self, stockCode, startDate, endDate, interval):
+        now = time.monotonic()
+        for key in [key for key, (fetchTime, stockData_df) in self.entries.items() if now - fetchTime > self.ttl]:
+            del self.entries[key]
+
+        for key in reversed(self.entries):
+            if self.covers(key, stockCode, startDate, endDate, interval):
+                self.entries.move_to_end(key)
+                return self.entries[key][1]
+        return None
+
+    #Callers get their own copy, so one changing its frame can't change what the cache serves next
+    def sliceCopy(self, stockData_df, startDate, endDate):
+        return sliceDates(stockData_df, startDate, endDate).copy()
+
+    def findInFlight(self, stockCode, startDate, endDate, interval):
+        for key, future in self.inFlight.items():
+            if self.covers(key, stockCode, startDate, endDate, interval):
+                return future
+        return None
+
+    def get(self, stockCode, startDate, endDate, interval="1d"):
+        key = (stockCode, interval, startDate, endDate)
+
+        with self.lock:
+            stockData_df = self.findEntry(stockCode, startDate, endDate, interval)
+            if stockData_df is not None:
+                self.hits += 1
+                return self.sliceCopy(stockData_df, startDate, endDate)
+
+            future = self.findInFlight(stockCode, startDate, endDate, interval)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                self.misses += 1
+                future = self.inFlight[key] = Future()
+                leader = True
+
+        if not leader:
+            #Waits on the fetch already running, its error is raised here too
+            return self.sliceCopy(future.result(), startDate, endDate)
+
+        try:
+            stockData_df = self.store.get(stockCode, startDate, endDate, interval)
+        except BaseException as e:
+            with self.lock:
+                del self.inFlight[key]
+            future.set_exception(e)
+            raise
+
+        with self.lock:
+            del self.inFlight[key]
+            self.remember(key, stockData_df)
+        future.set_result(stockData_df)
+
+        return stockData_df.copy()
+
+    #get for a basket, returns {stockCode: stockData_df}
+    #Tickers in memory or being fetched already are served like get's, the rest go to the store's getMany together
+    #Tickers whose fetch failed come back as empty frames
+    def getMany(self, stockCodes, startDate, endDate, interval="1d"):
+        stockData = {}
+        waiting = {} #stockCode: Future of a fetch already running
+        fetching = {} #stockCode: (key, Future of this fetch)
+
+        with self.lock:
+            for stockCode in stockCodes:
+                stockData_df = self.findEntry(stockCode, startDate, endDate, interval)
+                if stockData_df is not None:
+                    self.hits += 1
+                    stockData[stockCode] = self.sliceCopy(stockData_df, startDate, endDate)
+                    continue
+
+                future = self.findInFlight(stockCode, startDate, endDate, interval)
+                if future is not None:
+                    self.coalesced += 1
+                    waiting[stockCode] = future
+                else:
+                    self.misses += 1
+                    key = (stockCode, interval, startDate, endDate)
+                    fetching[stockCode] = (key, Future())
+                    self.inFlight[key] = fetching[stockCode][1]
+
+        if fetching:
+            try:
+                fetched = self.store.getMany(list(fetching), startDate, endDate, interval)
+            except BaseException as e:
+                with self.lock:
+                    for key, future in fetching.values():
+                        del self.inFlight[key]
+                for key, future in fetching.values():
+                    future.set_exception(e)
+                raise
+
+            with self.lock:
+                for stockCode, (key, future) in fetching.items():
+                    del self.inFlight[key]
+                    self.remember(key, fetched[stockCode])
+            for stockCode, (key, future) in fetching.items():
+                future.set_result(fetched[stockCode])
+                stockData[stockCode] = fetched[stockCode].copy()
+
+        for stockCode, future in waiting.items():
+            try:
+                stockData[stockCode] = self.sliceCopy(future.result(), startDate, endDate)
+            except Exception:
+                stockData[stockCode] = pd.DataFrame()
+
+        return {stockCode: stockData[stockCode] for stockCode in stockCodes}
+
+    #Called holding the lock, empty results aren't kept, a failed download shouldn't be served again for the whole ttl
+    def remember(self, key, stockData_df):
+        if not stockData_df.empty:
+            self.entries[key] = (time.monotonic(), stockData_df)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxSize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced, "size": len(self.entries), "maxSize": self.maxSize}
+
+dataAccess = DataAccess(priceStore, int(os.environ.get("FORECO_DATA_CACHE_SIZE", 64)), float(os.environ.get("FORECO_DATA_CACHE_TTL", 300)))
+
+#Intraday intervals only go back so far, so their start date is moved up to the oldest bar Yahoo has
+#Dates are "YYYY-MM-DD" strings, the end date is exclusive like yf.download's
+def downloadStockData(stockName, startDate, endDate, interval="1d"):
+    #aapl_df = yf.download('^NDX', start='2020-01-01', end='2021-01-01', progress=False)
+    startDate = bars.clampStartDate(dt.date.fromisoformat(startDate), dt.date.fromisoformat(endDate), interval).strftime("%Y-%m-%d")
+    with metrics.span("downloadStockData"):
+        df = dataAccess.get(stockName, startDate, endDate, interval)
+    return df
+
+#Downloads a basket of tickers through the same cache and store as downloadStockData, the ones neither has are
+#downloaded together in one request (a single grouped yf.download from Yahoo)
+#Returns {stockName: stockData_df} in the order given, tickers with no data come back as empty frames and are logged
+def downloadManyStockData(stockNames, startDate, endDate, interval="1d"):
+    stockNames = list(dict.fromkeys(stockNames))
+    startDate = bars.clampStartDate(dt.date.fromisoformat(startDate), dt.date.fromisoformat(endDate), interval).strftime("%Y-%m-%d")
+    with metrics.span("downloadManyStockData"):
+        stockData = dataAccess.getMany(stockNames, startDate, endDate, interval)
+
+    failed = [stockName for stockName, stockData_df in stockData.items() if stockData_df.empty]
+    if failed:
+        logger.warning("No price data for %s from %s to %s", ", ".join(failed), startDate, endDate)
+    return stockData
+
+#One column of every ticker side by side on the union of their dates, e.g. every Close
+#Markets have different holidays, so a ticker is NaN on the days only the others traded
+def alignStockData(stockData, column):
+    columns = {stockName: stockData_df[column] for stockName, stockData_df in stockData.items() if not stockData_df.empty}
+    if not columns:
+        return pd.DataFrame()
+    return pd.concat(columns, axis=1).sort_index()
@@ -1,175 +1,455 @@
-import os
-os.environ['PYTHONHASHSEED']=str(2)
-
-from xml.sax.xmlreader import InputSource
-import tensorflow as tf
-from keras.models import Sequential
-from keras.layers import Dense, LSTM
-import numpy as np
-import pandas as pd
-
-import random
-import math
-import datetime
-
-from matplotlib import pyplot
-
-from sklearn.preprocessing import MinMaxScaler, StandardScaler
-from sklearn.metrics import mean_squared_error
-from sklearn.model_selection import train_test_split
-
-import yfinance as yf
-from yahoofinancials import YahooFinancials
-
-#Sets all the seeds in order to maintain reproducible results 
-def setSeeds():
-   os.environ['PYTHONHASHSEED']=str(3)
-   tf.random.set_seed(3)
-   np.random.seed(3)
-   random.seed(3)
-
-#Calculates the Mean Average Percentage Error (MAPE)
-def calculateMAPE(actual, predicted): 
-    actual, pred = np.array(actual), np.array(predicted)
-    return np.mean(np.abs((actual - predicted) / actual)) * 100
-
-#Normalises all necessary data
-def normaliseData(inputs_train, inputs_test, outputs_train, outputs_test, forecastInput, inputs_scaler, outputs_scaler, outputDim):
-    inputs_train_n = inputs_scaler.fit_transform(inputs_train) #fit_transform sets the settings on the scaler
-    inputs_test_n = inputs_scaler.transform(inputs_test) 
-    if outputDim == 1: 
-        outputs_train_n = outputs_scaler.fit_transform(outputs_train.reshape(-1, 1)) 
-        outputs_test_n = outputs_scaler.transform(outputs_test.reshape(-1, 1))   
-    else:
-        outputs_train_n = outputs_scaler.fit_transform(outputs_train) #Doesn't need to reshape if outputDim > 1
-        outputs_test_n = outputs_scaler.transform(outputs_test)  
-    forecastInput_n = inputs_scaler.transform(forecastInput.reshape(1, -1))
-    return inputs_train_n, inputs_test_n, outputs_train_n, outputs_test_n, forecastInput_n
-
-#Unnormalises data specific data
-def unnormaliseData(data_n, scaler):
-    data = scaler.inverse_transform(data_n)
-    return data
-
-
-def splitData(stockData, inputDim, outputDim, attributes): #attributes = col index
-    inputs = []
-    outputs = []
-    forecastInput = []
-
-    #These loops are necessary to arrange the data in an acceptable format
-    for attribute in attributes:
-        for i in range(inputDim):
-            forecastInput.append(stockData[-(inputDim+i), attribute])
-
-    inputsTemp = []
-    outputsTemp = []
-
-    #These loops are necessary to arrange the data in an acceptable format
-    for i in range(len(stockData)-inputDim-outputDim):
-        for attribute in attributes:
-            for j in range(inputDim):
-                inputsTemp.append(stockData[i+j, attribute]) 
-        inputs.append(inputsTemp)
-        inputsTemp = []
-        for j in range(outputDim):
-            outputsTemp.append(stockData[i+inputDim+j, 3]) #3 is the close price column
-        outputs.append(outputsTemp)
-        outputsTemp = []
-
-    inputsArray = np.array(inputs)
-    outputsArray = np.array(outputs)
-    forecastInputArray = np.array(forecastInput)
-
-    #This method splits the data into test and train sets
-    inputsArray_train, inputsArray_test, outputsArray_train, outputsArray_test = train_test_split(inputsArray, outputsArray, test_size=0.2, random_state=12) 
-
-    return inputsArray_train, inputsArray_test, outputsArray_train, outputsArray_test, forecastInputArray
-
-def compileModel(inputDim, outputDim, attributes):
-    model = Sequential()
-    model.add(Dense((math.ceil((inputDim+outputDim)/2)), input_dim=inputDim*len(attributes), activation='relu')) #Can use a formula (math.ceil((2/3)*inputDim)+outputDim) or (math.ceil((inputDim+outputDim)/2))
-    model.add(Dense(outputDim)) #Can use activation functions for these... activation='sigmoid'
-    model.compile(loss="mean_squared_error", optimizer="adam", metrics=['mse', 'mae','mape', 'cosine_proximity'])
-    model.summary()
-    return model
-
-def fitModel(model, inputs_train, outputs_train, epochs):
-    history = model.fit(inputs_train, outputs_train, epochs=epochs, batch_size=64)
-
-    return model, history
-
-def testModel(model, inputs_test, outputs_test, outputs_scaler):
-    outputs_pred = model.predict(inputs_test)
-    outputs_pred = unnormaliseData(outputs_pred, outputs_scaler)
-    outputs_test = unnormaliseData(outputs_test, outputs_scaler)
-
-    rmse = math.sqrt(mean_squared_error(outputs_test, outputs_pred))
-    mape = calculateMAPE(outputs_test, outputs_pred)
-
-    return outputs_pred, rmse, mape
-
-def forecast(stockData, inputDim, outputDim, attributes, epochs):
-    #Set seeds for reproducable results
-    setSeeds()
-    stockDataArray = stockData.to_numpy()
-
-    inputs_scaler = MinMaxScaler(feature_range=(0, 1))
-    outputs_scaler = MinMaxScaler(feature_range=(0, 1))
-
-    inputs_train, inputs_test, outputs_train, outputs_test, forecastInput = splitData(stockDataArray, inputDim, outputDim, attributes)
-    inputs_train_n, inputs_test_n, outputs_train_n, outputs_test_n, forecastInput_n = normaliseData(inputs_train, inputs_test, outputs_train, 
-        outputs_test, forecastInput, inputs_scaler, outputs_scaler, outputDim)
-    
-    model, history = fitModel(compileModel(inputDim, outputDim, attributes), inputs_train_n, outputs_train_n, epochs)
-    outputs_pred, rmse, mape = testModel(model, inputs_test_n, outputs_test_n, outputs_scaler) 
-
-    forecastOutput_n = model.predict(forecastInput_n)
-    forecastOutput = unnormaliseData(forecastOutput_n, outputs_scaler).reshape(-1, 1)
-    
-    forecastDates = []
-
-    for i in range(outputDim):
-        forecastDates.append([stockData.index[-1] + datetime.timedelta(days=i+1)])
-
-    forecastDates = np.array(forecastDates)
-
-    forecastResults = pd.DataFrame({"Date": forecastDates[:,0], "Close": forecastOutput[:,0]})
-    forecastResults.set_index('Date', inplace=True)
-
-    return forecastResults, outputs_test, outputs_pred, rmse, mape, history
-
-""" #TEST ONLY
-
-stockData = yf.download("AAPL", start="2021-04-20")
-stockDataArray = stockData.to_numpy()
-
-outputDim = 10
-
-forecastOutput, outputs_test, outputs_pred, rmse, mape, history = forecast(stockData, 20, outputDim, [0, 1, 2, 3, 4, 5], 50)
-
-print(forecastOutput)
-
-pyplot.plot(history.history['mse'])
-pyplot.plot(history.history['mae'])
-pyplot.show()
-
-pyplot.plot(outputs_test, color='blue')
-pyplot.plot(outputs_pred, color='orange')
-pyplot.show()
-
-print('Test RMSE: %.3f' % rmse)
-print('Test MAPE: %.3f' % mape)
-
-forecastOutput = np.transpose(forecastOutput) #This puts the data in a format ready to be plotted
-
-days = []
-
-for i in range(outputDim):
-    days.append([datetime.date.today() + datetime.timedelta(days=i+1)])
-
-pyplot.plot(stockData.index, stockDataArray[:, 3], color='blue')
-pyplot.plot(days, forecastOutput, color='orange')
-pyplot.show()
-
+import os
+os.environ['PYTHONHASHSEED']=str(2)
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import pandas as pd
+
+import random
+import math
+import time
+import hashlib
+import datetime
+
+#TensorFlow, Keras and scikit-learn take seconds to import, so they are imported by the functions
+#that use them instead of here. Importing this module only costs numpy and pandas.
+
+#Sets all the seeds in order to maintain reproducible results 
+def setSeeds():
+   import tensorflow as tf
+
+   os.environ['PYTHONHASHSEED']=str(3)
+   tf.random.set_seed(3)
+   np.random.seed(3)
+   random.seed(3)
+
+#Calculates the Mean Average Percentage Error (MAPE)
+def calculateMAPE(actual, predicted): 
+    actual, pred = np.array(actual), np.array(predicted)
+    return np.mean(np.abs((actual - predicted) / actual)) * 100
+
+#Normalises all necessary data
+def normaliseData(inputs_train, inputs_test, outputs_train, outputs_test, forecastInput, inputs_scaler, outputs_scaler, outputDim, fitScalers=True):
+    if fitScalers:
+        inputs_train_n = inputs_scaler.fit_transform(inputs_train) #fit_transform sets the settings on the scaler
+    else:
+        inputs_train_n = inputs_scaler.transform(inputs_train) #Keeps the settings of an already fitted scaler
+    inputs_test_n = inputs_scaler.transform(inputs_test) 
+    if outputDim == 1: 
+        outputs_train = outputs_train.reshape(-1, 1)
+        outputs_test = outputs_test.reshape(-1, 1)
+    #Doesn't need to reshape if outputDim > 1
+    if fitScalers:
+        outputs_train_n = outputs_scaler.fit_transform(outputs_train) 
+    else:
+        outputs_train_n = outputs_scaler.transform(outputs_train)
+    outputs_test_n = outputs_scaler.transform(outputs_test)  
+    forecastInput_n = inputs_scaler.transform(forecastInput.reshape(1, -1))
+    return inputs_train_n, inputs_test_n, outputs_train_n, outputs_test_n, forecastInput_n
+
+#Unnormalises data specific data
+def unnormaliseData(data_n, scaler):
+    data = scaler.inverse_transform(data_n)
+    return data
+
+
+#Builds sliding window views over the stock data, nothing is copied until the windows are gathered
+def createWindows(stockData, inputDim, outputDim, attributes): #attributes = col index
+    samples = len(stockData)-inputDim-outputDim
+
+    #(samples, columns, inputDim) view of every input window and (samples, outputDim) view of every output window
+    inputWindows = sliding_window_view(stockData, inputDim, axis=0)[:samples]
+    outputWindows = sliding_window_view(stockData[inputDim:, 3], outputDim)[:samples] #3 is the close price column
+
+    #Same layout as the training inputs, attribute by attribute, walking back from the last input window
+    forecastInput = stockData[-(inputDim+np.arange(inputDim))][:, attributes].T.reshape(-1)
+
+    return inputWindows, outputWindows, forecastInput
+
+#Shuffles the window indices into train and test sets, so only the indices are copied
+def splitIndices(samples, testSize=0.2, randomState=12):
+    from sklearn.model_selection import train_test_split
+
+    trainIndices, testIndices = train_test_split(np.arange(samples), test_size=testSize, random_state=randomState)
+    return trainIndices, testIndices
+
+#Copies the selected windows out of the views into flat (samples, features) arrays
+def gatherWindows(inputWindows, outputWindows, indices, attributes):
+    inputs = inputWindows[np.ix_(indices, attributes)].reshape(len(indices), -1)
+    outputs = outputWindows[indices]
+    return inputs, outputs
+
+#testIndices picks the test windows instead of the random split, every other window is trained on
+def splitData(stockData, inputDim, outputDim, attributes, testIndices=None): #attributes = col index
+    inputWindows, outputWindows, forecastInputArray = createWindows(stockData, inputDim, outputDim, attributes)
+
+    #This method splits the data into test and train sets
+    if testIndices is None:
+        trainIndices, testIndices = splitIndices(len(outputWindows))
+    else:
+        trainIndices = np.setdiff1d(np.arange(len(outputWindows)), testIndices)
+
+    inputsArray_train, outputsArray_train = gatherWindows(inputWindows, outputWindows, trainIndices, attributes)
+    inputsArray_test, outputsArray_test = gatherWindows(inputWindows, outputWindows, testIndices, attributes)
+
+    return inputsArray_train, inputsArray_test, outputsArray_train, outputsArray_test, forecastInputArray
+
+def compileModel(inputDim, outputDim, attributes):
+    from keras.models import Sequential
+    from keras.layers import Dense
+
+    model = Sequential()
+    model.add(Dense((math.ceil((inputDim+outputDim)/2)), input_dim=inputDim*len(attributes), activation='relu')) #Can use a formula (math.ceil((2/3)*inputDim)+outputDim) or (math.ceil((inputDim+outputDim)/2))
+    model.add(Dense(outputDim)) #Can use activation functions for these... activation='sigmoid'
+    model.compile(loss="mean_squared_error", optimizer="adam", metrics=['mse', 'mae','mape', 'cosine_proximity'])
+    model.summary()
+    return model
+
+#validationSplit holds back that fraction of the training data, patience stops once the validation loss (or the
+#training loss without a validation split) hasn't improved by minDelta for that many epochs and restores the best
+#weights, timeBudget stops training after that many seconds
+def fitModel(model, inputs_train, outputs_train, epochs, callbacks=None, validationSplit=0.0, patience=None, minDelta=0.0, timeBudget=None):
+    callbacks = createFitCallbacks(callbacks, bool(validationSplit), patience, minDelta, timeBudget)
+
+    startTime = time.perf_counter()
+    history = model.fit(inputs_train, outputs_train, epochs=epochs, batch_size=64, validation_split=validationSplit, callbacks=callbacks)
+
+    #Kept with the history so the dashboard can show how much of the epoch budget was used
+    history.params["epochsRun"] = len(history.epoch)
+    history.params["trainingTime"] = time.perf_counter() - startTime
+
+    return model, history
+
+#The given callbacks plus the early stopping and time budget ones asked for
+def createFitCallbacks(callbacks, validation, patience, minDelta, timeBudget):
+    callbacks = list(callbacks or [])
+    if patience is not None:
+        from keras.callbacks import EarlyStopping
+
+        callbacks.append(EarlyStopping(monitor="val_loss" if validation else "loss", patience=patience, min_delta=minDelta, restore_best_weights=True))
+    if timeBudget is not None:
+        callbacks.append(createTimeBudgetCallback(timeBudget))
+    return callbacks
+
+#Keras callback that stops training at the end of the first epoch past the given number of seconds
+def createTimeBudgetCallback(seconds):
+    from keras.callbacks import Callback
+
+    #Defined in here so keras is only imported once a model is trained
+    class TimeBudget(Callback):
+        def on_train_begin(self, logs=None):
+            self.startTime = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            if time.perf_counter() - self.startTime >= seconds:
+                self.model.stop_training = True
+
+    return TimeBudget()
+
+#Keras callback that hands the metrics of every finished epoch to publish(epoch, logs)
+def createProgressCallback(publish):
+    from keras.callbacks import LambdaCallback
+
+    return LambdaCallback(on_epoch_end=publish)
+
+def testModel(model, inputs_test, outputs_test, outputs_scaler):
+    outputs_pred = model.predict(inputs_test)
+    return scorePredictions(outputs_pred, outputs_test, outputs_scaler)
+
+#Unnormalises the test predictions and scores them against the test outputs
+def scorePredictions(outputs_pred, outputs_test, outputs_scaler):
+    from sklearn.metrics import mean_squared_error
+
+    outputs_pred = unnormaliseData(outputs_pred, outputs_scaler)
+    outputs_test = unnormaliseData(outputs_test, outputs_scaler)
+
+    rmse = math.sqrt(mean_squared_error(outputs_test, outputs_pred))
+    mape = calculateMAPE(outputs_test, outputs_pred)
+
+    return outputs_pred, rmse, mape
+
+#Hashes the index and OHLCV values of the frame, so identical downloads share the same fingerprint
+def fingerprintData(stockData_df):
+    digest = hashlib.sha256()
+    digest.update(",".join(str(column) for column in stockData_df.columns).encode())
+    digest.update(np.ascontiguousarray(stockData_df.index.asi8).tobytes())
+    digest.update(np.ascontiguousarray(stockData_df.to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+#Spacing of the bars in a DatetimeIndex, the most common gap so overnight and weekend gaps in intraday data don't count
+#Daily and longer bars are stepped a calendar day at a time, like the forecasts always have been
+def barInterval(index):
+    gaps = np.diff(index.asi8[-1000:])
+    if len(gaps) == 0:
+        return datetime.timedelta(days=1)
+    values, counts = np.unique(gaps, return_counts=True)
+    interval = pd.Timedelta(int(values[counts.argmax()])).to_pytimedelta()
+    return min(interval, datetime.timedelta(days=1))
+
+#Unnormalises the forecast output and dates it in the bars following the stock data
+#bands_n ({column: normalised output}) adds columns such as the Lower and Upper quantiles of an ensemble
+def createForecastResults(stockData, forecastOutput_n, outputs_scaler, outputDim, bands_n=None):
+    forecastOutput = unnormaliseData(forecastOutput_n, outputs_scaler).reshape(-1, 1)
+    
+    interval = barInterval(stockData.index)
+    forecastDates = []
+
+    for i in range(outputDim):
+        forecastDates.append([stockData.index[-1] + interval*(i+1)])
+
+    forecastDates = np.array(forecastDates)
+
+    forecastResults = pd.DataFrame({"Date": forecastDates[:,0], "Close": forecastOutput[:,0]})
+    for column, band_n in (bands_n or {}).items():
+        forecastResults[column] = unnormaliseData(band_n, outputs_scaler).reshape(-1)
+    forecastResults.set_index('Date', inplace=True)
+
+    return forecastResults
+
+#Picklable stand-in for the keras History object, keeps what the dashboards plot
+class ForecastHistory:
+    def __init__(self, history, params=None):
+        self.history = history
+        self.params = params or {}
+
+    @classmethod
+    def fromKerasHistory(cls, history):
+        return cls({metric: [float(value) for value in values] for metric, values in history.history.items()}, dict(history.params))
+
+### ----- ENGINES ----- ###
+
+#Engines train on the normalised windows and predict normalised outputs
+
+#Forward pass of a trained Dense network in plain NumPy, model.predict has a large fixed cost for the tiny
+#batches a forecast needs (a single window, or the test set)
+class NumpyDenseModel:
+    ACTIVATIONS = {
+        "linear": lambda x: x,
+        "relu": lambda x: np.maximum(x, 0, out=x),
+        "sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+        "tanh": np.tanh
+    }
+
+    def __init__(self, layers):
+        self.layers = layers #[(kernel, bias, activation)]
+
+    @classmethod
+    def fromKerasModel(cls, model):
+        layers = []
+        for layer in model.layers:
+            activation = layer.get_config().get("activation", "linear")
+            if activation not in cls.ACTIVATIONS:
+                raise ValueError("Unsupported activation for the NumPy forward pass: {0}".format(activation))
+            kernel, bias = layer.get_weights()
+            layers.append((kernel.astype(np.float32), bias.astype(np.float32), cls.ACTIVATIONS[activation]))
+        return cls(layers)
+
+    def predict(self, inputs):
+        #float32 like keras, so the results match model.predict to rounding
+        outputs = np.asarray(inputs, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            outputs = activation(outputs @ kernel + bias)
+        return outputs
+
+#The Dense network from compileModel, trained with keras and served through NumpyDenseModel
+class KerasEngine:
+    def __init__(self, inputDim, outputDim, attributes):
+        self.model = compileModel(inputDim, outputDim, attributes)
+        self.inference = None
+
+    def fit(self, inputs_train, outputs_train, epochs, callbacks=None, fitOptions=None):
+        self.model, history = fitModel(self.model, inputs_train, outputs_train, epochs, callbacks, **(fitOptions or {}))
+        self.inference = NumpyDenseModel.fromKerasModel(self.model)
+        return history
+
+    def predict(self, inputs):
+        if self.inference is None:
+            return self.model.predict(inputs)
+        return self.inference.predict(inputs)
+
+    def get_weights(self):
+        return self.model.get_weights()
+
+    def set_weights(self, weights):
+        self.model.set_weights(weights)
+        self.inference = NumpyDenseModel.fromKerasModel(self.model)
+
+#replicas copies of the compileModel network side by side in one model, each with its own seeded initial weights
+#The hidden layers of all the replicas form one wide Dense layer and their output layers one EinsumDense, so a
+#training step of every replica is a single batched computation
+def compileEnsembleModel(inputDim, outputDim, attributes, replicas):
+    import tensorflow as tf
+    from keras.models import Sequential
+    from keras.layers import Dense, Reshape, EinsumDense
+    from keras.initializers import RandomUniform
+
+    inputCount = inputDim*len(attributes)
+    hiddenDim = math.ceil((inputDim+outputDim)/2)
+
+    #Targets are (samples, outputDim), every replica is scored against them
+    def mse(outputs, predictions):
+        return tf.reduce_mean(tf.square(predictions - tf.expand_dims(outputs, 1)), axis=[1, 2])
+
+    def mae(outputs, predictions):
+        return tf.reduce_mean(tf.abs(predictions - tf.expand_dims(outputs, 1)), axis=[1, 2])
+
+    #Glorot uniform limits of a single replica's layers, the wide layers would otherwise be initialised smaller
+    model = Sequential()
+    model.add(Dense(replicas*hiddenDim, input_dim=inputCount, activation='relu',
+        kernel_initializer=RandomUniform(-math.sqrt(6/(inputCount+hiddenDim)), math.sqrt(6/(inputCount+hiddenDim)), seed=3)))
+    model.add(Reshape((replicas, hiddenDim)))
+    model.add(EinsumDense("bkh,kho->bko", output_shape=(replicas, outputDim), bias_axes="ko",
+        kernel_initializer=RandomUniform(-math.sqrt(6/(hiddenDim+outputDim)), math.sqrt(6/(hiddenDim+outputDim)), seed=4)))
+    model.compile(loss=mse, optimizer="adam", metrics=[mse, mae])
+    model.summary()
+    return model
+
+#Seed ensemble of the Dense network, predict gives the replica mean and predictBands the spread across replicas
+#Predictions run through NumPy like KerasEngine's
+class EnsembleEngine:
+    def __init__(self, inputDim, outputDim, attributes, replicas=8, quantiles=(0.1, 0.9)):
+        self.replicas = replicas
+        self.quantiles = quantiles
+        self.model = compileEnsembleModel(inputDim, outputDim, attributes, replicas)
+
+    def fit(self, inputs_train, outputs_train, epochs, callbacks=None, fitOptions=None):
+        self.model, history = fitModel(self.model, inputs_train, outputs_train, epochs, callbacks, **(fitOptions or {}))
+        return history
+
+    #(samples, replicas, outputDim)
+    def predictReplicas(self, inputs):
+        hiddenKernel, hiddenBias, outputKernel, outputBias = self.get_weights()
+        hidden = np.maximum(np.asarray(inputs, dtype=np.float32) @ hiddenKernel + hiddenBias, 0)
+        return np.einsum("bkh,kho->bko", hidden.reshape(len(hidden), self.replicas, -1), outputKernel) + outputBias
+
+    def predict(self, inputs):
+        return self.predictReplicas(inputs).mean(axis=1)
+
+    #Lower and Upper quantiles across the replicas, MinMax scaling keeps the order so they can be taken before unscaling
+    def predictBands(self, inputs):
+        lower, upper = np.quantile(self.predictReplicas(inputs), self.quantiles, axis=1)
+        return {"Lower": lower, "Upper": upper}
+
+    def get_weights(self):
+        return self.model.get_weights()
+
+    def set_weights(self, weights):
+        self.model.set_weights(weights)
+
+#Linear autoregressive model on the same windows, solved in closed form with a ridge penalty
+#epochs, callbacks and fitOptions are ignored, the single history entry is the training error of the solution
+class RidgeEngine:
+    def __init__(self, inputDim, outputDim, attributes, alpha=0.01):
+        self.alpha = alpha
+        self.coefficients = np.zeros((inputDim*len(attributes), outputDim))
+        self.intercept = np.zeros(outputDim)
+
+    def fit(self, inputs_train, outputs_train, epochs, callbacks=None, fitOptions=None):
+        startTime = time.perf_counter()
+
+        #Centring the data keeps the intercept out of the penalty
+        inputsMean = inputs_train.mean(axis=0)
+        outputsMean = outputs_train.mean(axis=0)
+        inputs_c = inputs_train - inputsMean
+        outputs_c = outputs_train - outputsMean
+
+        gram = inputs_c.T @ inputs_c
+        gram[np.diag_indices_from(gram)] += self.alpha
+        self.coefficients = np.linalg.solve(gram, inputs_c.T @ outputs_c)
+        self.intercept = outputsMean - inputsMean @ self.coefficients
+
+        error = self.predict(inputs_train) - outputs_train
+        return ForecastHistory({"mse": [float(np.mean(error**2))], "mae": [float(np.mean(np.abs(error)))]}, 
+            {"epochs": 1, "epochsRun": 1, "trainingTime": time.perf_counter() - startTime})
+
+    def predict(self, inputs):
+        return inputs @ self.coefficients + self.intercept
+
+    def get_weights(self):
+        return [self.coefficients, self.intercept]
+
+    def set_weights(self, weights):
+        self.coefficients, self.intercept = weights
+
+ENGINES = {
+    "keras": KerasEngine,
+    "ridge": RidgeEngine,
+    "ensemble": EnsembleEngine
+}
+
+def createEngine(engine, inputDim, outputDim, attributes):
+    return ENGINES[engine](inputDim, outputDim, attributes)
+
+#fitOptions are passed on to fitModel, see there for early stopping and time budgets
+def forecast(stockData, inputDim, outputDim, attributes, epochs, engine="keras", callbacks=None, fitOptions=None):
+    forecastResults, outputs_test, outputs_pred, rmse, mape, history, model, inputs_scaler, outputs_scaler = forecastWithModel(stockData, inputDim, outputDim, attributes, epochs, 
+        engine=engine, callbacks=callbacks, fitOptions=fitOptions)
+    return forecastResults, outputs_test, outputs_pred, rmse, mape, history
+
+#Same as forecast, but also returns the trained engine and fitted scalers
+#Passing in a trained engine and its scalers fine-tunes that engine instead of training a new one, or with fit=False
+#only scores and runs it (history is then None). testIndices is passed on to splitData.
+def forecastWithModel(stockData, inputDim, outputDim, attributes, epochs, model=None, inputs_scaler=None, outputs_scaler=None, engine="keras", callbacks=None, fitOptions=None,
+        testIndices=None, fit=True):
+    #Set seeds for reproducable results
+    setSeeds()
+    stockDataArray = stockData.to_numpy()
+
+    warmStart = model is not None
+    if not warmStart:
+        from sklearn.preprocessing import MinMaxScaler
+
+        inputs_scaler = MinMaxScaler(feature_range=(0, 1))
+        outputs_scaler = MinMaxScaler(feature_range=(0, 1))
+        model = createEngine(engine, inputDim, outputDim, attributes)
+
+    inputs_train, inputs_test, outputs_train, outputs_test, forecastInput = splitData(stockDataArray, inputDim, outputDim, attributes, testIndices)
+    inputs_train_n, inputs_test_n, outputs_train_n, outputs_test_n, forecastInput_n = normaliseData(inputs_train, inputs_test, outputs_train, 
+        outputs_test, forecastInput, inputs_scaler, outputs_scaler, outputDim, fitScalers=not warmStart)
+    
+    history = model.fit(inputs_train_n, outputs_train_n, epochs, callbacks, fitOptions) if fit else None
+    outputs_pred, rmse, mape = testModel(model, inputs_test_n, outputs_test_n, outputs_scaler) 
+
+    forecastOutput_n = model.predict(forecastInput_n)
+    bands_n = model.predictBands(forecastInput_n) if hasattr(model, "predictBands") else None
+    forecastResults = createForecastResults(stockData, forecastOutput_n, outputs_scaler, outputDim, bands_n)
+
+    return forecastResults, outputs_test, outputs_pred, rmse, mape, history, model, inputs_scaler, outputs_scaler
+
+""" #TEST ONLY
+
+import yfinance as yf
+from matplotlib import pyplot
+
+stockData = yf.download("AAPL", start="2021-04-20")
+stockDataArray = stockData.to_numpy()
+
+outputDim = 10
+
+forecastOutput, outputs_test, outputs_pred, rmse, mape, history = forecast(stockData, 20, outputDim, [0, 1, 2, 3, 4, 5], 50)
+
+print(forecastOutput)
+
+pyplot.plot(history.history['mse'])
+pyplot.plot(history.history['mae'])
+pyplot.show()
+
+pyplot.plot(outputs_test, color='blue')
+pyplot.plot(outputs_pred, color='orange')
+pyplot.show()
+
+print('Test RMSE: %.3f' % rmse)
+print('Test MAPE: %.3f' % mape)
+
+forecastOutput = np.transpose(forecastOutput) #This puts the data in a format ready to be plotted
+
+days = []
+
+for i in range(outputDim):
+    days.append([datetime.date.today() + datetime.timedelta(days=i+1)])
+
+pyplot.plot(stockData.index, stockDataArray[:, 3], color='blue')
+pyplot.plot(days, forecastOutput, color='orange')
+pyplot.show()
+
 #TEST ONLY """
\ No newline at end of file
@@ -0,0 +1,99 @@
+import os
+import json
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+
+import forecast
+from forecast import ForecastHistory, fingerprintData
+from model_registry import modelRegistry
+
+def createCacheKey(stockData_df, inputDim, outputDim, attributes, epochs, engine="keras", fitOptions=None):
+    parameters = "{0}|{1}|{2}|{3}|{4}|{5}".format(int(inputDim), int(outputDim), ",".join(str(int(a)) for a in attributes), int(epochs), engine, 
+        json.dumps(fitOptions or {}, sort_keys=True))
+    return hashlib.sha256((fingerprintData(stockData_df) + "|" + parameters).encode()).hexdigest()
+
+#Forecast results cache, in memory with LRU eviction and optionally backed by pickles on disk
+class ForecastCache:
+    def __init__(self, maxSize=32, cacheDir=None):
+        self.maxSize = maxSize
+        self.cacheDir = cacheDir
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+
+        if cacheDir is not None:
+            os.makedirs(cacheDir, exist_ok=True)
+
+    def diskPath(self, key):
+        return os.path.join(self.cacheDir, key + ".pkl")
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+
+        if self.cacheDir is not None and os.path.exists(self.diskPath(key)):
+            try:
+                with open(self.diskPath(key), "rb") as f:
+                    results = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                results = None
+
+            if results is not None:
+                with self.lock:
+                    self.diskHits += 1
+                self.putMemory(key, results)
+                return results
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def putMemory(self, key, results):
+        with self.lock:
+            self.entries[key] = results
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxSize:
+                self.entries.popitem(last=False)
+
+    def put(self, key, results):
+        self.putMemory(key, results)
+
+        if self.cacheDir is not None:
+            #Write then rename, so a crashed write never leaves a half written entry behind
+            tempPath = self.diskPath(key) + ".{0}.tmp".format(os.getpid())
+            with open(tempPath, "wb") as f:
+                pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tempPath, self.diskPath(key))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.diskHits = self.misses = 0
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "diskHits": self.diskHits, "misses": self.misses, "size": len(self.entries), "maxSize": self.maxSize}
+
+#Runs the forecast without the cache, returning a picklable results tuple
+#With a stockCode, the keras engine goes through the model registry so a slid forward range can fine-tune the stored model
+def computeForecast(stockData_df, inputDim, outputDim, attributes, epochs, stockCode=None, engine="keras", callbacks=None, fitOptions=None):
+    #Only the keras engine is slow enough to be worth warm starting
+    if stockCode is not None and engine == "keras":
+        forecastResults, outputs_test, outputs_pred, rmse, mape, history = modelRegistry.forecast(stockCode, stockData_df, inputDim, outputDim, attributes, epochs, callbacks, fitOptions)
+    else:
+        forecastResults, outputs_test, outputs_pred, rmse, mape, history = forecast.forecast(stockData_df, inputDim, outputDim, attributes, epochs, engine, callbacks, fitOptions)
+
+    if not isinstance(history, ForecastHistory):
+        history = ForecastHistory.fromKerasHistory(history)
+
+    return forecastResults, outputs_test, outputs_pred, rmse, mape, history
+
+forecastCache = ForecastCache(maxSize=int(os.environ.get("FORECO_FORECAST_CACHE_SIZE", 32)), cacheDir=os.environ.get("FORECO_FORECAST_CACHE_DIR"))
@@ -0,0 +1,108 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import metrics
+from providers import provider as defaultProvider, TICKER_DATASETS
+
+#Seconds each yf.Ticker dataset stays fresh, they change at very different rates
+TTLS = {
+    "info": 24*60*60,
+    "recommendations": 60*60, #Analysts publish during the day
+    "actions": 24*60*60, #Dividends and splits are announced well ahead
+    "institutional_holders": 7*24*60*60, #Filed quarterly
+    "sustainability": 7*24*60*60
+}
+
+#yf.Ticker fills these in from one scrape of the Yahoo quote page, made by whichever of them is read first and not
+#shared with reads already running, actions comes from the price history instead
+SCRAPED_DATASETS = ["info", "recommendations", "institutional_holders", "sustainability"]
+
+#Fundamentals for the analysis dashboard's tabs, kept in memory per ticker so switching tabs doesn't wait on Yahoo
+#Asking for one dataset of a ticker fetches the other stale ones alongside it in a thread pool, so the next tab is
+#usually already there. A dataset being fetched is waited on rather than fetched again.
+class FundamentalsCache:
+    def __init__(self, provider, ttls=TTLS, maxTickers=64, maxWorkers=8):
+        self.provider = provider
+        self.ttls = ttls
+        self.maxTickers = maxTickers
+        self.entries = OrderedDict() #stockCode: {dataset: (fetchTime, Future of the data)}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix="fundamentals")
+
+        self.hits = 0
+        self.misses = 0
+
+    #scrape is the Future of the read that scrapes the page for this one, a failed scrape fails it too
+    def fetch(self, ticker, dataset, scrape=None):
+        if scrape is not None and scrape.exception() is not None:
+            raise scrape.exception()
+        with metrics.span("ticker." + dataset):
+            return getattr(ticker, dataset)
+
+    #A failed fetch is forgotten, so the next request tries again instead of getting the error for the whole ttl
+    def forget(self, stockCode, dataset, future):
+        if future.exception() is None:
+            return
+        with self.lock:
+            datasets = self.entries.get(stockCode, {})
+            if dataset in datasets and datasets[dataset][1] is future:
+                del datasets[dataset]
+
+    #Starts fetching every dataset of the ticker that is missing or stale, returns {dataset: Future}
+    def prefetch(self, stockCode):
+        now = time.monotonic()
+        futures = {}
+        fetching = []
+
+        with self.lock:
+            datasets = self.entries.setdefault(stockCode, {})
+            self.entries.move_to_end(stockCode)
+            while len(self.entries) > self.maxTickers:
+                self.entries.popitem(last=False)
+
+            ticker = None
+            scrape = None
+            for dataset in TICKER_DATASETS:
+                if dataset in datasets and now - datasets[dataset][0] <= self.ttls[dataset]:
+                    futures[dataset] = datasets[dataset][1]
+                    continue
+                #One ticker object per batch, its first scraped dataset is read on its own and the others wait for it,
+                #so the page is scraped once instead of by every thread at the same time
+                if ticker is None:
+                    ticker = self.provider.ticker(stockCode)
+                if dataset in SCRAPED_DATASETS:
+                    future = self.executor.submit(self.fetch, ticker, dataset, scrape)
+                    scrape = scrape or future
+                else:
+                    future = self.executor.submit(self.fetch, ticker, dataset)
+                datasets[dataset] = (now, future)
+                futures[dataset] = future
+                fetching.append(dataset)
+
+        for dataset in fetching:
+            future = futures[dataset]
+            future.add_done_callback(lambda future, dataset=dataset: self.forget(stockCode, dataset, future))
+
+        return futures
+
+    def get(self, stockCode, dataset):
+        future = self.prefetch(stockCode)[dataset]
+        with self.lock:
+            if future.done():
+                self.hits += 1
+            else:
+                self.misses += 1
+        return future.result()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.entries), "maxTickers": self.maxTickers}
+
+fundamentalsCache = FundamentalsCache(defaultProvider, maxTickers=int(os.environ.get("FORECO_FUNDAMENTALS_CACHE_SIZE", 64)))
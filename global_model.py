@@ -0,0 +1,81 @@
+import math
+
+import numpy as np
+
+import forecast
+
+#One Dense network shared by every ticker, optionally told which ticker a window belongs to through an embedding
+def compileGlobalModel(inputDim, outputDim, attributes, tickerCount, embeddingDim=None):
+    from keras.models import Model
+    from keras.layers import Input, Dense, Embedding, Flatten, Concatenate
+
+    windowsInput = Input(shape=(inputDim*len(attributes),))
+    inputs = [windowsInput]
+    features = windowsInput
+
+    if embeddingDim:
+        tickerInput = Input(shape=(1,), dtype="int32")
+        inputs.append(tickerInput)
+        features = Concatenate()([windowsInput, Flatten()(Embedding(tickerCount, embeddingDim)(tickerInput))])
+
+    hidden = Dense((math.ceil((inputDim+outputDim)/2)), activation='relu')(features) #Same size as the per ticker model
+    model = Model(inputs=inputs, outputs=Dense(outputDim)(hidden))
+    model.compile(loss="mean_squared_error", optimizer="adam", metrics=['mse', 'mae','mape', 'cosine_proximity'])
+    model.summary()
+    return model
+
+#Splits and normalises every ticker with its own scalers, the model only ever sees normalised windows
+def prepareTicker(stockData_df, inputDim, outputDim, attributes):
+    from sklearn.preprocessing import MinMaxScaler
+
+    inputs_scaler = MinMaxScaler(feature_range=(0, 1))
+    outputs_scaler = MinMaxScaler(feature_range=(0, 1))
+
+    inputs_train, inputs_test, outputs_train, outputs_test, forecastInput = forecast.splitData(stockData_df.to_numpy(), inputDim, outputDim, attributes)
+    normalised = forecast.normaliseData(inputs_train, inputs_test, outputs_train, outputs_test, forecastInput, inputs_scaler, outputs_scaler, outputDim)
+
+    return normalised, outputs_test, outputs_scaler
+
+#Trains one model on the stacked windows of every ticker in stockData ({stockCode: stockData_df})
+#Returns {stockCode: (forecastResults, outputs_test, outputs_pred, rmse, mape, history)}, the same contract as forecast.forecast
+def forecastGlobal(stockData, inputDim, outputDim, attributes, epochs, embeddingDim=None, callbacks=None, fitOptions=None):
+    forecast.setSeeds()
+
+    stockCodes = list(stockData)
+    prepared = [prepareTicker(stockData[stockCode], inputDim, outputDim, attributes) for stockCode in stockCodes]
+
+    inputs_train_n = np.concatenate([normalised[0] for normalised, _, _ in prepared])
+    outputs_train_n = np.concatenate([normalised[2] for normalised, _, _ in prepared])
+    inputs_test_n = np.concatenate([normalised[1] for normalised, _, _ in prepared])
+    forecastInputs_n = np.concatenate([normalised[4] for normalised, _, _ in prepared])
+
+    #Ticker ids line up with the stacked rows, offsets split the batched predictions back per ticker
+    trainIds = np.concatenate([np.full(len(normalised[0]), i) for i, (normalised, _, _) in enumerate(prepared)])
+    testIds = np.concatenate([np.full(len(normalised[1]), i) for i, (normalised, _, _) in enumerate(prepared)])
+    testOffsets = np.cumsum([0] + [len(normalised[1]) for normalised, _, _ in prepared])
+
+    model = compileGlobalModel(inputDim, outputDim, attributes, len(stockCodes), embeddingDim)
+
+    #A single batched predict covers the test windows and forecast inputs of every ticker
+    predictInputs_n = np.concatenate([inputs_test_n, forecastInputs_n])
+    if embeddingDim:
+        trainInputs = [inputs_train_n, trainIds]
+        predictInputs = [predictInputs_n, np.concatenate([testIds, np.arange(len(stockCodes))])]
+    else:
+        trainInputs = inputs_train_n
+        predictInputs = predictInputs_n
+
+    model, history = forecast.fitModel(model, trainInputs, outputs_train_n, epochs, callbacks, **(fitOptions or {}))
+    history = forecast.ForecastHistory.fromKerasHistory(history)
+
+    predictions_n = model.predict(predictInputs)
+    outputs_pred_n, forecastOutputs_n = predictions_n[:len(inputs_test_n)], predictions_n[len(inputs_test_n):]
+
+    results = {}
+    for i, stockCode in enumerate(stockCodes):
+        normalised, outputs_test, outputs_scaler = prepared[i]
+        outputs_pred, rmse, mape = forecast.scorePredictions(outputs_pred_n[testOffsets[i]:testOffsets[i+1]], normalised[3], outputs_scaler)
+        forecastResults = forecast.createForecastResults(stockData[stockCode], forecastOutputs_n[[i]], outputs_scaler, outputDim)
+        results[stockCode] = (forecastResults, outputs_test, outputs_pred, rmse, mape, history)
+
+    return results
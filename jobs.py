@@ -0,0 +1,230 @@
+import os
+import time
+import uuid
+import queue
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, CancelledError
+from concurrent.futures.process import BrokenProcessPool
+
+import sweep
+import forecast
+import backtest
+from forecast import ForecastHistory
+from forecast_cache import forecastCache, createCacheKey, computeForecast
+from metrics import metrics
+
+### ----- WORKER PROCESS ----- ###
+
+progressQueue = None
+
+#Workers get the same thread caps as a sweep's own pool, so the pool as a whole doesn't oversubscribe the cores
+def initWorker(queue, threadsPerWorker):
+    global progressQueue
+    progressQueue = queue
+    sweep.initSweepWorker(threadsPerWorker)
+
+#Runs in a worker process, every finished epoch is published to the parent through the progress queue
+def runForecastJob(jobId, stockData_df, inputDim, outputDim, attributes, epochs, stockCode, engine, fitOptions):
+    def publish(epoch, logs):
+        progressQueue.put((jobId, epoch, {metric: float(value) for metric, value in (logs or {}).items()}))
+
+    return computeForecast(stockData_df, inputDim, outputDim, attributes, epochs, stockCode, engine, [forecast.createProgressCallback(publish)], fitOptions)
+
+### ----- PARENT PROCESS ----- ###
+
+#Forecasts trained in a process pool, so callbacks return straight away and poll for progress
+#Sweep configurations and backtest origins are batch tasks, queued here and fed to the pool a few at a time so forecasts don't wait behind them
+class TrainingJobs:
+    def __init__(self, maxWorkers=None, maxFinishedJobs=64, maxBatchTasks=None):
+        self.maxWorkers = maxWorkers or max(1, (os.cpu_count() or 2) // 2)
+        self.maxFinishedJobs = maxFinishedJobs
+        self.maxBatchTasks = maxBatchTasks or max(1, self.maxWorkers - 1) #Leaves a worker free for forecasts
+        self.batchTasks = deque() #(Future, function, args) not yet in the pool
+        self.batchRunning = 0
+        self.executor = None
+        self.progressQueue = None
+        self.jobs = {}
+        self.batches = {} #jobId: ([Future of each task's result], function collecting the results)
+        self.lock = threading.Lock()
+
+    #The pool is only started by the first forecast that isn't cached
+    def getExecutor(self):
+        with self.lock:
+            if self.executor is None:
+                #spawn keeps tensorflow out of forked copies of a threaded server
+                context = multiprocessing.get_context("spawn")
+                self.progressQueue = context.Queue()
+                threadsPerWorker = max(1, (os.cpu_count() or 1) // self.maxWorkers)
+                self.executor = ProcessPoolExecutor(max_workers=self.maxWorkers, mp_context=context, initializer=initWorker, 
+                    initargs=(self.progressQueue, threadsPerWorker))
+            return self.executor
+
+    #A worker that dies (out of memory, a native crash in tensorflow) breaks the whole pool and every submit after it
+    #would fail, so a broken pool is replaced and the task submitted to the new one
+    def submitTask(self, function, *args):
+        executor = self.getExecutor()
+        try:
+            return executor.submit(function, *args)
+        except BrokenProcessPool:
+            with self.lock:
+                if self.executor is executor:
+                    self.executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            return self.getExecutor().submit(function, *args)
+
+    #Same as submitTask, but the task waits its turn behind the other batch tasks and at most maxBatchTasks of them
+    #are in the pool at once, a forecast submitted during a sweep only waits for the tasks already running
+    def submitBatchTask(self, function, *args):
+        future = Future()
+        with self.lock:
+            self.batchTasks.append((future, function, args))
+        self.startBatchTasks()
+        return future
+
+    def startBatchTasks(self):
+        while True:
+            with self.lock:
+                if self.batchRunning >= self.maxBatchTasks or not self.batchTasks:
+                    return
+                future, function, args = self.batchTasks.popleft()
+                self.batchRunning += 1
+
+            try:
+                poolFuture = self.submitTask(function, *args)
+            except Exception as e:
+                with self.lock:
+                    self.batchRunning -= 1
+                future.set_exception(e)
+                continue
+            poolFuture.add_done_callback(lambda poolFuture, future=future: self.finishBatchTask(poolFuture, future))
+
+    def finishBatchTask(self, poolFuture, future):
+        with self.lock:
+            self.batchRunning -= 1
+
+        if poolFuture.cancelled():
+            future.set_exception(CancelledError())
+        elif poolFuture.exception() is not None:
+            future.set_exception(poolFuture.exception())
+        else:
+            future.set_result(poolFuture.result())
+        self.startBatchTasks()
+
+    #Returns a job id, identical forecasts already in flight share one job and cached ones complete straight away
+    def submit(self, stockData_df, inputDim, outputDim, attributes, epochs, stockCode=None, engine="keras", fitOptions=None):
+        key = createCacheKey(stockData_df, inputDim, outputDim, attributes, epochs, engine, fitOptions)
+
+        with self.lock:
+            for jobId, job in self.jobs.items():
+                if job["key"] == key and job["future"] is not None and not job["future"].done():
+                    return jobId
+
+        jobId = uuid.uuid4().hex
+        job = {"key": key, "stockData": stockData_df, "stockCode": stockCode, "epochs": epochs, "progress": {"mse": [], "mae": []}, "future": None, "results": forecastCache.get(key)}
+
+        if job["results"] is None:
+            job["future"] = self.submitTask(runForecastJob, jobId, stockData_df, inputDim, outputDim, attributes, epochs, stockCode, engine, fitOptions)
+
+            #Timed from submission, so time spent queued behind other jobs counts too
+            submitTime = time.perf_counter()
+            job["future"].add_done_callback(lambda future: metrics.observe("forecast", time.perf_counter() - submitTime, 
+                error=future.cancelled() or future.exception() is not None))
+        else:
+            job["progress"] = dict(job["results"][5].history)
+
+        with self.lock:
+            self.jobs[jobId] = job
+            self.pruneFinished()
+        return jobId
+
+    #Keeps the most recent finished jobs around for pages still polling them, their results are in the forecast cache anyway
+    def pruneFinished(self):
+        finished = [jobId for jobId, job in self.jobs.items() if job["future"] is None or job["future"].done()]
+        for jobId in finished[:max(0, len(finished) - self.maxFinishedJobs)]:
+            del self.jobs[jobId]
+
+    def getJob(self, jobId):
+        with self.lock:
+            return self.jobs.get(jobId)
+
+    #Moves the published epochs from the queue onto their jobs
+    def drainProgress(self):
+        if self.progressQueue is None:
+            return
+        while True:
+            try:
+                jobId, epoch, logs = self.progressQueue.get_nowait()
+            except queue.Empty:
+                return
+            with self.lock:
+                job = self.jobs.get(jobId)
+                if job is not None:
+                    for metric, value in logs.items():
+                        job["progress"].setdefault(metric, []).append(value)
+
+    #Per-epoch metrics published so far, as a history object the training chart can plot
+    def progress(self, jobId):
+        self.drainProgress()
+        job = self.getJob(jobId)
+        if job is None:
+            return None
+        with self.lock:
+            return ForecastHistory({metric: list(values) for metric, values in job["progress"].items()}, {"epochs": job["epochs"]})
+
+    #None while the job is running, re-raises the error of a failed job
+    def result(self, jobId):
+        job = self.getJob(jobId)
+        if job["results"] is None:
+            if not job["future"].done():
+                return None
+            job["results"] = job["future"].result()
+            forecastCache.put(job["key"], job["results"])
+        return job["results"]
+
+    #Submits the (function, args) tasks as batch tasks, collect turns their results into the job's result
+    #Returns a job id for batchResult
+    def submitBatch(self, tasks, collect):
+        futures = [self.submitBatchTask(function, *args) for function, args in tasks]
+
+        jobId = uuid.uuid4().hex
+        with self.lock:
+            self.batches[jobId] = (futures, collect)
+            while len(self.batches) > self.maxFinishedJobs:
+                del self.batches[next(iter(self.batches))]
+        return jobId
+
+    #(finished tasks, tasks, collected result or None while some are still running), re-raises the error of a failed task
+    def batchResult(self, jobId):
+        with self.lock:
+            futures, collect = self.batches.get(jobId, (None, None))
+        if futures is None:
+            raise KeyError("The job is no longer available, please run it again")
+
+        finished = sum(future.done() for future in futures)
+        if finished < len(futures):
+            return finished, len(futures), None
+        return finished, len(futures), collect([future.result() for future in futures])
+
+    #A sweep runs its configurations in the same pool, instead of starting a pool of its own and holding up the
+    #callback that asked for it. batchResult gives the results table.
+    def submitSweep(self, stockData_df, configs, engine="keras", fitOptions=None):
+        return self.submitBatch([(sweep.runSweepConfig, (stockData_df, config, engine, fitOptions)) for config in configs], sweep.collectResults)
+
+    #A walk-forward backtest with one task per origin, so forecasts can run between them and the page can show how
+    #many origins are done. batchResult gives the BacktestResult.
+    def submitBacktest(self, stockData_df, inputDim, outputDim, attributes, epochs, minTrainRows, mode="expanding", engine="keras", fitOptions=None):
+        stockDataArray, origins, starts = backtest.planBacktest(stockData_df, outputDim, minTrainRows, mode=mode)
+
+        tasks = [(backtest.runBacktestTask, (stockDataArray, origins[i:i+1], starts[i:i+1], inputDim, outputDim, attributes, epochs, engine, fitOptions))
+            for i in range(len(origins))]
+        collect = lambda results: backtest.collectBacktest(stockData_df, stockDataArray, origins, outputDim, 
+            [prediction for predictions in results for prediction in predictions])
+        return self.submitBatch(tasks, collect)
+
+    def inFlight(self):
+        with self.lock:
+            return sum(1 for job in self.jobs.values() if job["future"] is not None and not job["future"].done())
+
+trainingJobs = TrainingJobs(int(os.environ.get("FORECO_TRAINING_WORKERS", 0)) or None)
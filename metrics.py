@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+import uuid
+import bisect
+import logging
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+
+#Timing spans and counters for the server, exposed in the Prometheus text format by the /metrics route in app.py
+#Recording a span is two perf_counter calls, a bisect and a short lock, so it stays on even in production
+
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+#The trace log goes to stderr next to the server's own request log
+traceLogger = logging.getLogger("foreco.trace")
+traceLogger.setLevel(logging.INFO)
+traceHandler = logging.StreamHandler()
+traceHandler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+traceLogger.addHandler(traceHandler)
+traceLogger.propagate = False
+
+requestId = contextvars.ContextVar("requestId", default="-")
+
+#PreventUpdate is how a callback says there is nothing to update, not an error
+#Looked up rather than imported, when dash isn't loaded nothing can have raised it
+def isPreventUpdate(e):
+    exceptions = sys.modules.get("dash.exceptions")
+    return exceptions is not None and isinstance(e, exceptions.PreventUpdate)
+
+#Histogram of one span: bucket counts, sum and count, the same as a Prometheus histogram
+class SpanStats:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1) #Last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.errors = 0
+
+class Metrics:
+    def __init__(self, tracing=False):
+        self.tracing = tracing #Logs every span with the id of the request it ran in
+        self.spans = {}
+        self.collectors = []
+        self.lock = threading.Lock()
+
+    def observe(self, name, seconds, error=False):
+        with self.lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = SpanStats()
+            stats.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+            stats.sum += seconds
+            stats.count += 1
+            stats.errors += error
+
+        if self.tracing:
+            traceLogger.info("request=%s span=%s seconds=%.6f%s", requestId.get(), name, seconds, " error" if error else "")
+
+    @contextmanager
+    def span(self, name):
+        startTime = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self.observe(name, time.perf_counter() - startTime, error=not isPreventUpdate(e))
+            raise
+        self.observe(name, time.perf_counter() - startTime)
+
+    #Decorator version of span, callbacks are timed as callback.<function name>
+    def timed(self, name):
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    #collector() returns [(name, type, help, value)] and is called on every scrape, for values owned by other modules
+    def addCollector(self, collector):
+        self.collectors.append(collector)
+
+    #Flask before_request hook, tags the spans of the request for the trace log
+    def startRequest(self):
+        requestId.set(uuid.uuid4().hex[:8])
+
+    def render(self):
+        lines = [
+            "# HELP foreco_span_seconds Time spent in instrumented stages and callbacks.",
+            "# TYPE foreco_span_seconds histogram"
+        ]
+        with self.lock:
+            spans = sorted(self.spans.items())
+            for name, stats in spans:
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ["+Inf"], stats.buckets):
+                    cumulative += count
+                    lines.append('foreco_span_seconds_bucket{{span="{0}",le="{1}"}} {2}'.format(name, bound, cumulative))
+                lines.append('foreco_span_seconds_sum{{span="{0}"}} {1:.6f}'.format(name, stats.sum))
+                lines.append('foreco_span_seconds_count{{span="{0}"}} {1}'.format(name, stats.count))
+
+            lines.append("# HELP foreco_span_errors_total Instrumented stages and callbacks that raised.")
+            lines.append("# TYPE foreco_span_errors_total counter")
+            for name, stats in spans:
+                lines.append('foreco_span_errors_total{{span="{0}"}} {1}'.format(name, stats.errors))
+
+        for collector in self.collectors:
+            for name, metricType, help, value in collector():
+                lines.append("# HELP {0} {1}".format(name, help))
+                lines.append("# TYPE {0} {1}".format(name, metricType))
+                lines.append("{0} {1}".format(name, value))
+
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics(tracing=os.environ.get("FORECO_TRACE", "0") == "1")
@@ -0,0 +1,195 @@
+import os
+import re
+import json
+import time
+import uuid
+import zipfile
+
+import numpy as np
+
+import forecast
+from forecast import ForecastHistory
+
+SCALER_ATTRIBUTES = ["min_", "scale_", "data_min_", "data_max_", "data_range_", "n_samples_seen_"]
+
+def saveScaler(scaler, file, generation):
+    np.savez(file, generation=generation, feature_range=np.array(scaler.feature_range), **{name: getattr(scaler, name) for name in SCALER_ATTRIBUTES})
+
+def loadScaler(path, generation):
+    from sklearn.preprocessing import MinMaxScaler
+
+    with np.load(path) as state:
+        checkGeneration(state, generation)
+        scaler = MinMaxScaler(feature_range=tuple(state["feature_range"]))
+        for name in SCALER_ATTRIBUTES:
+            setattr(scaler, name, state[name])
+    scaler.n_features_in_ = len(scaler.scale_)
+    return scaler
+
+#Every file of an entry carries the generation of the save that wrote it, so a reader racing a save can't mix the
+#weights of one model with the scalers of another
+def checkGeneration(state, generation):
+    if str(state["generation"]) != generation:
+        raise ValueError("Registry entry is being replaced")
+
+#Writes through a temporary file renamed into place, readers in other processes never see a half written file
+def writeFile(path, write):
+    temporaryPath = "{0}.{1}.tmp".format(path, uuid.uuid4().hex)
+    try:
+        with open(temporaryPath, "wb") as f:
+            write(f)
+        os.replace(temporaryPath, path)
+    finally:
+        if os.path.exists(temporaryPath):
+            os.remove(temporaryPath)
+
+#Local store of trained models (weights plus fitted scalers), one entry per ticker and architecture
+#A request with the epochs and fit options of the stored model either reuses it as it is (same data), fine-tunes it
+#(the data slid forward by a few rows) or retrains it from scratch (anything else)
+class ModelRegistry:
+    def __init__(self, registryDir, maxNewRows=10, minOverlap=0.9, maxWarmRuns=5, warmEpochs=5):
+        self.registryDir = registryDir
+        self.maxNewRows = maxNewRows #More new rows than this forces a cold retrain
+        self.minOverlap = minOverlap #Fraction of the previously trained rows that must still be in the data
+        self.maxWarmRuns = maxWarmRuns #Consecutive fine-tunes allowed before a cold retrain
+        self.warmEpochs = warmEpochs
+        self.lastRun = None
+
+    def entryDir(self, stockCode, inputDim, outputDim, attributes):
+        architecture = "{0}_{1}_{2}".format(int(inputDim), int(outputDim), "-".join(str(int(a)) for a in attributes))
+        return os.path.join(self.registryDir, re.sub(r"[^A-Za-z0-9.-]", "_", stockCode), architecture)
+
+    #testStarts are the start times of the test windows, the windows the model hasn't been trained on
+    def save(self, stockCode, inputDim, outputDim, attributes, model, inputs_scaler, outputs_scaler, testStarts, metadata):
+        entryDir = self.entryDir(stockCode, inputDim, outputDim, attributes)
+        os.makedirs(entryDir, exist_ok=True)
+        generation = metadata["generation"] = uuid.uuid4().hex
+
+        weights = model.get_weights()
+        writeFile(os.path.join(entryDir, "weights.npz"), lambda f: np.savez(f, *weights, generation=generation))
+        writeFile(os.path.join(entryDir, "inputs_scaler.npz"), lambda f: saveScaler(inputs_scaler, f, generation))
+        writeFile(os.path.join(entryDir, "outputs_scaler.npz"), lambda f: saveScaler(outputs_scaler, f, generation))
+        writeFile(os.path.join(entryDir, "test_windows.npz"), lambda f: np.savez(f, starts=testStarts, generation=generation))
+
+        #Metadata is written last, an entry without it is treated as missing
+        writeFile(os.path.join(entryDir, "metadata.json"), lambda f: f.write(json.dumps(metadata).encode()))
+
+    def loadMetadata(self, stockCode, inputDim, outputDim, attributes):
+        try:
+            with open(os.path.join(self.entryDir(stockCode, inputDim, outputDim, attributes), "metadata.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    #Returns the model, its scalers and its test window start times, None when the entry is missing, damaged or
+    #being replaced by another process
+    def load(self, stockCode, inputDim, outputDim, attributes, generation):
+        entryDir = self.entryDir(stockCode, inputDim, outputDim, attributes)
+        try:
+            with np.load(os.path.join(entryDir, "weights.npz")) as weightsFile:
+                checkGeneration(weightsFile, generation)
+                weights = [weightsFile["arr_{0}".format(i)] for i in range(len(weightsFile.files) - 1)]
+            inputs_scaler = loadScaler(os.path.join(entryDir, "inputs_scaler.npz"), generation)
+            outputs_scaler = loadScaler(os.path.join(entryDir, "outputs_scaler.npz"), generation)
+            with np.load(os.path.join(entryDir, "test_windows.npz")) as testWindowsFile:
+                checkGeneration(testWindowsFile, generation)
+                testStarts = testWindowsFile["starts"]
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+
+        model = forecast.createEngine("keras", inputDim, outputDim, attributes)
+        model.set_weights(weights)
+
+        return model, inputs_scaler, outputs_scaler, testStarts
+
+    #The new data has to be bars of the same interval, still contain most of the old rows and add a few new ones
+    def isNearSuperset(self, metadata, stockData_df):
+        if metadata.get("barInterval") != forecast.barInterval(stockData_df.index).total_seconds():
+            return False
+
+        index = stockData_df.index.asi8
+        oldStart, oldEnd = metadata["startTime"], metadata["endTime"]
+
+        overlap = np.count_nonzero((index >= oldStart) & (index <= oldEnd)) / metadata["rows"]
+        newRows = np.count_nonzero(index > oldEnd)
+
+        return overlap >= self.minOverlap and 0 < newRows <= self.maxNewRows
+
+    #"reuse", "warm" or "cold", fitOptions as they come back out of the metadata
+    def chooseMode(self, previous, stockData_df, fingerprint, epochs, fitOptions):
+        if previous is None or previous.get("epochs") != epochs or previous.get("fitOptions") != fitOptions:
+            return "cold"
+        if previous.get("fingerprint") == fingerprint:
+            return "reuse"
+        if previous["warmRuns"] < self.maxWarmRuns and self.isNearSuperset(previous, stockData_df):
+            return "warm"
+        return "cold"
+
+    #Same contract as forecast.forecast, reuses or fine-tunes the stored model when it can
+    #Reused and fine-tuned models are only scored on the test windows of the stored model that are still in the data,
+    #every other window may have been trained on. A fine-tune with none of them left retrains from scratch.
+    def forecast(self, stockCode, stockData_df, inputDim, outputDim, attributes, epochs, callbacks=None, fitOptions=None):
+        epochs = int(epochs)
+        fitOptions = json.loads(json.dumps(fitOptions or {}))
+        previous = self.loadMetadata(stockCode, inputDim, outputDim, attributes)
+        fingerprint = forecast.fingerprintData(stockData_df)
+        windowStarts = stockData_df.index.asi8[:len(stockData_df)-inputDim-outputDim]
+
+        mode = self.chooseMode(previous, stockData_df, fingerprint, epochs, fitOptions)
+        if mode != "cold":
+            entry = self.load(stockCode, inputDim, outputDim, attributes, previous["generation"])
+            testIndices = np.flatnonzero(np.isin(windowStarts, entry[3])) if entry is not None else []
+            if len(testIndices) == 0:
+                mode = "cold"
+
+        startTime = time.perf_counter()
+        if mode == "cold":
+            forecastResults, outputs_test, outputs_pred, rmse, mape, history, model, inputs_scaler, outputs_scaler = forecast.forecastWithModel(
+                stockData_df, inputDim, outputDim, attributes, epochs, callbacks=callbacks, fitOptions=fitOptions)
+            #The same split forecastWithModel made
+            testIndices = forecast.splitIndices(len(windowStarts))[1]
+        else:
+            forecastResults, outputs_test, outputs_pred, rmse, mape, history, model, inputs_scaler, outputs_scaler = forecast.forecastWithModel(
+                stockData_df, inputDim, outputDim, attributes, min(self.warmEpochs, epochs), *entry[:3], callbacks=callbacks, fitOptions=fitOptions, 
+                testIndices=testIndices, fit=mode == "warm")
+        trainingTime = time.perf_counter() - startTime
+
+        if mode == "reuse":
+            metadata = previous
+            history = ForecastHistory(previous["history"], previous["historyParams"])
+        else:
+            if not isinstance(history, ForecastHistory):
+                history = ForecastHistory.fromKerasHistory(history)
+            metadata = {
+                "startTime": int(stockData_df.index.asi8[0]),
+                "endTime": int(stockData_df.index.asi8[-1]),
+                "rows": len(stockData_df),
+                "barInterval": forecast.barInterval(stockData_df.index).total_seconds(),
+                "fingerprint": fingerprint,
+                "epochs": epochs,
+                "fitOptions": fitOptions,
+                "warmRuns": previous["warmRuns"] + 1 if mode == "warm" else 0,
+                #The cold run stays the reference point for every fine-tune that follows it
+                "coldTrainingTime": previous["coldTrainingTime"] if mode == "warm" else trainingTime,
+                "coldMape": previous["coldMape"] if mode == "warm" else float(mape),
+                "trainingTime": trainingTime,
+                "mape": float(mape),
+                #Kept for the training chart of a reused model
+                "history": history.history,
+                "historyParams": history.params
+            }
+            self.save(stockCode, inputDim, outputDim, attributes, model, inputs_scaler, outputs_scaler, windowStarts[testIndices], metadata)
+
+        self.lastRun = {
+            "stockCode": stockCode,
+            "mode": mode,
+            "trainingTime": trainingTime,
+            "timeSaved": metadata["coldTrainingTime"] - trainingTime,
+            "testWindows": len(testIndices),
+            "mape": float(mape),
+            "mapeDelta": float(mape) - metadata["coldMape"]
+        }
+
+        return forecastResults, outputs_test, outputs_pred, rmse, mape, history
+
+modelRegistry = ModelRegistry(os.environ.get("FORECO_MODEL_REGISTRY_DIR", ".model_registry"))
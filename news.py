@@ -0,0 +1,120 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from metrics import metrics
+from providers import provider as defaultProvider
+
+#Headlines the news list shows
+NEWS_COUNT = 10
+
+#Reads the headlines out of a MarketWatch page in one walk over its news module, with lxml's C parser
+#Returns [{"headline", "link", "timestamp", "provider"}], empty when the page has no news module
+def parseNews(newsHtml):
+    import lxml.html
+
+    if not newsHtml or not newsHtml.strip():
+        return []
+    container = lxml.html.fromstring(newsHtml).find(".//mw-scrollable-news-v2")
+    if container is None:
+        return []
+
+    headlines, links, providers, timestamps = [], [], [], []
+    for element in container.iter("h3", "a", "span"):
+        if element.tag == "h3":
+            headlines.append(element.text_content().strip())
+        elif element.tag == "a":
+            if element.get("href", "").startswith("https://"):
+                links.append(element.get("href"))
+        else:
+            classes = (element.get("class") or "").split()
+            if "article__author" in classes:
+                providers.append(element.text_content().strip())
+            elif "article__timestamp" in classes:
+                timestamps.append(element.text_content().strip())
+
+    #Every article links twice, from its picture and from its headline
+    count = min(NEWS_COUNT, len(headlines), len(links)//2, len(providers), len(timestamps))
+    return [{"headline": headlines[i], "link": links[i*2], "timestamp": timestamps[i], "provider": providers[i]} for i in range(count)]
+
+#Parsed headlines per ticker, so showing a ticker again within ttl seconds doesn't touch the network
+#Fetches run in a thread pool and are waited on for at most timeout seconds. One that takes longer keeps going and
+#fills the cache for the next view, meanwhile the last headlines seen (however old) or a TimeoutError are returned.
+#Once stale, a page is asked for again with its ETag and Last-Modified, so an unchanged one isn't downloaded or parsed.
+class NewsCache:
+    def __init__(self, provider, ttl=15*60, timeout=5, maxTickers=64, maxWorkers=4):
+        self.provider = provider
+        self.ttl = ttl
+        self.timeout = timeout
+        self.maxTickers = maxTickers
+        self.entries = OrderedDict() #stockCode: (fetchTime, news, validators)
+        self.inFlight = {} #stockCode: Future of the fetch
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix="news")
+
+        self.hits = 0
+        self.misses = 0
+        self.notModified = 0
+        self.timeouts = 0
+
+    #staleEntry is what the cache last had for the ticker, its news is kept if the page hasn't changed since
+    def fetch(self, stockCode, staleEntry):
+        try:
+            with metrics.span("news.fetch"):
+                newsHtml, validators = self.provider.news(stockCode, staleEntry[2] if staleEntry else None, self.timeout)
+
+            if newsHtml is None:
+                news = staleEntry[1]
+                with self.lock:
+                    self.notModified += 1
+            else:
+                with metrics.span("news.parse"):
+                    news = parseNews(newsHtml)
+
+            with self.lock:
+                self.entries[stockCode] = (time.monotonic(), news, validators)
+                self.entries.move_to_end(stockCode)
+                while len(self.entries) > self.maxTickers:
+                    self.entries.popitem(last=False)
+            return news
+        finally:
+            with self.lock:
+                del self.inFlight[stockCode]
+
+    def get(self, stockCode):
+        with self.lock:
+            entry = self.entries.get(stockCode)
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+                self.entries.move_to_end(stockCode)
+                self.hits += 1
+                return entry[1]
+
+            self.misses += 1
+            future = self.inFlight.get(stockCode)
+            if future is None:
+                future = self.inFlight[stockCode] = self.executor.submit(self.fetch, stockCode, entry)
+
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            with self.lock:
+                self.timeouts += 1
+            if entry is None:
+                raise
+            return entry[1]
+        except Exception:
+            if entry is None:
+                raise
+            return entry[1]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "notModified": self.notModified, "timeouts": self.timeouts, "size": len(self.entries)}
+
+newsCache = NewsCache(defaultProvider, float(os.environ.get("FORECO_NEWS_TTL", 15*60)), float(os.environ.get("FORECO_NEWS_TIMEOUT", 5)))
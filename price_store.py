@@ -0,0 +1,191 @@
+import os
+import re
+import json
+import datetime as dt
+import threading
+import uuid
+
+import pandas as pd
+
+from providers import provider as defaultProvider, sliceDates, downloadMany
+
+#Writes through a temporary file renamed into place, two writers of the same ticker never share a temporary file
+def writeFile(path, write):
+    temporaryPath = "{0}.{1}.tmp".format(path, uuid.uuid4().hex)
+    try:
+        with open(temporaryPath, "wb") as f:
+            write(f)
+        os.replace(temporaryPath, path)
+    finally:
+        if os.path.exists(temporaryPath):
+            os.remove(temporaryPath)
+
+#Local Parquet copy of every price range already downloaded, one file per ticker and interval
+#A request only downloads the part of its range the store doesn't cover yet (usually the last few days) and is
+#sliced from disk otherwise. Coverage is kept as a date range next to the file, since weekends and holidays
+#leave gaps in the data that aren't missing downloads.
+class PriceStore:
+    def __init__(self, storeDir, provider):
+        self.storeDir = storeDir
+        self.provider = provider
+        self.lock = threading.Lock()
+        self.entryLocks = {} #One per ticker and interval, serialises the read-fetch-write of an update
+        self.fetches = 0
+        self.fetchedRows = 0
+
+    def entryPaths(self, stockCode, interval):
+        entryDir = os.path.join(self.storeDir, re.sub(r"[^A-Za-z0-9.-]", "_", stockCode))
+        return os.path.join(entryDir, interval + ".parquet"), os.path.join(entryDir, interval + ".json")
+
+    def entryLock(self, stockCode, interval):
+        with self.lock:
+            return self.entryLocks.setdefault((stockCode, interval), threading.Lock())
+
+    #{"start", "end", "empty"}, empty lists the ranges next to the coverage the last download found no rows in
+    def loadCoverage(self, stockCode, interval):
+        try:
+            with open(self.entryPaths(stockCode, interval)[1]) as f:
+                coverage = json.load(f)
+            return {"start": coverage["start"], "end": coverage["end"], "empty": coverage.get("empty", [])}
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def read(self, stockCode, interval):
+        return pd.read_parquet(self.entryPaths(stockCode, interval)[0])
+
+    #Coverage is written last so it never claims rows the file doesn't have, the rows are left alone when None
+    def write(self, stockCode, interval, stockData_df, coverage):
+        dataPath, coveragePath = self.entryPaths(stockCode, interval)
+        os.makedirs(os.path.dirname(dataPath), exist_ok=True)
+
+        if stockData_df is not None:
+            writeFile(dataPath, stockData_df.to_parquet)
+        writeFile(coveragePath, lambda f: f.write(json.dumps(coverage).encode()))
+
+    def fetch(self, stockCode, startDate, endDate, interval):
+        stockData_df = self.provider.download(stockCode, startDate, endDate, interval)
+        with self.lock:
+            self.fetches += 1
+            self.fetchedRows += len(stockData_df)
+        return stockData_df
+
+    #The same range of every ticker in one request, returns {stockCode: stockData_df}
+    def fetchMany(self, stockCodes, startDate, endDate, interval):
+        stockData = downloadMany(self.provider, stockCodes, startDate, endDate, interval)
+        with self.lock:
+            self.fetches += 1
+            self.fetchedRows += sum(len(stockData_df) for stockData_df in stockData.values())
+        return stockData
+
+    #The (start, end) ranges of the request the store doesn't cover, usually just the tail
+    def missingRanges(self, coverage, startDate, endDate):
+        if coverage is None:
+            return [(startDate, endDate)]
+        ranges = []
+        if startDate < coverage["start"]:
+            ranges.append((startDate, coverage["start"]))
+        if endDate > coverage["end"]:
+            ranges.append((coverage["end"], endDate))
+        return ranges
+
+    #The part of an empty range an earlier download of the same gap found empty as well, None if there isn't one
+    def confirmedEmpty(self, coverage, start, end):
+        for emptyStart, emptyEnd in coverage["empty"]:
+            start, end = max(start, emptyStart), min(end, emptyEnd)
+            if start < end and start <= coverage["end"] and end >= coverage["start"]:
+                return start, end
+        return None
+
+    #Adds the downloaded parts ({(start, end): frame} for the missing ranges) to the stored rows and writes them back
+    #Only the missing head and tail are downloaded, the stored rows stay the same
+    def update(self, stockCode, interval, coverage, startDate, endDate, parts):
+        #Today's bar is still forming, so it is never counted as covered and is fetched again every time
+        today = dt.date.today().strftime("%Y-%m-%d")
+
+        if coverage is None:
+            stockData_df = parts[startDate, endDate]
+            if stockData_df.empty:
+                #Nothing to keep, an unknown ticker or a failed download shouldn't be remembered as covered
+                return stockData_df
+            self.write(stockCode, interval, stockData_df, {"start": startDate, "end": min(endDate, today), "empty": []})
+            return stockData_df
+
+        #Coverage only grows over the parts that came back with rows, a failed download leaves its gap to be fetched again
+        #A failed download looks the same as a range without trading days (a weekend or a holiday), so an empty range
+        #in the past is only covered once the next download of it is empty too
+        start, end = coverage["start"], coverage["end"]
+        downloaded, empty = [], []
+        for (partStart, partEnd), part_df in parts.items():
+            if part_df.empty:
+                if partEnd >= today:
+                    continue
+                confirmed = self.confirmedEmpty(coverage, partStart, partEnd)
+                if confirmed is None:
+                    empty.append([partStart, partEnd])
+                    continue
+                partStart, partEnd = confirmed
+            else:
+                downloaded.append(part_df)
+            start, end = min(start, partStart), max(end, partEnd)
+
+        stockData_df = self.read(stockCode, interval)
+        if downloaded:
+            stockData_df = pd.concat([stockData_df] + downloaded)
+            stockData_df = stockData_df[~stockData_df.index.duplicated(keep="last")].sort_index()
+
+        updated = {"start": start, "end": min(end, today), "empty": empty}
+        if downloaded or updated != coverage:
+            self.write(stockCode, interval, stockData_df if downloaded else None, updated)
+        return stockData_df
+
+    #Same contract as yf.download(stockCode, start=startDate, end=endDate, interval=interval)
+    def get(self, stockCode, startDate, endDate, interval="1d"):
+        with self.entryLock(stockCode, interval):
+            coverage = self.loadCoverage(stockCode, interval)
+            missing = self.missingRanges(coverage, startDate, endDate)
+            if not missing:
+                return sliceDates(self.read(stockCode, interval), startDate, endDate)
+
+            parts = {(start, end): self.fetch(stockCode, start, end, interval) for start, end in missing}
+            stockData_df = self.update(stockCode, interval, coverage, startDate, endDate, parts)
+
+        return sliceDates(stockData_df, startDate, endDate)
+
+    #get for a basket, returns {stockCode: stockData_df}
+    #Tickers missing the same range (all of it, or the days since they were last stored) download it in one request
+    def getMany(self, stockCodes, startDate, endDate, interval="1d"):
+        #Taken in a fixed order, so two baskets sharing tickers can't each hold a lock the other is waiting for
+        locks = [self.entryLock(stockCode, interval) for stockCode in sorted(set(stockCodes))]
+        for lock in locks:
+            lock.acquire()
+        try:
+            coverages = {stockCode: self.loadCoverage(stockCode, interval) for stockCode in stockCodes}
+            missing = {stockCode: self.missingRanges(coverages[stockCode], startDate, endDate) for stockCode in stockCodes}
+
+            requests = {} #(start, end): [stockCode]
+            for stockCode, ranges in missing.items():
+                for missingRange in ranges:
+                    requests.setdefault(missingRange, []).append(stockCode)
+            fetched = {} #(stockCode, (start, end)): stockData_df
+            for (start, end), rangeStockCodes in requests.items():
+                for stockCode, stockData_df in self.fetchMany(rangeStockCodes, start, end, interval).items():
+                    fetched[stockCode, (start, end)] = stockData_df
+
+            stockData = {}
+            for stockCode in stockCodes:
+                if missing[stockCode]:
+                    parts = {missingRange: fetched[stockCode, missingRange] for missingRange in missing[stockCode]}
+                    stockData_df = self.update(stockCode, interval, coverages[stockCode], startDate, endDate, parts)
+                else:
+                    stockData_df = self.read(stockCode, interval)
+                stockData[stockCode] = sliceDates(stockData_df, startDate, endDate)
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+        return stockData
+
+    def stats(self):
+        return {"fetches": self.fetches, "fetchedRows": self.fetchedRows}
+
+priceStore = PriceStore(os.environ.get("FORECO_PRICE_STORE_DIR", ".price_store"), defaultProvider)
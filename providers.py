@@ -0,0 +1,253 @@
+import os
+import json
+import time
+import random
+import threading
+from urllib.parse import parse_qs
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+#Providers are where market data comes from, anything with
+#    download(stockCode, startDate, endDate, interval) returning a yf.download shaped frame (Open, High, Low, Close, Adj Close, Volume by date)
+#    and optionally downloadMany(stockCodes, startDate, endDate, interval) returning {stockCode: frame} from one request
+#    ticker(stockCode) returning an object with info, recommendations, actions, institutional_holders and sustainability like yf.Ticker
+#    news(stockCode, validators, timeout) returning the HTML of the stock's MarketWatch page and the validators (ETag and
+#    Last-Modified) to send next time, or None for the HTML when the page hasn't changed since validators were given
+#can stand in for Yahoo and MarketWatch
+#startDate is inclusive and endDate exclusive, both "YYYY-MM-DD" strings, like yf.download
+
+NEWS_URL = "https://www.marketwatch.com/investing/stock/{0}?mod=quote_search"
+
+#yf.Ticker attributes the analysis dashboard shows, info is a dict and the rest are frames
+TICKER_DATASETS = ["info", "recommendations", "actions", "institutional_holders", "sustainability"]
+
+#yf.download collects its results in module globals it resets on every call, so two calls running together in
+#different threads lose each other's tickers. Every download is made one at a time behind this lock, a basket goes
+#out as one grouped download that fetches its tickers in yfinance's own threads.
+yahooLock = threading.Lock()
+
+class YahooProvider:
+    def download(self, stockCode, startDate, endDate, interval="1d"):
+        import yfinance as yf
+
+        with yahooLock:
+            return yf.download(stockCode, start=startDate, end=endDate, interval=interval, progress=False)
+
+    def downloadMany(self, stockCodes, startDate, endDate, interval="1d"):
+        import yfinance as yf
+
+        if len(stockCodes) == 1:
+            return {stockCodes[0]: self.download(stockCodes[0], startDate, endDate, interval)}
+
+        with yahooLock:
+            stockData_df = yf.download(stockCodes, start=startDate, end=endDate, interval=interval, group_by="ticker", threads=True, progress=False)
+        #A ticker that failed has a column of NaNs on the dates the others have
+        return {stockCode: stockData_df[stockCode].dropna(how="all") if stockCode in stockData_df.columns.get_level_values(0) else pd.DataFrame()
+            for stockCode in stockCodes}
+
+    def ticker(self, stockCode):
+        import yfinance as yf
+
+        return yf.Ticker(stockCode)
+
+    #A conditional request when there are validators from last time, MarketWatch answers 304 if the page is the same
+    def news(self, stockCode, validators=None, timeout=None):
+        import requests
+
+        headers = {}
+        if validators and validators.get("ETag"):
+            headers["If-None-Match"] = validators["ETag"]
+        if validators and validators.get("Last-Modified"):
+            headers["If-Modified-Since"] = validators["Last-Modified"]
+
+        response = requests.get(NEWS_URL.format(stockCode), headers=headers, timeout=timeout)
+        if response.status_code == 304:
+            return None, validators
+        response.raise_for_status()
+        return response.text, {key: response.headers[key] for key in ("ETag", "Last-Modified") if key in response.headers}
+
+#Reads <directory>/<stockCode>.csv files saved with yf.download(...).to_csv(), for working offline and in tests
+#Intraday intervals come from <directory>/<stockCode>_<interval>.csv
+class CsvProvider:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def pricesPath(self, stockCode, interval):
+        fileName = stockCode if interval == "1d" else "{0}_{1}".format(stockCode, interval)
+        return os.path.join(self.directory, fileName + ".csv")
+
+    def download(self, stockCode, startDate, endDate, interval="1d"):
+        path = self.pricesPath(stockCode, interval)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+
+        stockData_df = pd.read_csv(path, index_col=0, parse_dates=True)
+        #Intraday indexes are saved with their offset, read back in the exchange's timezone like yf.download's
+        if interval != "1d" and not stockData_df.empty:
+            stockData_df.index = pd.to_datetime(stockData_df.index, utc=True).tz_convert("America/New_York")
+        return sliceDates(stockData_df, startDate, endDate)
+
+#Serves a recording made by record() as if it were Yahoo and MarketWatch, so the dashboards run with no network
+#Besides the price files of CsvProvider a recording has <directory>/<stockCode>/info.json, <dataset>.csv for the
+#other ticker datasets and news.html. Every call can be made to wait like a network round trip (latency plus up to
+#jitter seconds) and to fail like one (failureRate of them), seeded so load tests see the same delays and failures
+#every run. Failures look like the real ones: an empty frame from download, a ConnectionError from the rest.
+class ReplayProvider(CsvProvider):
+    def __init__(self, directory, latency=0.0, jitter=0.0, failureRate=0.0, seed=0):
+        super().__init__(directory)
+        self.latency = latency
+        self.jitter = jitter
+        self.failureRate = failureRate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+        self.calls = 0
+        self.failures = 0
+
+    #Waits out the injected latency, returns False when the call is to fail
+    def roundTrip(self):
+        with self.lock:
+            self.calls += 1
+            delay = self.latency + self.jitter * self.random.random()
+            failed = self.random.random() < self.failureRate
+            self.failures += failed
+        if delay > 0:
+            time.sleep(delay)
+        return not failed
+
+    def tickerPath(self, stockCode, fileName):
+        return os.path.join(self.directory, stockCode, fileName)
+
+    def download(self, stockCode, startDate, endDate, interval="1d"):
+        if not self.roundTrip():
+            return pd.DataFrame()
+        return super().download(stockCode, startDate, endDate, interval)
+
+    def ticker(self, stockCode):
+        return ReplayTicker(self, stockCode)
+
+    #The recording's modification time and size stand in for an ETag, so conditional requests replay too
+    def news(self, stockCode, validators=None, timeout=None):
+        if not self.roundTrip():
+            raise ConnectionError("Replayed failure fetching news for {0}".format(stockCode))
+
+        path = self.tickerPath(stockCode, "news.html")
+        try:
+            fileStat = os.stat(path)
+        except FileNotFoundError:
+            return "", {}
+        etag = '"{0:x}-{1:x}"'.format(fileStat.st_mtime_ns, fileStat.st_size)
+        if validators and validators.get("ETag") == etag:
+            return None, validators
+
+        with open(path, encoding="utf-8") as f:
+            return f.read(), {"ETag": etag}
+
+    def stats(self):
+        return {"calls": self.calls, "failures": self.failures}
+
+#yf.Ticker stand in, each dataset is read (with its own round trip) when it is first used like yfinance's
+class ReplayTicker:
+    def __init__(self, provider, stockCode):
+        self.provider = provider
+        self.stockCode = stockCode
+
+    def load(self, dataset):
+        if not self.provider.roundTrip():
+            raise ConnectionError("Replayed failure fetching {0} for {1}".format(dataset, self.stockCode))
+
+        if dataset == "info":
+            try:
+                with open(self.provider.tickerPath(self.stockCode, "info.json"), encoding="utf-8") as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                return {}
+
+        path = self.provider.tickerPath(self.stockCode, dataset + ".csv")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_csv(path, index_col=0, parse_dates=dataset in ("recommendations", "actions"))
+
+    info = property(lambda self: self.load("info"))
+    recommendations = property(lambda self: self.load("recommendations"))
+    actions = property(lambda self: self.load("actions"))
+    institutional_holders = property(lambda self: self.load("institutional_holders"))
+    sustainability = property(lambda self: self.load("sustainability"))
+
+#Saves what provider returns for the tickers into a recording ReplayProvider can serve, e.g.
+#    record(YahooProvider(), "recordings", ["AAPL", "MSFT"], "2020-01-01", "2022-06-01")
+#Datasets that fail to download are left out and replay as empty
+def record(provider, directory, stockCodes, startDate, endDate, intervals=("1d",)):
+    recording = CsvProvider(directory)
+
+    for stockCode in stockCodes:
+        os.makedirs(os.path.join(directory, stockCode), exist_ok=True)
+
+        for interval in intervals:
+            stockData_df = provider.download(stockCode, startDate, endDate, interval)
+            if not stockData_df.empty:
+                stockData_df.to_csv(recording.pricesPath(stockCode, interval))
+
+        ticker = provider.ticker(stockCode)
+        for dataset in TICKER_DATASETS:
+            try:
+                data = getattr(ticker, dataset)
+            except Exception:
+                continue
+            if data is None:
+                continue
+            if dataset == "info":
+                with open(os.path.join(directory, stockCode, "info.json"), "w", encoding="utf-8") as f:
+                    json.dump(data, f, default=str)
+            else:
+                pd.DataFrame(data).to_csv(os.path.join(directory, stockCode, dataset + ".csv"))
+
+        try:
+            newsHtml, validators = provider.news(stockCode)
+        except Exception:
+            continue
+        with open(os.path.join(directory, stockCode, "news.html"), "w", encoding="utf-8") as f:
+            f.write(newsHtml)
+
+#{stockCode: frame} for a basket, from one request where the provider has downloadMany and otherwise a download
+#per ticker in a thread pool, the downloads are network bound so the total comes close to the slowest one
+#A ticker that fails comes back as an empty frame, like it does from Yahoo's grouped download
+def downloadMany(provider, stockCodes, startDate, endDate, interval="1d", maxWorkers=50):
+    if hasattr(provider, "downloadMany"):
+        return provider.downloadMany(stockCodes, startDate, endDate, interval)
+
+    def downloadOne(stockCode):
+        try:
+            return provider.download(stockCode, startDate, endDate, interval)
+        except Exception:
+            return pd.DataFrame()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(maxWorkers, len(stockCodes)))) as executor:
+        frames = list(executor.map(downloadOne, stockCodes))
+    return dict(zip(stockCodes, frames))
+
+#Rows from startDate up to but not including endDate, for naive and timezone aware indexes alike
+def sliceDates(stockData_df, startDate, endDate):
+    if stockData_df.empty:
+        return stockData_df
+    tz = stockData_df.index.tz
+    start = pd.Timestamp(startDate, tz=tz)
+    end = pd.Timestamp(endDate, tz=tz)
+    return stockData_df[(stockData_df.index >= start) & (stockData_df.index < end)]
+
+#"yahoo", "csv:<directory>" or "replay:<directory>[?latency=0.2&jitter=0.1&failureRate=0.05&seed=1]"
+def createProvider(spec):
+    name, _, argument = spec.partition(":")
+    if name == "yahoo":
+        return YahooProvider()
+    if name == "csv":
+        return CsvProvider(argument)
+    if name == "replay":
+        directory, _, query = argument.partition("?")
+        options = {key: values[-1] for key, values in parse_qs(query).items()}
+        return ReplayProvider(directory, float(options.get("latency", 0)), float(options.get("jitter", 0)),
+            float(options.get("failureRate", 0)), int(options.get("seed", 0)))
+    raise ValueError("Unknown price data provider: {0}".format(spec))
+
+provider = createProvider(os.environ.get("FORECO_PROVIDER", "yahoo"))
@@ -0,0 +1,98 @@
+import time
+
+import numpy as np
+
+import forecast
+
+#Streaming version of forecast.forecast for long histories (decades of daily bars, or intraday bars)
+#The windows are gathered, scaled and fed to keras one float32 batch at a time, so memory grows with the batch size
+#rather than with the number of windows. Only the stock data itself, the window indices and the test outputs are kept whole.
+
+#Yields (inputs, outputs) float32 batches of the given windows, unscaled
+def windowBatches(inputWindows, outputWindows, indices, attributes, batchSize):
+    for start in range(0, len(indices), batchSize):
+        inputs, outputs = forecast.gatherWindows(inputWindows, outputWindows, indices[start:start+batchSize], attributes)
+        yield inputs, outputs
+
+#Fits both scalers in one pass over the training windows with partial_fit, the same result as fit_transform on all of them
+def fitStreamingScalers(inputWindows, outputWindows, indices, attributes, batchSize):
+    from sklearn.preprocessing import MinMaxScaler
+
+    inputs_scaler = MinMaxScaler(feature_range=(0, 1))
+    outputs_scaler = MinMaxScaler(feature_range=(0, 1))
+    for inputs, outputs in windowBatches(inputWindows, outputWindows, indices, attributes, batchSize):
+        inputs_scaler.partial_fit(inputs)
+        outputs_scaler.partial_fit(outputs)
+
+    return inputs_scaler, outputs_scaler
+
+#tf.data pipeline of scaled batches, reshuffled on every pass like model.fit does with arrays
+#Keras calls the generator again for each epoch, prefetching overlaps gathering the next batch with training on this one
+def createWindowDataset(inputWindows, outputWindows, indices, attributes, batchSize, inputs_scaler, outputs_scaler, shuffle=True, seed=3):
+    import tensorflow as tf
+
+    rng = np.random.default_rng(seed)
+    featureCount = len(attributes) * inputWindows.shape[2] #inputWindows is (samples, columns, inputDim)
+
+    def generateBatches():
+        epochIndices = rng.permutation(indices) if shuffle else indices
+        for inputs, outputs in windowBatches(inputWindows, outputWindows, epochIndices, attributes, batchSize):
+            yield inputs_scaler.transform(inputs), outputs_scaler.transform(outputs)
+
+    dataset = tf.data.Dataset.from_generator(generateBatches, output_signature=(
+        tf.TensorSpec(shape=(None, featureCount), dtype=tf.float32),
+        tf.TensorSpec(shape=(None, outputWindows.shape[1]), dtype=tf.float32)
+    ))
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+#Same options as forecast.fitModel, the validation windows are the last validationSplit of the training windows
+#like keras' own validation_split
+def fitStreamingModel(model, inputWindows, outputWindows, trainIndices, attributes, batchSize, inputs_scaler, outputs_scaler, epochs,
+        callbacks=None, validationSplit=0.0, patience=None, minDelta=0.0, timeBudget=None):
+    validationData = None
+    if validationSplit:
+        validationStart = int(len(trainIndices) * (1 - validationSplit))
+        trainIndices, validationIndices = trainIndices[:validationStart], trainIndices[validationStart:]
+        validationData = createWindowDataset(inputWindows, outputWindows, validationIndices, attributes, batchSize, inputs_scaler, outputs_scaler, shuffle=False)
+
+    dataset = createWindowDataset(inputWindows, outputWindows, trainIndices, attributes, batchSize, inputs_scaler, outputs_scaler)
+    callbacks = forecast.createFitCallbacks(callbacks, validationData is not None, patience, minDelta, timeBudget)
+
+    startTime = time.perf_counter()
+    history = model.fit(dataset, epochs=epochs, validation_data=validationData, callbacks=callbacks)
+
+    history.params["epochsRun"] = len(history.epoch)
+    history.params["trainingTime"] = time.perf_counter() - startTime
+
+    return model, history
+
+#Same contract as forecast.forecast, only the keras engine streams (the closed-form engines don't have the memory problem)
+#batchSize is both the training batch size (64, like fitModel) and the chunk size of every other pass over the windows
+def forecastStreaming(stockData_df, inputDim, outputDim, attributes, epochs, batchSize=64, callbacks=None, fitOptions=None):
+    forecast.setSeeds()
+    stockDataArray = stockData_df.to_numpy(dtype=np.float32)
+
+    inputWindows, outputWindows, forecastInput = forecast.createWindows(stockDataArray, inputDim, outputDim, attributes)
+    trainIndices, testIndices = forecast.splitIndices(len(outputWindows))
+
+    inputs_scaler, outputs_scaler = fitStreamingScalers(inputWindows, outputWindows, trainIndices, attributes, batchSize)
+
+    model = forecast.createEngine("keras", inputDim, outputDim, attributes)
+    model.model, history = fitStreamingModel(model.model, inputWindows, outputWindows, trainIndices, attributes, batchSize,
+        inputs_scaler, outputs_scaler, epochs, callbacks, **(fitOptions or {}))
+    model.inference = forecast.NumpyDenseModel.fromKerasModel(model.model)
+    history = forecast.ForecastHistory.fromKerasHistory(history)
+
+    #The test set is predicted batch by batch, only its (samples, outputDim) outputs are held
+    outputs_test = []
+    outputs_pred_n = []
+    for inputs, outputs in windowBatches(inputWindows, outputWindows, testIndices, attributes, batchSize):
+        outputs_test.append(outputs)
+        outputs_pred_n.append(model.predict(inputs_scaler.transform(inputs)))
+    outputs_test = np.concatenate(outputs_test)
+    outputs_pred, rmse, mape = forecast.scorePredictions(np.concatenate(outputs_pred_n), outputs_scaler.transform(outputs_test), outputs_scaler)
+
+    forecastOutput_n = model.predict(inputs_scaler.transform(forecastInput.reshape(1, -1)))
+    forecastResults = forecast.createForecastResults(stockData_df, forecastOutput_n, outputs_scaler, outputDim)
+
+    return forecastResults, outputs_test, outputs_pred, rmse, mape, history
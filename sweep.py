@@ -0,0 +1,72 @@
+import os
+import time
+import random
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import forecast
+
+RESULT_COLUMNS = ["inputDim", "outputDim", "attributes", "epochs", "rmse", "mape", "trainTime", "error"]
+
+#Every combination of the given values
+def createGrid(inputDims, outputDims, attributeSets, epochsList):
+    return [{"inputDim": inputDim, "outputDim": outputDim, "attributes": list(attributes), "epochs": epochs}
+        for inputDim, outputDim, attributes, epochs in itertools.product(inputDims, outputDims, attributeSets, epochsList)]
+
+#count configurations drawn from the same values, without repeats
+def createRandomSearch(inputDims, outputDims, attributeSets, epochsList, count, seed=3):
+    grid = createGrid(inputDims, outputDims, attributeSets, epochsList)
+    return random.Random(seed).sample(grid, min(count, len(grid)))
+
+### ----- WORKER PROCESS ----- ###
+
+#Caps the threads tensorflow and numpy use in each worker, so the workers together don't oversubscribe the cores
+def initSweepWorker(threadsPerWorker):
+    for variable in ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "TF_NUM_INTRAOP_THREADS"]:
+        os.environ[variable] = str(threadsPerWorker)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+
+    #Has to happen before tensorflow runs anything, which is why it's done as the worker starts
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threadsPerWorker)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+def runSweepConfig(stockData_df, config, engine, fitOptions):
+    result = dict(config, rmse=np.nan, mape=np.nan, trainTime=np.nan, error="")
+
+    startTime = time.perf_counter()
+    try:
+        forecastResults, outputs_test, outputs_pred, rmse, mape, history = forecast.forecast(stockData_df, config["inputDim"], config["outputDim"],
+            config["attributes"], config["epochs"], engine, fitOptions=fitOptions)
+        result.update(rmse=rmse, mape=mape)
+    except Exception as e:
+        #A configuration that doesn't fit the data (e.g. windows longer than the history) shouldn't end the sweep
+        result["error"] = str(e)
+    result["trainTime"] = time.perf_counter() - startTime
+
+    return result
+
+### ----- PARENT PROCESS ----- ###
+
+#Runs forecast.forecast for every configuration in a process pool, one worker per core by default
+#Returns a results table sorted by MAPE, best first
+def runSweep(stockData_df, configs, maxWorkers=None, engine="keras", fitOptions=None):
+    cpuCount = os.cpu_count() or 1
+    maxWorkers = max(1, min(maxWorkers or cpuCount, len(configs)))
+    threadsPerWorker = max(1, cpuCount // maxWorkers)
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=maxWorkers, mp_context=context, initializer=initSweepWorker, initargs=(threadsPerWorker,)) as executor:
+        futures = [executor.submit(runSweepConfig, stockData_df, config, engine, fitOptions) for config in configs]
+        results = [future.result() for future in futures]
+
+    return collectResults(results)
+
+#The results table of runSweepConfig's results, sorted by MAPE, best first
+def collectResults(results):
+    results_df = pd.DataFrame(results, columns=RESULT_COLUMNS)
+    return results_df.sort_values("mape", na_position="last").reset_index(drop=True)